@@ -0,0 +1,389 @@
+"""
+Motor assincrono de coleta da arvore da SMS no site SICI.
+Utiliza Playwright (API assincrona) com varios contextos isolados do navegador.
+
+Cada contexto tem sua propria sessao ASP.NET (cookies e ViewState separados),
+entao pode expandir a arvore de forma independente:
+- Um contexto inicial expande SMS, coleta os dados do proprio SMS e lista seus filhos diretos
+- N contextos trabalhadores pegam os filhos de SMS de uma fila; para cada um,
+  reabrem o site, reexpandem SMS ate o filho atribuido e percorrem a subarvore
+- Ao final, os resultados de cada subarvore sao juntados na mesma ordem de exibicao
+  e salvos com save_collected_data(), gerando a mesma saida de SiciSmsScraper.run()
+
+Com ADAPTIVE_CONCURRENCY, ASYNC_CONTEXTS passa a ser o teto: todos os postbacks e
+carregamentos de pagina passam por um AdaptiveLimiter (concurrency_control), que
+ajusta quantos ficam em voo ao mesmo tempo pela latencia e pelos timeouts.
+"""
+
+import asyncio
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from .browser_service import StageTimer, launch_options
+from .concurrency_control import AdaptiveLimiter
+from .config import BASE_URL, ASYNC_CONTEXTS, LAUNCH_PROFILE, ADAPTIVE_CONCURRENCY, CRAWL_ORDER
+from .crawl_frontier import Frontier
+from .postback_wait import AsyncPostbackWaiter, children_container_selector, new_token
+from .sici_scraper import SiciSmsScraper
+from .tree_scripts import (
+    DETAIL_PANEL_SELECTOR,
+    JS_CLICK_EXPANDER,
+    JS_CLICK_NODE,
+    JS_EXTRACT_NODE,
+)
+from .tree_model import TreeModel, path_key
+
+
+class AsyncSiciSmsScraper:
+    """
+    Classe para scraping paralelo da arvore de orgaos da SMS no site SICI.
+    Cada filho direto de SMS eh percorrido em um contexto proprio do navegador.
+    """
+
+    def __init__(self, num_contexts: int = ASYNC_CONTEXTS, root_text: str = "SMS",
+                 base_url: str = BASE_URL, launch_profile: str = LAUNCH_PROFILE):
+        """
+        Inicializa os atributos da classe.
+
+        Args:
+            num_contexts: Numero maximo de contextos trabalhando ao mesmo tempo
+            root_text: Texto do no raiz cuja subarvore sera coletada
+            base_url: URL da pagina principal do SICI (ou de um servidor local)
+            launch_profile: Perfil de LAUNCH_PROFILES usado ao abrir o navegador
+        """
+        self.num_contexts = max(1, num_contexts)
+        self.root_text = root_text
+        self.base_url = base_url
+        self.launch_profile = launch_profile
+        self.playwright = None
+        self.browser: Browser = None
+        # Reaproveita a categorizacao e a gravacao de arquivos do scraper sincrono
+        # (nenhum navegador eh aberto por esta instancia); sem agenda de recoleta
+        self.helper = SiciSmsScraper(base_url=base_url, recrawl_schedule=False)
+        # Postbacks simultaneos entre todos os contextos (None: um por contexto, sem ajuste)
+        self.limiter: AdaptiveLimiter = AdaptiveLimiter(self.num_contexts) if ADAPTIVE_CONCURRENCY else None
+
+    async def __aenter__(self):
+        """
+        Context manager assincrono: inicia o Playwright e abre o navegador.
+        Os contextos sao criados sob demanda por cada trabalhador.
+        """
+        timer = StageTimer("Inicializacao do navegador")
+        with timer.stage("playwright"):
+            self.playwright = await async_playwright().start()
+        with timer.stage("launch"):
+            self.browser = await self.playwright.chromium.launch(**launch_options(self.launch_profile))
+        timer.report()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """
+        Context manager assincrono: fecha o navegador e encerra o Playwright.
+        """
+        self.helper.close_storage()
+        if self.helper.blocker:
+            self.helper.blocker.report()
+        if self.helper.archive:
+            self.helper.archive.report()
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+
+    async def _new_context(self) -> BrowserContext:
+        """
+        Novo contexto isolado, com o arquivo de trafego e o bloqueio de recursos (se ativos) ja instalados.
+        """
+        context = await self.browser.new_context()
+        if self.helper.archive:
+            await self.helper.archive.install_async(context)
+        if self.helper.blocker:
+            await self.helper.blocker.install_async(context)
+        return context
+
+    async def _open_tree_page(self, context: BrowserContext) -> Page:
+        """
+        Abre uma nova pagina no contexto e aguarda o TreeView do SICI.
+        """
+        page = await context.new_page()
+        if self.helper.accountant:
+            page = self.helper.accountant.wrap(page)
+        if self.limiter:
+            # Carregamento da pagina tambem conta: timeout de networkidle eh sinal de sobrecarga
+            async with self.limiter.slot():
+                await page.goto(self.base_url, wait_until="networkidle")
+        else:
+            await page.goto(self.base_url, wait_until="networkidle")
+        try:
+            await page.wait_for_selector("div[id*='ua_treeview']", timeout=10000)
+        except Exception:
+            print("[!] TreeView nao encontrado no tempo esperado, mas prosseguindo...")
+        return page
+
+    async def _expand_root(self, page: Page) -> str:
+        """
+        Localiza o no raiz (SMS) e clica no seu icone de expansao.
+
+        Returns:
+            str: ID do link de texto do no raiz, ou None se nao encontrado
+        """
+        root = (await TreeModel.harvest_async(page)).find_by_text(self.root_text)
+        if not root:
+            return None
+        root_id = root['id']
+
+        waiter = AsyncPostbackWaiter(page, limiter=self.limiter)
+        await waiter.click_and_wait(JS_CLICK_EXPANDER, root_id, children_container_selector(root_id))
+        return root_id
+
+    async def _extract_node_info(self, page: Page, tree_path: list = None) -> dict:
+        """
+        Versao assincrona de SiciSmsScraper._extract_node_info.
+        Os dados brutos vem em uma unica chamada e a categorizacao eh feita pelo helper.
+        """
+        payload = {}
+        snapshots = self.helper.snapshots
+        with_snapshot = bool(snapshots and tree_path)
+
+        try:
+            token = new_token()
+
+            async def extract_or_select():
+                # Extrai direto ou, se o dropdown nao esta em "Informacoes Gerais", troca a opcao (postback)
+                nonlocal payload
+                payload = await page.evaluate(JS_EXTRACT_NODE, [DETAIL_PANEL_SELECTOR, token, True, with_snapshot])
+                return payload.get("pending")
+
+            # A troca do dropdown eh um postback como o clique: passa pelo limitador
+            await AsyncPostbackWaiter(page, limiter=self.limiter).run(extract_or_select, DETAIL_PANEL_SELECTOR, token)
+            if payload.get("pending"):
+                # Painel atualizado (ou tempo esgotado): extrair de novo
+                payload = await page.evaluate(JS_EXTRACT_NODE, [DETAIL_PANEL_SELECTOR, token, False, with_snapshot])
+        except Exception as e:
+            print(f"[!] Erro ao extrair com JavaScript: {e}")
+
+        if payload.get("snapshot"):
+            snapshots.put(tree_path, payload["snapshot"])
+        return self.helper._build_node_info(payload.get("titulo"), payload.get("decreto"), payload.get("pairs") or [])
+
+    async def _visit_node(self, page: Page, tag: str, task: dict, tree: TreeModel) -> tuple:
+        """
+        Acessa o no de uma tarefa da fronteira, coleta e salva suas informacoes e o expande.
+
+        Args:
+            page: Pagina do contexto trabalhador
+            tag: Prefixo de log identificando o contexto
+            task: Tarefa {"caminho": [...], "registro": {...}, "saida": {...}}
+            tree: Modelo da arvore do ramo, atualizado a cada expansao
+
+        Returns:
+            tuple: (info do no, registros dos filhos na ordem de exibicao)
+        """
+        node_path = task['caminho']
+        indent = "  " * (len(node_path) - 1)
+        queued = task['registro']
+        # Outras expansoes podem ter acontecido desde que a tarefa entrou na fronteira
+        record = tree.find_by_value_path(queued['valuePath']) if queued.get('valuePath') else tree.get(queued['id'])
+        if record is None or record['text'] != queued['text']:
+            record = queued
+        node_id = record['id']
+        node_name = record['text']
+        tracer = self.helper.tracer
+        self.helper._account_node(path_key(node_path))
+        print(f"{tag}{indent}[*] {node_name}")
+
+        # Clicar no no e aguardar o painel de detalhes ser atualizado
+        waiter = AsyncPostbackWaiter(page, limiter=self.limiter)
+        with tracer.span("clique", node_path):
+            await waiter.click_and_wait(JS_CLICK_NODE, node_id, DETAIL_PANEL_SELECTOR)
+
+        with tracer.span("extracao", node_path):
+            info = await self._extract_node_info(page, node_path)
+        with tracer.span("gravacao", node_path):
+            self.helper._save_node_data(node_name, info, tree_path=node_path)
+
+        if not record['hasExpander']:
+            return info, []
+
+        print(f"{tag}{indent}   [*] Expandindo '{node_name}' para ver filhos...")
+        if not record['expanded']:
+            with tracer.span("expansao", node_path):
+                await waiter.click_and_wait(JS_CLICK_EXPANDER, node_id, children_container_selector(node_id))
+
+        # Uma leitura do container de filhos recem-expandido para planejar todos os filhos
+        with tracer.span("leitura_arvore", node_path):
+            await tree.refresh_async(page, under=node_id)
+        return info, tree.children_of(node_id)
+
+    async def _crawl_branch(self, page: Page, tag: str, index: int, name: str) -> dict:
+        """
+        Reexpande a arvore ate o filho de SMS atribuido e percorre sua subarvore.
+
+        Args:
+            page: Pagina recem-aberta do contexto trabalhador
+            tag: Prefixo de log identificando o contexto
+            index: Posicao do filho na lista de filhos de SMS
+            name: Nome do filho
+
+        Returns:
+            dict: Dados da subarvore no formato {"info": ..., "filhos": {...}}
+        """
+        root_id = await self._expand_root(page)
+        if not root_id:
+            raise RuntimeError(f"No '{self.root_text}' nao encontrado")
+
+        tree = await TreeModel.harvest_async(page, under=root_id)
+        children = tree.children_of(root_id)
+
+        # Preferir a mesma posicao (nomes podem se repetir); se a ordem mudou, buscar pelo nome
+        child = None
+        if index < len(children) and children[index]['text'] == name:
+            child = children[index]
+        else:
+            child = next((c for c in children if c['text'] == name), None)
+
+        if not child:
+            raise RuntimeError(f"Filho '{name}' de {self.root_text} nao encontrado")
+
+        return await self._crawl_subtree(page, tag, child, tree)
+
+    async def _crawl_subtree(self, page: Page, tag: str, record: dict, tree: TreeModel) -> dict:
+        """
+        Percorre a subarvore de um filho de SMS pela fronteira de coleta (ordem
+        CRAWL_ORDER). Cada no ganha seu lugar na saida quando entra na fronteira,
+        entao os filhos ficam na ordem de exibicao qualquer que seja a ordem de visita.
+
+        Returns:
+            dict: Dados da subarvore no formato {"info": ..., "filhos": {...}}
+        """
+        root = {"info": None, "filhos": {}}
+        frontier = Frontier(CRAWL_ORDER, staleness=self.helper._staleness)
+        frontier.push({"caminho": [self.root_text, record['text']], "registro": record, "saida": root})
+
+        while frontier:
+            task = frontier.pop()
+            node = task['saida']
+            try:
+                node["info"], children = await self._visit_node(page, tag, task, tree)
+            except Exception as e:
+                if node is root:
+                    raise
+                indent = "  " * (len(task['caminho']) - 2)
+                print(f"{tag}{indent}   [ERRO] Falha ao processar '{task['caminho'][-1]}': {e}")
+                node.clear()
+                node["erro"] = str(e)
+                continue
+
+            for child in children:
+                slot = {"info": None, "filhos": {}}
+                node["filhos"][child['text']] = slot
+                frontier.push({"caminho": task['caminho'] + [child['text']], "registro": child, "saida": slot})
+
+        return root
+
+    async def _worker(self, worker_id: int, queue: asyncio.Queue, results: dict):
+        """
+        Trabalhador: abre um contexto isolado e consome filhos de SMS da fila.
+        """
+        tag = f"[ctx {worker_id}] "
+        self.helper.tracer.track(f"ctx {worker_id}")
+        context = await self._new_context()
+        try:
+            while True:
+                try:
+                    index, name = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                print(f"{tag}[*] Iniciando subarvore '{name}'")
+                # Reabrir a pagina e reexpandir ate o filho eh custo fixo da subarvore, nao de um no
+                self.helper._account_node(None)
+                page = await self._open_tree_page(context)
+                try:
+                    results[index] = await self._crawl_branch(page, tag, index, name)
+                    print(f"{tag}[OK] Subarvore '{name}' concluida")
+                except Exception as e:
+                    print(f"{tag}[ERRO] Falha na subarvore '{name}': {e}")
+                    results[index] = {"erro": str(e)}
+                finally:
+                    await page.close()
+        finally:
+            await context.close()
+
+    async def _collect_root(self) -> tuple:
+        """
+        Em um contexto proprio, expande SMS, lista seus filhos e coleta os dados de SMS.
+
+        Returns:
+            tuple: (info de SMS, lista de filhos [{id, text}])
+        """
+        self.helper.tracer.track(self.root_text)
+        context = await self._new_context()
+        try:
+            page = await self._open_tree_page(context)
+            root_id = await self._expand_root(page)
+            if not root_id:
+                print(f"[!] No {self.root_text} nao encontrado!")
+                return None, []
+
+            children = (await TreeModel.harvest_async(page, under=root_id)).children_of(root_id)
+
+            tracer = self.helper.tracer
+            self.helper._account_node(self.root_text)
+            with tracer.span("clique", [self.root_text]):
+                await AsyncPostbackWaiter(page, limiter=self.limiter).click_and_wait(JS_CLICK_NODE, root_id, DETAIL_PANEL_SELECTOR)
+            with tracer.span("extracao", [self.root_text]):
+                root_info = await self._extract_node_info(page, [self.root_text])
+            with tracer.span("gravacao", [self.root_text]):
+                self.helper._save_node_data(self.root_text, root_info, tree_path=[self.root_text])
+
+            return root_info, children
+        finally:
+            await context.close()
+
+    async def run(self) -> None:
+        """
+        Executa o fluxo completo em paralelo:
+        1. Coleta SMS e lista seus filhos diretos
+        2. Distribui os filhos entre os contextos trabalhadores
+        3. Junta as subarvores e salva os dados em arquivo JSON
+        """
+        print("\n" + "="*60)
+        print(f"Iniciando RPA SICI SMS (assincrono, {self.num_contexts} contextos)")
+        print("="*60 + "\n")
+
+        root_info, children = await self._collect_root()
+        if root_info is None:
+            return
+
+        print(f"[*] {len(children)} subarvore(s) de {self.root_text} para processar")
+
+        queue = asyncio.Queue()
+        for index, child in enumerate(children):
+            queue.put_nowait((index, child['text']))
+
+        results = {}
+        workers = [
+            asyncio.create_task(self._worker(worker_id, queue, results))
+            for worker_id in range(min(self.num_contexts, len(children)))
+        ]
+        await asyncio.gather(*workers)
+
+        # Juntar na ordem de exibicao da arvore
+        filhos = {}
+        for index, child in enumerate(children):
+            filhos[child['text']] = results.get(index, {"erro": "Subarvore nao processada"})
+
+        data = {self.root_text: {"info": root_info, "filhos": filhos}}
+        self.helper.collected_data = data
+        self.helper.save_collected_data(data)
+        self.helper.tracer.export()
+        if self.helper.accountant:
+            self.helper.accountant.report()
+        if self.helper.snapshots:
+            self.helper.snapshots.report()
+        if self.limiter:
+            self.limiter.report()
+            self.limiter.export()
+
+        print("\n" + "="*60)
+        print("RPA concluida com sucesso!")
+        print("="*60 + "\n")
@@ -0,0 +1,210 @@
+"""
+Benchmark dos motores de coleta contra o servidor sintetico do SICI.
+
+Sobe um SyntheticSiciServer com o tamanho, profundidade, ramificacao e latencia
+informados e executa cada motor do inicio ao fim (abertura do navegador ou da
+sessao HTTP, coleta completa e gravacao da saida), cada um em uma pasta
+temporaria propria. Para cada execucao informa:
+- tempo total e nos por segundo
+- cobertura (nos com "Informações Gerais" carregado no servidor / nos da arvore)
+- chamadas por no: chamadas do Playwright na pagina e nos handles, contadas por
+  page_accounting (cada uma eh uma ida e volta ao navegador) nos motores com
+  navegador; requisicoes HTTP no motor HTTP
+- postbacks, recursos estaticos e KiB servidos por no, contados pelo servidor
+
+Uma execucao com mais chamadas por no que MAX_CALLS_PER_NODE (ou --max-chamadas)
+eh reprovada: o benchmark termina com codigo de saida 1.
+
+    python -m src.benchmark --nos 500 --profundidade 3 --ramificacao 8 --latencia 20
+    python -m src.benchmark --motores http --nos 20000 --json benchmark.json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from .config import MAX_CALLS_PER_NODE
+from .page_accounting import CallAccountant
+from .synthetic_sici import SyntheticSiciServer
+
+ENGINES = ("sync", "http", "async")
+
+
+def _browser_calls(accountant: CallAccountant) -> tuple:
+    return accountant.total_calls(), accountant.summary()["por_tipo"]
+
+
+def _run_sync(url: str) -> tuple:
+    from .sici_scraper import SiciSmsScraper
+
+    scraper = SiciSmsScraper(base_url=url, launch_profile="rapido")
+    # Contabilidade sempre ligada no benchmark, mesmo com PAGE_ACCOUNTING = False
+    scraper.accountant = scraper.accountant or CallAccountant()
+    with scraper:
+        scraper.run()
+    return _browser_calls(scraper.accountant)
+
+
+def _run_http(url: str) -> tuple:
+    from .http_crawler import HttpPostbackCrawler
+
+    with HttpPostbackCrawler(base_url=url, record_dir=None) as crawler:
+        crawler.run()
+    return crawler.requests_made, {}
+
+
+def _run_async(url: str) -> tuple:
+    from .async_scraper import AsyncSiciSmsScraper
+
+    scraper = AsyncSiciSmsScraper(base_url=url, launch_profile="rapido")
+    scraper.helper.accountant = scraper.helper.accountant or CallAccountant()
+
+    async def collect():
+        async with scraper:
+            await scraper.run()
+
+    asyncio.run(collect())
+    return _browser_calls(scraper.helper.accountant)
+
+
+_RUNNERS = {"sync": _run_sync, "http": _run_http, "async": _run_async}
+
+
+def run_engine(engine: str, server: SyntheticSiciServer, verbose: bool = False) -> dict:
+    """
+    Executa um motor contra o servidor, em uma pasta temporaria descartada no final.
+
+    Returns:
+        dict: Metricas da execucao (ou {"motor", "erro"} se o motor falhou)
+    """
+    server.reset_stats()
+    workdir = tempfile.mkdtemp(prefix=f"sici_bench_{engine}_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    log = io.StringIO()
+    try:
+        start = time.perf_counter()
+        try:
+            if verbose:
+                calls, by_type = _RUNNERS[engine](server.url)
+            else:
+                with redirect_stdout(log):
+                    calls, by_type = _RUNNERS[engine](server.url)
+        except Exception as e:
+            message = (str(e).splitlines() or [""])[0]
+            return {"motor": engine, "erro": f"{type(e).__name__}: {message}"}
+        wall = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    nodes = len(server.selected_nodes)
+    per_node = max(nodes, 1)
+    stats = dict(server.stats)
+    return {
+        "motor": engine,
+        "nos": nodes,
+        "cobertura": nodes / server.tree.sms_size,
+        "tempo_s": wall,
+        "nos_por_s": nodes / wall if wall else 0.0,
+        "chamadas": calls,
+        "chamadas_por_no": calls / per_node,
+        "postbacks_por_no": stats["postbacks"] / per_node,
+        "estaticos_por_no": stats["estaticos"] / per_node,
+        "kib_por_no": stats["bytes"] / 1024 / per_node,
+        "chamadas_por_tipo": by_type,
+    }
+
+
+def run_benchmark(engines, num_nodes: int, depth: int, fanout: int, latency_ms: float,
+                  repeat: int = 1, verbose: bool = False, max_calls: float = MAX_CALLS_PER_NODE) -> list:
+    """
+    Executa cada motor `repeat` vezes contra um servidor sintetico.
+    Marca acima_do_orcamento quando as chamadas por no passam de max_calls.
+
+    Returns:
+        list: Uma entrada por motor, com a mediana do tempo e a ultima execucao bem-sucedida
+    """
+    results = []
+    with SyntheticSiciServer(num_nodes, depth, fanout, latency_ms) as server:
+        print(f"[*] SICI sintetico: {server.tree.sms_size} nos em SMS, latencia {latency_ms:g} ms ({server.url})")
+        for engine in engines:
+            runs = []
+            for i in range(repeat):
+                print(f"[*] {engine}: execucao {i + 1}/{repeat}...")
+                runs.append(run_engine(engine, server, verbose))
+            ok = [r for r in runs if "erro" not in r]
+            if not ok:
+                print(f"[ERRO] {engine}: {runs[-1]['erro']}")
+                results.append(runs[-1])
+                continue
+            summary = dict(ok[-1])
+            summary["tempo_s"] = statistics.median(r["tempo_s"] for r in ok)
+            summary["nos_por_s"] = summary["nos"] / summary["tempo_s"] if summary["tempo_s"] else 0.0
+            summary["execucoes"] = len(ok)
+            summary["acima_do_orcamento"] = bool(max_calls) and summary["chamadas_por_no"] > max_calls
+            results.append(summary)
+    return results
+
+
+def print_report(results: list):
+    """Imprime a tabela comparativa."""
+    header = f"{'Motor':<7}{'Nos':>8}{'Cobert.':>9}{'Tempo(s)':>10}{'Nos/s':>9}{'Cham./no':>10}{'Postb./no':>11}{'Estat./no':>11}{'KiB/no':>9}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        if "erro" in r:
+            print(f"{r['motor']:<7}  [ERRO] {r['erro']}")
+            continue
+        print(
+            f"{r['motor']:<7}{r['nos']:>8}{r['cobertura']:>8.0%} {r['tempo_s']:>10.2f}{r['nos_por_s']:>9.1f}"
+            f"{r['chamadas_por_no']:>10.1f}{r['postbacks_por_no']:>11.2f}{r['estaticos_por_no']:>11.2f}{r['kib_por_no']:>9.1f}"
+            + ("  [!] acima do orcamento" if r.get("acima_do_orcamento") else "")
+        )
+    print()
+
+
+def main():
+    """
+    Linha de comando do benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de coleta contra um SICI sintetico")
+    parser.add_argument("--nos", type=int, default=300, help="Nos na subarvore de SMS (100 a 100000)")
+    parser.add_argument("--profundidade", type=int, default=3, help="Niveis abaixo de SMS")
+    parser.add_argument("--ramificacao", type=int, default=8, help="Filhos por no")
+    parser.add_argument("--latencia", type=float, default=0, help="Atraso por resposta do servidor (ms)")
+    parser.add_argument("--motores", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--repeticoes", type=int, default=1, help="Execucoes por motor (vale a mediana do tempo)")
+    parser.add_argument("--max-chamadas", type=float, default=MAX_CALLS_PER_NODE,
+                        help="Orcamento de chamadas por no; acima dele a execucao eh reprovada (0 desativa)")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo JSON")
+    parser.add_argument("--verbose", action="store_true", help="Mostra o log dos motores")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.motores, args.nos, args.profundidade, args.ramificacao, args.latencia,
+        max(1, args.repeticoes), args.verbose, args.max_chamadas,
+    )
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"[OK] Resultados salvos em {args.json}")
+
+    over = [r["motor"] for r in results if r.get("acima_do_orcamento")]
+    if over:
+        print(f"[ERRO] Orcamento de {args.max_chamadas:g} chamadas/no excedido: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Servico de navegador de longa duracao, com perfis de inicializacao rapida.
+
+Abrir um Chromium novo (com janela, por padrao) a cada execucao custa alguns
+segundos antes de open_site() comecar. Este modulo oferece:
+
+- LAUNCH_PROFILES: opcoes de launch prontas ("padrao" mantem o comportamento
+  original; "rapido" eh headless, sem GPU, sem extensoes e com recursos de
+  fundo do Chromium desligados)
+- BrowserService: mantem o navegador aberto, com um pool de paginas
+  pre-aquecidas (cada uma em seu proprio contexto) ja carregadas na URL do
+  servico (BASE_URL por padrao), e expoe o endpoint CDP para outros processos
+- claim_warm_page(): usado pelo scraper que se conecta ao servico via CDP
+  (BROWSER_CDP_ENDPOINT) para tomar uma pagina pre-aquecida livre na sua base_url
+- StageTimer: tempo de cada etapa da inicializacao
+
+Uso:
+    python -m src.browser_service --perfil rapido --porta 9222 --pool 2
+    python -m src.browser_service --url http://127.0.0.1:8765/PAG/principal.aspx
+    (e BROWSER_CDP_ENDPOINT = "http://127.0.0.1:9222" em config.py)
+"""
+
+import argparse
+import time
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright
+
+from .config import BASE_URL, BROWSER_POOL_SIZE, BROWSER_SERVICE_PORT, HEADLESS, LAUNCH_PROFILE
+
+# Flags que desligam servicos de fundo do Chromium que a coleta nao usa
+_LOW_OVERHEAD_ARGS = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-default-apps",
+    "--disable-dev-shm-usage",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-default-browser-check",
+    "--no-first-run",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,DialMediaRouteProvider,"
+    "CalculateNativeWinOcclusion,InterestFeedContentSuggestions,AutofillServerCommunication",
+]
+
+LAUNCH_PROFILES = {
+    # Comportamento original: janela visivel conforme HEADLESS, sem flags extras
+    "padrao": {"headless": HEADLESS, "args": []},
+    # Inicializacao e execucao com o minimo de sobrecarga
+    "rapido": {"headless": True, "args": _LOW_OVERHEAD_ARGS},
+    # Igual ao rapido, mas com janela (para acompanhar a coleta)
+    "visual": {"headless": False, "args": _LOW_OVERHEAD_ARGS},
+}
+
+# Marcas gravadas no sessionStorage da pagina (sobrevivem aos postbacks completos)
+JS_MARK_WARM = "() => sessionStorage.setItem('__rpaWarm', '1')"
+
+# Toma a pagina para si se ela esta pre-aquecida e livre (atomico dentro da pagina)
+JS_CLAIM_WARM = """
+    () => {
+        if (sessionStorage.getItem('__rpaWarm') !== '1') return false;
+        if (sessionStorage.getItem('__rpaClaimed')) return false;
+        sessionStorage.setItem('__rpaClaimed', '1');
+        return true;
+    }
+"""
+
+JS_IS_CLAIMED = "() => sessionStorage.getItem('__rpaClaimed') === '1'"
+
+
+def launch_options(profile: str = LAUNCH_PROFILE, **extra) -> dict:
+    """
+    Opcoes para chromium.launch() do perfil informado.
+    """
+    if profile not in LAUNCH_PROFILES:
+        raise ValueError(f"Perfil de inicializacao desconhecido: {profile} (use {', '.join(LAUNCH_PROFILES)})")
+    options = {"headless": LAUNCH_PROFILES[profile]["headless"], "args": list(LAUNCH_PROFILES[profile]["args"])}
+    for key, value in extra.items():
+        if key == "args":
+            options["args"] += list(value)
+        else:
+            options[key] = value
+    return options
+
+
+class StageTimer:
+    """
+    Mede o tempo de cada etapa da inicializacao.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def total(self) -> float:
+        return sum(seconds for _, seconds in self.stages)
+
+    def report(self):
+        """Imprime as etapas e o total."""
+        parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.stages)
+        print(f"[*] {self.label}: {parts} (total {self.total():.2f}s)")
+
+
+def claim_warm_page(browser, base_url: str = BASE_URL):
+    """
+    Procura, entre as paginas visiveis pela conexao CDP, uma pagina pre-aquecida
+    pelo BrowserService em base_url que ainda nao foi tomada por outro scraper.
+
+    Returns:
+        Page ou None
+    """
+    for context in browser.contexts:
+        for page in context.pages:
+            if not page.url.startswith(base_url):
+                continue
+            try:
+                if page.evaluate(JS_CLAIM_WARM):
+                    return page
+            except Exception:
+                continue
+    return None
+
+
+class BrowserService:
+    """
+    Navegador aberto por tempo indeterminado, com paginas pre-aquecidas em base_url.
+    """
+
+    def __init__(self, profile: str = LAUNCH_PROFILE, pool_size: int = BROWSER_POOL_SIZE,
+                 port: int = None, blocker=None, base_url: str = BASE_URL):
+        """
+        Args:
+            profile: Perfil de LAUNCH_PROFILES
+            pool_size: Quantas paginas manter pre-aquecidas
+            port: Porta do endpoint CDP (None: servico so para uso no mesmo processo)
+            blocker: ResourceBlocker instalado em cada contexto (opcional)
+            base_url: Pagina carregada nas paginas pre-aquecidas (ex: servidor sintetico)
+        """
+        self.profile = profile
+        self.base_url = base_url
+        self.pool_size = max(0, pool_size)
+        self.port = port
+        self.blocker = blocker
+        self.playwright = None
+        self.browser = None
+        self.warm = []
+        self.claimed = []
+        self.timer = StageTimer(f"Servico de navegador (perfil '{profile}')")
+
+    @property
+    def cdp_endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.port}" if self.port else None
+
+    def start(self) -> "BrowserService":
+        """Inicia o Playwright, abre o navegador e aquece o pool."""
+        extra = {"args": [f"--remote-debugging-port={self.port}"]} if self.port else {}
+        with self.timer.stage("playwright"):
+            self.playwright = sync_playwright().start()
+        with self.timer.stage("launch"):
+            self.browser = self.playwright.chromium.launch(**launch_options(self.profile, **extra))
+        for i in range(self.pool_size):
+            self.warm.append(self._warm_page(f"pagina {i + 1}"))
+        self.timer.report()
+        return self
+
+    def _warm_page(self, label: str = "pagina"):
+        """Novo contexto + pagina carregada em base_url, marcada como pre-aquecida."""
+        with self.timer.stage(f"{label}: contexto"):
+            context = self.browser.new_context()
+            if self.blocker:
+                self.blocker.install(context)
+            page = context.new_page()
+        with self.timer.stage(f"{label}: navegacao"):
+            page.goto(self.base_url, wait_until="domcontentloaded")
+            try:
+                page.wait_for_selector("div[id*='ua_treeview']", timeout=10000)
+            except Exception:
+                print("[!] TreeView nao encontrado no tempo esperado (pagina pre-aquecida)")
+            page.evaluate(JS_MARK_WARM)
+        return page
+
+    def acquire(self):
+        """
+        Pagina pre-aquecida para uso no mesmo processo (ou uma nova, se o pool estiver vazio).
+        """
+        while self.warm:
+            page = self.warm.pop(0)
+            if not page.is_closed() and page.evaluate(JS_CLAIM_WARM):
+                return page
+        return self._warm_page()
+
+    def release(self, page):
+        """
+        Devolve uma pagina obtida com acquire(): o contexto (sessao ASP.NET usada)
+        eh descartado e outra pagina eh aquecida no lugar.
+        """
+        try:
+            page.context.close()
+        except Exception:
+            pass
+        self.refill()
+
+    def refill(self):
+        """
+        Repoe o pool: descarta paginas tomadas por scrapers conectados via CDP
+        (fechando o contexto quando o scraper fecha a pagina) e aquece novas.
+        """
+        still_warm = []
+        for page in self.warm:
+            try:
+                if page.is_closed() or page.evaluate(JS_IS_CLAIMED):
+                    self.claimed.append(page)
+                else:
+                    still_warm.append(page)
+            except Exception:
+                self.claimed.append(page)
+        self.warm = still_warm
+
+        for page in list(self.claimed):
+            if page.is_closed():
+                try:
+                    page.context.close()
+                except Exception:
+                    pass
+                self.claimed.remove(page)
+
+        while len(self.warm) < self.pool_size:
+            self.warm.append(self._warm_page())
+
+    def serve(self, interval: float = 1.0):
+        """Mantem o servico no ar, repondo o pool, ate Ctrl+C."""
+        print(f"[*] Navegador disponivel em {self.cdp_endpoint} ({len(self.warm)} pagina(s) pre-aquecida(s))")
+        try:
+            while True:
+                time.sleep(interval)
+                self.refill()
+        except KeyboardInterrupt:
+            pass
+
+    def stop(self):
+        """Fecha o navegador e encerra o Playwright."""
+        if self.browser:
+            self.browser.close()
+        if self.playwright:
+            self.playwright.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main():
+    """
+    Linha de comando: mantem um navegador pre-aquecido para as execucoes do scraper.
+    """
+    parser = argparse.ArgumentParser(description="Servico de navegador pre-aquecido para o SICI")
+    parser.add_argument("--perfil", default="rapido", choices=sorted(LAUNCH_PROFILES))
+    parser.add_argument("--porta", type=int, default=BROWSER_SERVICE_PORT)
+    parser.add_argument("--pool", type=int, default=BROWSER_POOL_SIZE)
+    parser.add_argument("--url", default=BASE_URL, help="Pagina das paginas pre-aquecidas (ex.: servidor sintetico)")
+    args = parser.parse_args()
+
+    with BrowserService(args.perfil, args.pool, args.porta, base_url=args.url) as service:
+        service.serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Controle adaptativo (AIMD) do numero de postbacks simultaneos contra o SICI.
+
+Com varios contextos, um numero fixo de trabalhadores ou deixa o servidor
+ocioso ou aumenta a latencia dele ate os postbacks estourarem o timeout
+(networkidle). AdaptiveLimiter limita quantos postbacks ficam em voo ao mesmo
+tempo e ajusta esse limite pela latencia observada:
+- a cada janela de ADAPTIVE_WINDOW postbacks, se o p95 da janela ficou ate
+  ADAPTIVE_LATENCY_TOLERANCE x o melhor p95 ja visto e o limite foi de fato
+  atingido, o limite sobe 1 (aumento aditivo)
+- se o p95 passou disso, ou no primeiro timeout/erro da janela, o limite eh
+  multiplicado por ADAPTIVE_BACKOFF (reducao multiplicativa) e uma nova janela comeca
+
+Cada janela vira uma linha de metricas (limite, em voo, p50/p95, erros, vazao),
+gravada em ADAPTIVE_METRICS_FILE; report() mostra a vazao media por limite, para
+achar o ponto de maior vazao do servidor.
+"""
+
+import asyncio
+import contextlib
+import csv
+import time
+from pathlib import Path
+
+from .config import (
+    ADAPTIVE_BACKOFF,
+    ADAPTIVE_INITIAL,
+    ADAPTIVE_LATENCY_TOLERANCE,
+    ADAPTIVE_METRICS_FILE,
+    ADAPTIVE_WINDOW,
+)
+from .crawl_trace import _percentile
+
+
+class AdaptiveLimiter:
+    """
+    Semaforo assincrono com limite ajustado por AIMD a partir da latencia dos postbacks.
+    """
+
+    def __init__(self, max_limit: int, initial: int = ADAPTIVE_INITIAL, window: int = ADAPTIVE_WINDOW,
+                 tolerance: float = ADAPTIVE_LATENCY_TOLERANCE, backoff: float = ADAPTIVE_BACKOFF):
+        """
+        Args:
+            max_limit: Teto do limite (numero de contextos trabalhadores)
+            initial: Limite inicial
+            window: Postbacks por janela de avaliacao
+            tolerance: Quanto o p95 pode passar do melhor p95 sem reduzir o limite
+            backoff: Fator de reducao do limite (0 a 1)
+        """
+        self.max_limit = max(1, max_limit)
+        self.limit = float(min(max(1, initial), self.max_limit))
+        self.window = max(1, window)
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self.best_p95 = None
+        self.history = []
+        self._condition = None
+        self._origin = time.perf_counter()
+        self._reduced_at = self._origin
+        self._new_window()
+
+    def _new_window(self):
+        self._latencies = []
+        self._errors = 0
+        self._peak = self.in_flight
+        self._window_start = time.perf_counter()
+
+    @property
+    def permits(self) -> int:
+        """Postbacks que podem ficar em voo agora."""
+        return max(1, int(self.limit))
+
+    async def _acquire(self):
+        if self._condition is None:
+            # Criada no loop em uso (o limitador pode ser construido fora dele)
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.permits)
+            self.in_flight += 1
+            self._peak = max(self._peak, self.in_flight)
+
+    async def _release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """
+        Ocupa uma vaga durante um postback e registra a latencia ao sair.
+        O dict devolvido aceita {"ok": False} para marcar um timeout sem excecao e
+        {"skip": True} quando nenhum postback foi disparado (sem amostra); uma
+        excecao dentro do bloco tambem conta como erro.
+        """
+        await self._acquire()
+        outcome = {"ok": True}
+        start = time.perf_counter()
+        try:
+            yield outcome
+        except Exception:
+            outcome["ok"] = False
+            raise
+        finally:
+            await self._release()
+            if not outcome.get("skip"):
+                await self._record(start, (time.perf_counter() - start) * 1000, outcome["ok"])
+
+    async def _record(self, start: float, latency_ms: float, ok: bool):
+        if start < self._reduced_at:
+            # Postback iniciado antes da ultima reducao: reflete o limite antigo
+            return
+        self._latencies.append(latency_ms)
+        if not ok:
+            self._errors += 1
+            # Reduzir ja no primeiro erro, uma vez por janela
+            await self._close_window("erro")
+        elif len(self._latencies) >= self.window:
+            await self._close_window(None)
+
+    async def _close_window(self, reason: str):
+        """Avalia a janela atual, ajusta o limite e registra a linha de metricas."""
+        values = sorted(self._latencies)
+        p95 = _percentile(values, 95)
+        elapsed = max(time.perf_counter() - self._window_start, 1e-6)
+        previous = self.permits
+
+        if reason is None and self.best_p95 is not None and p95 > self.best_p95 * self.tolerance:
+            reason = "latencia"
+        if reason:
+            self.limit = max(1.0, self.limit * self.backoff)
+            self._reduced_at = time.perf_counter()
+            decision = f"reduz ({reason})"
+        elif self._peak >= previous and self.limit < self.max_limit:
+            # So aumenta se o limite atual chegou a ser usado inteiro
+            self.limit = min(float(self.max_limit), self.limit + 1)
+            decision = "aumenta"
+        else:
+            decision = "mantem"
+        if not self._errors and (self.best_p95 is None or p95 < self.best_p95):
+            self.best_p95 = p95
+
+        self.history.append({
+            "janela": len(self.history) + 1,
+            "inicio_s": round(self._window_start - self._origin, 3),
+            "limite": previous,
+            "em_voo_max": self._peak,
+            "postbacks": len(values),
+            "erros": self._errors,
+            "p50_ms": round(_percentile(values, 50), 1),
+            "p95_ms": round(p95, 1),
+            "vazao_por_s": round(len(values) / elapsed, 2),
+            "decisao": decision,
+        })
+        if reason and self.permits != previous:
+            print(f"[!] Concorrencia {previous} -> {self.permits}: {reason} (p95 {p95:.0f}ms, {self._errors} erro(s))")
+        if self.permits != previous and self._condition is not None:
+            async with self._condition:
+                self._condition.notify_all()
+        self._new_window()
+
+    def metrics(self) -> dict:
+        """Estado atual: limite, postbacks em voo e latencia da ultima janela."""
+        last = self.history[-1] if self.history else {}
+        return {
+            "limite": self.permits,
+            "em_voo": self.in_flight,
+            "melhor_p95_ms": round(self.best_p95, 1) if self.best_p95 is not None else None,
+            "p50_ms": last.get("p50_ms"),
+            "p95_ms": last.get("p95_ms"),
+            "vazao_por_s": last.get("vazao_por_s"),
+        }
+
+    def export(self, metrics_file: str = ADAPTIVE_METRICS_FILE):
+        """Grava uma linha por janela em CSV."""
+        if not self.history:
+            return
+        Path(metrics_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(metrics_file, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.history[0]))
+            writer.writeheader()
+            writer.writerows(self.history)
+
+    def report(self):
+        """Imprime vazao media e p95 por limite de concorrencia e o limite de maior vazao."""
+        if not self.history:
+            return
+        by_limit = {}
+        for row in self.history:
+            by_limit.setdefault(row["limite"], []).append(row)
+
+        print("[*] Concorrencia adaptativa (por limite de postbacks simultaneos):")
+        best = max(by_limit, key=lambda k: sum(r["vazao_por_s"] for r in by_limit[k]) / len(by_limit[k]))
+        for limit in sorted(by_limit):
+            rows = by_limit[limit]
+            throughput = sum(r["vazao_por_s"] for r in rows) / len(rows)
+            p95 = max(r["p95_ms"] for r in rows)
+            errors = sum(r["erros"] for r in rows)
+            mark = "  <- maior vazao" if limit == best else ""
+            print(f"    {limit:>3}: {len(rows):>4} janela(s)  {throughput:7.2f} postbacks/s  "
+                  f"p95 ate {p95:7.0f}ms  {errors} erro(s){mark}")
+        print(f"    Limite final: {self.permits}")
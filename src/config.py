@@ -21,3 +21,154 @@ CLICK_TIMEOUT = 700
 # Timeout padrão entre rodadas de expansão de nós
 ROUND_TIMEOUT = 1000
 
+# Limite superior (em ms) de espera por um postback do ASP.NET.
+# A espera termina assim que a resposta chega e o container/painel alvo muda;
+# este valor so eh atingido se o servidor nao responder.
+POSTBACK_TIMEOUT = 10000
+
+
+# Motor de coleta: "sync" (SiciSmsScraper, uma pagina), "async"
+# (AsyncSiciSmsScraper, varios contextos em paralelo), "http"
+# (HttpPostbackCrawler, postbacks via HTTP sem navegador) ou "sharded"
+# (um SiciSmsScraper por processo, cada um com um filho de SMS por vez)
+ENGINE = "sync"
+
+# Numero de contextos isolados do navegador usados pelo motor assincrono.
+# Cada contexto tem sua propria sessao ASP.NET e percorre um filho de SMS por vez.
+ASYNC_CONTEXTS = 4
+
+# Coleta em varios processos (ENGINE = "sharded", ver src/sharded_crawl.py):
+# numero de processos (None: um por nucleo) e pasta com o estado de cada ramo
+SHARD_PROCESSES = None
+SHARD_DIR = "data/ramos"
+
+# Concorrencia adaptativa (AIMD) do motor assincrono, com ASYNC_CONTEXTS como teto:
+# o limite de postbacks simultaneos comeca em ADAPTIVE_INITIAL, sobe 1 a cada
+# janela de ADAPTIVE_WINDOW postbacks com p95 de ate ADAPTIVE_LATENCY_TOLERANCE x
+# o melhor p95 visto, e eh multiplicado por ADAPTIVE_BACKOFF quando o p95 passa
+# disso ou aparece um timeout. Metricas por janela em ADAPTIVE_METRICS_FILE
+ADAPTIVE_CONCURRENCY = True
+ADAPTIVE_INITIAL = 2
+ADAPTIVE_WINDOW = 20
+ADAPTIVE_LATENCY_TOLERANCE = 1.5
+ADAPTIVE_BACKOFF = 0.5
+ADAPTIVE_METRICS_FILE = "data/concorrencia.csv"
+
+# Crawler HTTP: tamanho do pool de conexoes, timeout por requisicao (ms)
+# e pasta para gravar as respostas (None para nao gravar)
+HTTP_POOL_SIZE = 4
+HTTP_TIMEOUT = 30000
+HTTP_RECORD_DIR = None
+
+# Recoleta incremental (motor sincrono): nos estaveis sao clicados/extraidos
+# com intervalo crescente (1, 2, 4... execucoes, ate RECRAWL_MAX_INTERVAL);
+# a arvore continua sendo expandida em toda execucao para detectar inclusoes/remocoes
+RECRAWL_SCHEDULE = True
+RECRAWL_MAX_INTERVAL = 8
+RECRAWL_STATE_FILE = "collected_data/_agenda_recoleta.json"
+
+# Diario append-only dos nos concluidos (motor sincrono). Se a coleta for
+# interrompida, a proxima execucao retoma do primeiro no nao concluido.
+# CRAWL_RESTARTS: quantas vezes run() reabre o navegador e retoma apos uma falha
+CRAWL_JOURNAL_FILE = "collected_data/_diario_coleta.jsonl"
+CRAWL_RESTARTS = 2
+
+# Orgaos de primeiro nivel percorridos pelo motor sincrono: textos dos nos
+# (ex: ["SMS", "SMF"]) ou "todos". Com outra lista alem de ["SMS"], todos sao
+# coletados na mesma sessao do navegador, cada um com estado e saidas proprios
+# em ROOTS_DIR/<orgao>/ (SMS mantem os arquivos padrao; ver SiciSmsScraper.run_roots).
+# Os outros motores (ENGINE != "sync") so percorrem SMS e recusam outra lista
+ROOTS = ["SMS"]
+ROOTS_DIR = "data/orgaos"
+
+# Ordem de visita da fronteira de coleta (ver src/crawl_frontier.py): "dfs"
+# (em profundidade, na ordem de exibicao; menos reexpansoes), "bfs" (um nivel
+# inteiro antes do proximo; estrutura primeiro) ou "desatualizados" (nos ha mais
+# tempo sem visita na agenda de recoleta primeiro; so o motor sincrono tem agenda,
+# nos motores async e http equivale a "bfs")
+CRAWL_ORDER = "dfs"
+
+# Nos que falham durante a passada (motor sincrono) vao para uma fila de novas
+# tentativas, processada ao final com espera exponencial (RETRY_BACKOFF_BASE *
+# 2^(tentativa-1) s, ate RETRY_MAX_ATTEMPTS tentativas por no). Apos BREAKER_THRESHOLD
+# falhas seguidas sob o mesmo pai, os irmaos restantes sao adiados sem clique.
+# Os caminhos que continuarem falhando sao listados em INCOMPLETE_PATHS_FILE
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 2.0
+BREAKER_THRESHOLD = 3
+INCOMPLETE_PATHS_FILE = "data/caminhos_incompletos.json"
+
+# Armazenamento dos dados por no: "dirs" (um diretorio + um JSON por no em
+# COLLECTED_DATA_DIR), "jsonl" (um unico arquivo append-only, gravado em lotes;
+# o layout de diretorios pode ser gerado com: python -m src.node_store export)
+# ou "interned" (como jsonl, com os valores repetidos em uma tabela de strings
+# compartilhada e os lotes comprimidos, em INTERNED_STORE_FILE)
+STORAGE_BACKEND = "jsonl"
+NODE_STORE_FILE = "collected_data/nos.jsonl"
+INTERNED_STORE_FILE = "collected_data/nos.interned"
+NODE_STORE_BATCH = 50
+
+# Banco SQLite com as unidades coletadas (consultas por bairro, CEP, titular...);
+# atualizado a cada no salvo. None para desativar
+UNIT_INDEX_DB = "data/unidades.db"
+
+# Registro NDJSON (caminho, pai, profundidade, info) gravado a cada no extraido
+# pelo motor sincrono; sms_informacoes.json e resumo.json sao gerados a partir dele
+TREE_STREAM_FILE = "data/arvore_sms.ndjson"
+
+# Bloqueio de recursos nao essenciais em cada contexto do navegador.
+# Folhas de estilo ficam liberadas: a extracao usa innerText, que depende do layout
+BLOCK_RESOURCES = True
+BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+BLOCKED_HOSTS = (
+    "*google-analytics.com",
+    "*googletagmanager.com",
+    "*doubleclick.net",
+    "*facebook.net",
+    "*hotjar.com",
+    "*clarity.ms",
+)
+BLOCK_THIRD_PARTY_SCRIPTS = False
+# Descobrir (com um HEAD por URL) o tamanho do que foi bloqueado, para o relatorio.
+# Desligado por padrao: cada HEAD eh uma requisicao a mais ao SICI e atrasa a rota
+MEASURE_BLOCKED_BYTES = False
+
+# Perfil de inicializacao do Chromium (ver src/browser_service.py):
+# "padrao" (janela conforme HEADLESS), "rapido" (headless, sem GPU/extensoes) ou "visual"
+LAUNCH_PROFILE = "padrao"
+
+# Servico de navegador de longa duracao (python -m src.browser_service):
+# se BROWSER_CDP_ENDPOINT estiver definido, o scraper se conecta a ele e usa uma
+# pagina pre-aquecida em vez de abrir um Chromium novo
+BROWSER_CDP_ENDPOINT = None
+BROWSER_SERVICE_PORT = 9222
+BROWSER_POOL_SIZE = 2
+
+# Spans de tempo por fase de cada no (clique, extracao, gravacao, expansao...),
+# exportados ao final da coleta como trace do Chrome (chrome://tracing, Perfetto)
+# e como resumo CSV com p50/p95/p99 por fase
+TRACE_SPANS = True
+TRACE_FILE = "data/trace_coleta.json"
+TRACE_SUMMARY_FILE = "data/trace_fases.csv"
+
+# Contabilidade das chamadas do Playwright (tipo, bytes e latencia, por no),
+# com tabela de orcamento ao final da coleta. MAX_CALLS_PER_NODE eh o orcamento
+# de chamadas por no: acima dele o relatorio avisa e o benchmark reprova a execucao
+PAGE_ACCOUNTING = True
+MAX_CALLS_PER_NODE = 15
+
+# Regras de categorizacao dos rotulos do painel (JSON, ver src/label_rules.json);
+# None usa o arquivo padrao distribuido com o codigo
+LABEL_RULES_FILE = None
+
+# Gravacao/reproducao do trafego do navegador (ver src/traffic_archive.py):
+# "gravar" guarda cada requisicao/resposta em TRAFFIC_ARCHIVE_DIR; "reproduzir"
+# atende a coleta inteira a partir dessa pasta, sem rede. None desativa
+TRAFFIC_ARCHIVE_MODE = None
+TRAFFIC_ARCHIVE_DIR = "data/arquivo_trafego"
+
+# HTML do painel de detalhes de cada no (pagina sem a arvore), gravado comprimido
+# para reextrair os dados sem navegador apos uma mudanca no parser:
+#   python -m src.panel_snapshots reextrair
+PANEL_SNAPSHOTS = True
+PANEL_SNAPSHOT_DIR = "data/paineis"
@@ -0,0 +1,110 @@
+"""
+Fronteira da coleta: fila de tarefas de visita, uma por no, com ordem configuravel.
+
+Os motores nao percorrem mais a arvore por recursao. Cada no visitado (clique,
+extracao, gravacao e expansao) devolve seus filhos, que entram na fronteira
+como novas tarefas; a proxima tarefa eh a de maior prioridade segundo CRAWL_ORDER:
+- "dfs": em profundidade, na ordem de exibicao (a mesma da antiga recursao);
+  cada subarvore termina antes da proxima, com o minimo de reexpansoes
+- "bfs": em largura, um nivel inteiro antes do proximo (cobertura rapida da
+  estrutura: todos os orgaos de primeiro nivel antes dos seus filhos)
+- "desatualizados": primeiro os nos ha mais tempo sem visita, pela agenda de
+  recoleta (nos nunca visitados antes de todos); empates em largura
+
+SubtreeTracker acompanha quantos filhos de cada no ainda estao pendentes, para
+saber quando uma subarvore inteira terminou (registro no diario de coleta)
+independente da ordem em que as tarefas foram atendidas.
+"""
+
+import heapq
+import itertools
+
+from .config import CRAWL_ORDER
+from .tree_model import path_key
+
+ORDERS = ("dfs", "bfs", "desatualizados")
+
+
+class Frontier:
+    """
+    Fila de prioridade de tarefas {"caminho": [...], ...}.
+    """
+
+    def __init__(self, order: str = CRAWL_ORDER, staleness=None):
+        """
+        Args:
+            order: "dfs", "bfs" ou "desatualizados"
+            staleness: Funcao caminho -> quanto o no esta desatualizado (maior
+                       primeiro); usada so com "desatualizados"
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Ordem de coleta invalida: {order!r} (use {', '.join(ORDERS)})")
+        self.order = order
+        self.staleness = staleness or (lambda path: 0.0)
+        self.pushed = 0
+        self.max_size = 0
+        self._heap = []
+        self._seq = itertools.count()
+
+    def _priority(self, path: list, seq: int) -> tuple:
+        depth = len(path)
+        if self.order == "dfs":
+            return (-depth, seq)
+        if self.order == "bfs":
+            return (depth, seq)
+        return (-self.staleness(path), depth, seq)
+
+    def push(self, task: dict):
+        """Acrescenta uma tarefa (precisa de "caminho")."""
+        seq = next(self._seq)
+        heapq.heappush(self._heap, (self._priority(task["caminho"], seq), seq, task))
+        self.pushed += 1
+        self.max_size = max(self.max_size, len(self._heap))
+
+    def pop(self) -> dict:
+        """Proxima tarefa segundo a ordem configurada."""
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class SubtreeTracker:
+    """
+    Conclusao das subarvores na fronteira: um no esta concluido quando ele e
+    todos os seus descendentes terminaram sem falha.
+    """
+
+    def __init__(self, on_complete=None):
+        """
+        Args:
+            on_complete: Funcao chamada com o caminho de cada subarvore concluida
+        """
+        self.on_complete = on_complete
+        self._pending = {}
+        self._ok = {}
+
+    def expanded(self, path: list, children: int):
+        """O no foi visitado e tem `children` filhos na fronteira (0: subarvore concluida)."""
+        if children == 0:
+            self.finished(path, True)
+            return
+        key = path_key(path)
+        self._pending[key] = children
+        self._ok[key] = True
+
+    def finished(self, path: list, ok: bool):
+        """A subarvore do no terminou (ok False: falhou ou ficou para nova tentativa)."""
+        if ok and self.on_complete:
+            self.on_complete(path)
+        if len(path) < 2:
+            return
+        parent = path[:-1]
+        key = path_key(parent)
+        if key not in self._pending:
+            return
+        self._ok[key] = self._ok[key] and ok
+        self._pending[key] -= 1
+        if self._pending[key] == 0:
+            del self._pending[key]
+            self.finished(parent, self._ok.pop(key))
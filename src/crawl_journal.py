@@ -0,0 +1,114 @@
+"""
+Diario (journal) da coleta, gravado em modo append a cada no concluido.
+
+Se o Chromium cair ou o site parar de responder no meio da arvore, a proxima
+execucao (ou o reinicio automatico em SiciSmsScraper.run) le o diario e:
+- nao clica nem extrai de novo os nos ja registrados
+- pula inteiras as subarvores marcadas como concluidas
+- so re-expande os ancestrais do primeiro no ainda nao concluido
+
+Cada linha eh um JSON independente:
+    {"tipo": "no", "caminho": [...], "info": {...}}       no extraido (info None se pulado pela agenda)
+    {"tipo": "subarvore", "caminho": [...]}               no e todos os descendentes concluidos
+Uma linha truncada no fim (queda durante a gravacao) eh ignorada na leitura.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from .config import CRAWL_JOURNAL_FILE
+from .tree_model import path_key
+
+
+class CrawlJournal:
+    """
+    Registro append-only dos nos concluidos, usado para retomar uma coleta interrompida.
+    """
+
+    def __init__(self, journal_file: str = CRAWL_JOURNAL_FILE):
+        """
+        Args:
+            journal_file: Arquivo JSONL do diario
+        """
+        self.journal_file = Path(journal_file)
+        self.nodes = {}
+        self.paths = {}
+        self.subtrees = set()
+        self._needs_newline = False
+        self._load()
+
+    def _load(self):
+        """Le o diario existente, ignorando linhas incompletas."""
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            line = ""
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                key = path_key(entry.get("caminho", []))
+                if entry.get("tipo") == "no":
+                    self.nodes[key] = entry.get("info")
+                    self.paths[key] = entry.get("caminho", [])
+                elif entry.get("tipo") == "subarvore":
+                    self.subtrees.add(key)
+            # Ultima linha truncada: a proxima gravacao comeca numa linha nova
+            self._needs_newline = bool(line) and not line.endswith("\n")
+
+        if self.nodes:
+            print(f"[*] Diario de coleta encontrado: retomando com {len(self.nodes)} no(s) ja concluido(s)")
+
+    def _append(self, entry: dict):
+        """Grava uma linha e forca a escrita em disco."""
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        entry["timestamp"] = datetime.now().isoformat()
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            if self._needs_newline:
+                f.write("\n")
+                self._needs_newline = False
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def is_node_done(self, path: list) -> bool:
+        """True se o no ja foi clicado/extraido (ou pulado pela agenda) numa tentativa anterior."""
+        return path_key(path) in self.nodes
+
+    def is_subtree_done(self, path: list) -> bool:
+        """True se o no e todos os seus descendentes ja foram concluidos."""
+        return path_key(path) in self.subtrees
+
+    def node_info(self, path: list) -> dict:
+        """Informacoes registradas para o no (ou None)."""
+        return self.nodes.get(path_key(path))
+
+    def completed_nodes(self):
+        """(caminho, info) de cada no concluido, na ordem em que foram registrados."""
+        for key, info in self.nodes.items():
+            yield self.paths[key], info
+
+    def record_node(self, path: list, info: dict = None):
+        """Registra um no concluido."""
+        self.nodes[path_key(path)] = info
+        self.paths[path_key(path)] = list(path)
+        self._append({"tipo": "no", "caminho": list(path), "info": info})
+
+    def record_subtree(self, path: list):
+        """Registra que o no e toda a sua subarvore foram concluidos."""
+        self.subtrees.add(path_key(path))
+        self._append({"tipo": "subarvore", "caminho": list(path)})
+
+    def clear(self):
+        """Coleta completa: remove o diario para a proxima execucao comecar do zero."""
+        self.nodes = {}
+        self.paths = {}
+        self.subtrees = set()
+        if self.journal_file.exists():
+            self.journal_file.unlink()
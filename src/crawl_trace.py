@@ -0,0 +1,163 @@
+"""
+Spans de tempo por fase do processamento de cada no.
+
+Cada fase (clique no no, extracao, gravacao, expansao, leitura da arvore) vira
+um span com o caminho e a profundidade do no. Ao final da coleta os spans sao
+exportados em dois formatos:
+- TRACE_FILE: JSON de trace events do Chrome (abrir em chrome://tracing ou
+  https://ui.perfetto.dev), um evento "X" por span
+- TRACE_SUMMARY_FILE: CSV com contagem, total, media, p50, p95, p99 e maximo
+  (em ms) de cada fase
+
+No motor assincrono cada contexto trabalhador tem sua propria trilha (tid),
+definida com track() no inicio da tarefa.
+"""
+
+import contextvars
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .config import TRACE_FILE, TRACE_SUMMARY_FILE
+from .tree_model import path_key
+
+# Trilha atual (tid no trace); tarefas asyncio herdam o valor de quem as criou
+_track = contextvars.ContextVar("crawl_trace_track", default=None)
+
+
+def _percentile(values: list, p: float) -> float:
+    """Percentil com interpolacao linear sobre uma lista ja ordenada."""
+    if not values:
+        return 0.0
+    pos = (len(values) - 1) * p / 100
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+
+class CrawlTracer:
+    """
+    Coleta spans (fase, caminho, profundidade, inicio, duracao) em memoria.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: Se False, span() nao mede nada (custo praticamente zero)
+        """
+        self.enabled = enabled
+        self.spans = []
+        self.tracks = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def track(self, name: str):
+        """Define a trilha (tid) dos spans da tarefa/thread atual, ex: "ctx 2"."""
+        _track.set(name)
+
+    @contextmanager
+    def span(self, phase: str, path: list = None, **args):
+        """
+        Mede o bloco como uma fase do no informado.
+
+        Args:
+            phase: Nome da fase (ex: "clique", "extracao", "gravacao")
+            path: Nomes dos nos desde a raiz ate o no
+            **args: Informacoes extras gravadas no evento
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            track = _track.get() or threading.current_thread().name
+            with self._lock:
+                tid = self.tracks.setdefault(track, len(self.tracks) + 1)
+                self.spans.append((phase, tuple(path) if path else (), start, end - start, tid, args))
+
+    def phases(self) -> dict:
+        """{fase: [duracoes em ms, ordenadas]}."""
+        by_phase = {}
+        for phase, _, _, duration, _, _ in self.spans:
+            by_phase.setdefault(phase, []).append(duration * 1000)
+        for values in by_phase.values():
+            values.sort()
+        return by_phase
+
+    def summary(self) -> list:
+        """Uma linha por fase com contagem, total, media, p50, p95, p99 e maximo (ms)."""
+        rows = []
+        for phase, values in sorted(self.phases().items(), key=lambda item: -sum(item[1])):
+            total = sum(values)
+            rows.append({
+                "fase": phase,
+                "contagem": len(values),
+                "total_ms": round(total, 3),
+                "media_ms": round(total / len(values), 3),
+                "p50_ms": round(_percentile(values, 50), 3),
+                "p95_ms": round(_percentile(values, 95), 3),
+                "p99_ms": round(_percentile(values, 99), 3),
+                "max_ms": round(values[-1], 3),
+            })
+        return rows
+
+    def export_chrome(self, trace_file: str = TRACE_FILE) -> int:
+        """
+        Grava os spans no formato de trace events do Chrome.
+
+        Returns:
+            int: Numero de eventos gravados
+        """
+        Path(trace_file).parent.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        with open(trace_file, "w", encoding="utf-8") as f:
+            f.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+            # Nomes das trilhas
+            meta = [
+                {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": track}}
+                for track, tid in self.tracks.items()
+            ]
+            f.write(",\n".join(json.dumps(event, ensure_ascii=False) for event in meta))
+            for phase, path, start, duration, tid, args in self.spans:
+                event = {
+                    "name": phase,
+                    "cat": "no",
+                    "ph": "X",
+                    "ts": round((start - self._origin) * 1e6, 1),
+                    "dur": round(duration * 1e6, 1),
+                    "pid": pid,
+                    "tid": tid,
+                    "args": dict(args, caminho=path_key(path), profundidade=len(path) - 1 if path else None),
+                }
+                f.write(",\n" + json.dumps(event, ensure_ascii=False))
+            f.write("\n]}\n")
+        return len(self.spans)
+
+    def export_csv(self, summary_file: str = TRACE_SUMMARY_FILE):
+        """Grava o resumo por fase em CSV."""
+        Path(summary_file).parent.mkdir(parents=True, exist_ok=True)
+        columns = ["fase", "contagem", "total_ms", "media_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+        with open(summary_file, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(self.summary())
+
+    def export(self, trace_file: str = TRACE_FILE, summary_file: str = TRACE_SUMMARY_FILE):
+        """Exporta o trace e o resumo e imprime as fases mais demoradas."""
+        if not self.enabled or not self.spans:
+            return
+        count = self.export_chrome(trace_file)
+        self.export_csv(summary_file)
+        print(f"[*] {count} spans gravados em {trace_file} (resumo em {summary_file})")
+        for row in self.summary():
+            print(
+                f"    {row['fase']:<16} n={row['contagem']:<6} total {row['total_ms'] / 1000:.2f}s  "
+                f"p50 {row['p50_ms']:.1f}ms  p95 {row['p95_ms']:.1f}ms  p99 {row['p99_ms']:.1f}ms"
+            )
@@ -0,0 +1,337 @@
+"""
+Extracao de dados do SICI a partir do HTML, sem navegador.
+
+Reproduz em Python puro os trechos de JavaScript de tree_scripts.py, para
+que o crawler HTTP (e qualquer processamento offline) obtenha os mesmos
+pares rotulo/valor, titulo e decreto que o navegador obteria.
+
+O texto dos elementos segue as regras principais do innerText do navegador:
+elementos de bloco quebram linha, celulas de tabela (inclusive DIVs com display:table-cell)
+sao separadas por TAB, espacos sao colapsados e elementos com display:none sao ignorados.
+"""
+
+import re
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+
+# Mesmo seletor usado em JS_EXTRACT_PAIRS para o painel de detalhes
+CONTENT_AREA_SELECTOR = '#ContentPlaceHolder1_cphConteudo_divConteudoUA, [id*="Conteudo"], .content, main'
+
+# Mesmo seletor usado em JS_EXTRACT_TITLE
+TITLE_SELECTOR = 'h1, h2, h3, [class*="titulo"], .header'
+
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "caption", "center", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "option", "p", "pre", "section", "table",
+    "tbody", "tfoot", "thead", "tr", "ul",
+}
+SKIP_TAGS = {"head", "script", "style", "noscript", "template", "title", "meta", "link"}
+
+_HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+_DISPLAY_STYLE = re.compile(r"display\s*:\s*([\w-]+)", re.I)
+_POSTBACK_HREF = re.compile(r"__doPostBack\(\s*'([^']*)'\s*,\s*'([^']*)'\s*\)")
+_NODE_INDEX = re.compile(r"t(\d+)i?$")
+_TREE_DIV = re.compile(r'<div\b[^>]*\bid="[^"]*ua_treeview"[^>]*>', re.I)
+_DIV_TAG = re.compile(r"<(/?)div\b", re.I)
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    """Faz o parse de uma pagina do SICI."""
+    return BeautifulSoup(html, "html.parser")
+
+
+def strip_tree(html: str) -> str:
+    """
+    HTML da pagina com o ua_treeview vazio (so as tags de abertura e fechamento),
+    sem fazer o parse: o restante da pagina (formulario, dropdown e painel de
+    detalhes) eh uma fracao pequena do documento.
+
+    Returns:
+        str: HTML sem o conteudo da arvore, ou None se o ua_treeview nao foi encontrado
+    """
+    start = _TREE_DIV.search(html)
+    if not start:
+        return None
+    depth = 1
+    for match in _DIV_TAG.finditer(html, start.end()):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return html[:start.end()] + html[match.start():]
+    return None
+
+
+def _is_hidden(el: Tag) -> bool:
+    """Elemento oculto por estilo inline ou atributo hidden."""
+    if el.has_attr("hidden"):
+        return True
+    if el.name == "input" and (el.get("type") or "").lower() == "hidden":
+        return True
+    return bool(_HIDDEN_STYLE.search(el.get("style") or ""))
+
+
+def _display(el: Tag) -> str:
+    """Valor de display do estilo inline (ex: "table-cell"), ou None."""
+    match = _DISPLAY_STYLE.search(el.get("style") or "")
+    return match.group(1).lower() if match else None
+
+
+def _is_rendered(el: Tag) -> bool:
+    """Falso se o elemento ou algum ancestral esta oculto."""
+    node = el
+    while isinstance(node, Tag):
+        if _is_hidden(node):
+            return False
+        node = node.parent
+    return True
+
+
+def inner_text(el: Tag) -> str:
+    """
+    Aproximacao do innerText do navegador.
+    Como no navegador, um elemento que nao esta renderizado retorna seu textContent.
+    """
+    if el is None:
+        return ""
+    if not _is_rendered(el):
+        return el.get_text()
+
+    parts = []
+
+    def walk(node):
+        if isinstance(node, Comment):
+            return
+        if isinstance(node, NavigableString):
+            parts.append(re.sub(r"[ \n\r\f\v]+", " ", str(node)))
+            return
+        if node.name in SKIP_TAGS or _is_hidden(node):
+            return
+        if node.name == "br":
+            parts.append("\n")
+            return
+        display = _display(node)
+        if node.name in ("td", "th") and node.find_previous_sibling(["td", "th"]) is not None:
+            parts.append("\t")
+        elif display == "table-cell":
+            # DIVs com CSS de tabela (Titular/Cargo lado a lado): celulas separadas por TAB
+            previous = node.find_previous_sibling(True)
+            if previous is not None and _display(previous) == "table-cell":
+                parts.append("\t")
+
+        is_block = (node.name in BLOCK_TAGS and display not in ("table-cell", "inline", "inline-block")) or display in ("block", "table", "table-row")
+        if is_block:
+            parts.append("\n\n" if node.name in ("p", "h1", "h2", "h3", "h4", "h5", "h6") else "\n")
+        for child in node.children:
+            walk(child)
+        if is_block:
+            parts.append("\n\n" if node.name in ("p", "h1", "h2", "h3", "h4", "h5", "h6") else "\n")
+
+    walk(el)
+
+    # Remover espacos colapsaveis nas bordas das linhas e limitar quebras seguidas
+    lines = [line.strip(" ") for line in "".join(parts).split("\n")]
+    text = "\n".join(lines)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip("\n")
+
+
+def extract_title(soup: BeautifulSoup) -> str:
+    """Equivalente a JS_EXTRACT_TITLE."""
+    header = soup.select_one(TITLE_SELECTOR)
+    return inner_text(header).strip() if header else None
+
+
+def extract_decreto(soup: BeautifulSoup) -> str:
+    """Equivalente a JS_EXTRACT_DECRETO."""
+    body = soup.body or soup
+    match = re.search(r"Decreto[^\n]*", inner_text(body), re.I)
+    return match.group(0) if match else None
+
+
+def extract_pairs(soup: BeautifulSoup) -> list:
+    """
+    Equivalente a JS_EXTRACT_PAIRS: pares das tabelas de 2 colunas e dos
+    padroes de texto (Titular/Cargo, Endereco, Bairro/CEP) do painel de detalhes.
+    """
+    all_pairs = []
+
+    # MÉTODO 1: tabelas com 2 colunas (Comunicações)
+    for table in soup.find_all("table"):
+        for row in table.find_all("tr"):
+            cells = [inner_text(c).strip() for c in row.find_all(["td", "th"])]
+            if len(cells) == 2 and cells[0] and cells[1]:
+                label, value = cells
+                if 0 < len(label) < 100 and value and label != value:
+                    all_pairs.append({"label": label, "value": value, "method": "table"})
+
+    # MÉTODO 2: padrões no texto do painel de detalhes
+    content_area = soup.select_one(CONTENT_AREA_SELECTOR) or soup.body or soup
+    lines = [l.strip() for l in inner_text(content_area).split("\n")]
+    lines = [l for l in lines if l]
+
+    i = 0
+    while i < len(lines) - 1:
+        line = lines[i]
+        next_line = lines[i + 1]
+
+        is_header = (("Titular" in line and "Cargo" in line)
+                     or "Endereço" in line or "Endereco" in line
+                     or ("Bairro" in line and "CEP" in line))
+        if is_header:
+            labels = [s.strip() for s in re.split(r"\s{2,}|\t", line) if s.strip()]
+            values = [s.strip() for s in re.split(r"\s{2,}|\t", next_line) if s.strip()]
+
+            if len(labels) == len(values):
+                for label, value in zip(labels, values):
+                    if label and value and label != value:
+                        all_pairs.append({"label": label, "value": value, "method": "text-pattern"})
+                i += 1  # Pular a linha de valores
+        i += 1
+
+    return all_pairs
+
+
+def extract_payload(soup: BeautifulSoup) -> dict:
+    """
+    Titulo, decreto e pares do no selecionado, no formato que
+    SiciSmsScraper._build_node_info recebe.
+    """
+    return {
+        "titulo": extract_title(soup),
+        "decreto": extract_decreto(soup),
+        "pairs": extract_pairs(soup),
+    }
+
+
+def parse_postback(href: str) -> tuple:
+    """
+    Extrai (__EVENTTARGET, __EVENTARGUMENT) de um href javascript:__doPostBack(...).
+
+    Returns:
+        tuple: (target, argument) ou None se o link nao for um postback
+    """
+    match = _POSTBACK_HREF.search(href or "")
+    if not match:
+        return None
+    # O argumento vem escapado para string JS (ex: 'sSMS\\\\CAP 1')
+    return match.group(1), match.group(2).replace("\\\\", "\\")
+
+
+def find_node_by_text(soup: BeautifulSoup, text: str) -> str:
+    """ID do primeiro link da arvore cujo texto eh exatamente o informado (ou None)."""
+    for link in soup.select('a[id*="ua_treeview"]'):
+        if inner_text(link).strip() == text:
+            return link.get("id")
+    return None
+
+
+def children_container_id(node_id: str) -> str:
+    """ContentPlaceHolder1_ua_treeviewt31 -> ContentPlaceHolder1_ua_treeviewn31Nodes"""
+    match = _NODE_INDEX.search(node_id or "")
+    return f"ContentPlaceHolder1_ua_treeviewn{match.group(1)}Nodes" if match else None
+
+
+def list_children(soup: BeautifulSoup, parent_id: str) -> list:
+    """Filhos diretos de um no: [{id, text}] do container ...n{N}Nodes (mesmo criterio de JS_HARVEST_TREE)."""
+    container_id = children_container_id(parent_id)
+    container = soup.find(id=container_id) if container_id else None
+    if container is None:
+        return []
+
+    children = []
+    seen_ids = set()
+    for link in container.select('a[id*="treeview"]'):
+        link_id = link.get("id")
+        if link_id in seen_ids:
+            continue
+        seen_ids.add(link_id)
+
+        text = inner_text(link).strip()
+        if text and text != "0":  # Ignorar placeholder "0"
+            children.append({"id": link_id, "text": text})
+    return children
+
+
+def expander_link(soup: BeautifulSoup, node_id: str) -> Tag:
+    """
+    Link do icone +/- na mesma <tr> do link de texto (mesmo criterio de JS_CLICK_EXPANDER).
+    """
+    text_link = soup.find(id=node_id)
+    tr = text_link.find_parent("tr") if text_link else None
+    if tr is None:
+        return None
+
+    for link in tr.find_all("a"):
+        img = link.find("img")
+        if img is None:
+            continue
+        alt = img.get("alt") or ""
+        src = img.get("src") or ""
+        if "Expand" in alt or "Collapse" in alt or "plus" in src or "minus" in src:
+            return link
+    return None
+
+
+def has_expander(soup: BeautifulSoup, node_id: str) -> bool:
+    """Equivalente a JS_HAS_EXPANDER (apenas o alt Expand/Collapse)."""
+    link = expander_link(soup, node_id)
+    if link is None:
+        return False
+    alt = link.find("img").get("alt") or ""
+    return "Expand" in alt or "Collapse" in alt
+
+
+def form_fields(soup: BeautifulSoup) -> tuple:
+    """
+    Campos do formulario principal como o navegador os enviaria num postback.
+
+    Returns:
+        tuple: (action, dict de campos)
+    """
+    form = soup.find("form") or soup
+    fields = {}
+
+    for inp in form.find_all("input"):
+        name = inp.get("name")
+        if not name:
+            continue
+        input_type = (inp.get("type") or "text").lower()
+        if input_type in ("submit", "button", "image", "reset", "file"):
+            continue
+        if input_type in ("checkbox", "radio") and not inp.has_attr("checked"):
+            continue
+        fields[name] = inp.get("value", "")
+
+    for select in form.find_all("select"):
+        name = select.get("name")
+        if not name:
+            continue
+        option = current_option(select)
+        if option is not None:
+            fields[name] = option.get("value", inner_text(option).strip())
+
+    for textarea in form.find_all("textarea"):
+        if textarea.get("name"):
+            fields[textarea["name"]] = textarea.get_text()
+
+    action = form.get("action") if isinstance(form, Tag) and form.name == "form" else None
+    return action, fields
+
+
+def current_option(select: Tag) -> Tag:
+    """Opcao atual de um dropdown (equivalente a select.value): a marcada como selected ou a primeira."""
+    return select.find("option", selected=True) or select.find("option")
+
+
+def find_info_gerais_select(soup: BeautifulSoup) -> tuple:
+    """
+    Dropdown com a opcao "Informacoes Gerais" (mesmo criterio de JS_EXTRACT_NODE).
+
+    Returns:
+        tuple: (select, option) ou (None, None)
+    """
+    for select in soup.find_all("select"):
+        for option in select.find_all("option"):
+            text = inner_text(option).strip()
+            if "Informações Gerais" in text or "Informacoes Gerais" in text:
+                return select, option
+    return None, None
@@ -0,0 +1,389 @@
+"""
+Crawler HTTP (sem navegador) para o TreeView do SICI.
+
+O ua_treeview eh um TreeView classico do ASP.NET WebForms: cada link chama
+__doPostBack(target, argumento), e o servidor devolve a pagina inteira com a
+arvore e o painel de detalhes atualizados. Este crawler reproduz esses postbacks
+com uma sessao HTTP (conexoes reaproveitadas) enviando os campos do formulario
+(__VIEWSTATE, __EVENTVALIDATION, ...) e faz o parse do HTML no Python.
+
+- O argumento de selecao do no ('s' + caminho de valores) identifica o no de forma
+  estavel entre postbacks; os IDs ...t{N} podem mudar quando a arvore eh redesenhada
+- Os dados de cada no sao extraidos por html_extract (mesma logica dos scripts JS)
+  e categorizados por _build_node_info, gerando os mesmos dicts de info
+- Com record_dir, cada resposta eh gravada para ser servida depois por standin_server
+"""
+
+import contextlib
+import json
+from pathlib import Path
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import BASE_URL, CRAWL_ORDER, HTTP_POOL_SIZE, HTTP_TIMEOUT, HTTP_RECORD_DIR
+from .crawl_frontier import Frontier
+from .html_extract import (
+    current_option,
+    expander_link,
+    extract_payload,
+    find_info_gerais_select,
+    find_node_by_text,
+    form_fields,
+    has_expander,
+    list_children,
+    parse_html,
+    parse_postback,
+    strip_tree,
+)
+from .sici_scraper import SiciSmsScraper
+
+
+class HttpPostbackCrawler(SiciSmsScraper):
+    """
+    Modo alternativo de coleta: reproduz os postbacks do TreeView via HTTP.
+    Reaproveita de SiciSmsScraper a categorizacao, a gravacao por no e o run().
+    """
+
+    def __init__(self, base_url: str = BASE_URL, record_dir: str = HTTP_RECORD_DIR, root_text: str = "SMS"):
+        """
+        Args:
+            base_url: URL da pagina principal do SICI (ou de um servidor substituto local)
+            record_dir: Pasta para gravar as respostas recebidas (None para nao gravar)
+            root_text: Texto do orgao de primeiro nivel percorrido
+        """
+        # A agenda de recoleta so eh avancada pelo motor sincrono
+        super().__init__(base_url=base_url, root_text=root_text, recrawl_schedule=False)
+        self.record_dir = Path(record_dir) if record_dir else None
+        self.session: requests.Session = None
+        self.soup = None
+        self._link_index: dict = None
+        self.current_url = base_url
+        self.requests_made = 0
+
+    def __enter__(self):
+        """
+        Context manager: cria a sessao HTTP com pool de conexoes.
+        """
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+        )
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+            "Accept-Language": "pt-BR,pt;q=0.9",
+        })
+
+        if self.record_dir:
+            self.record_dir.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Context manager: encerra a sessao HTTP.
+        """
+        self.close_storage()
+        if self.session:
+            self.session.close()
+
+    def _load(self, response: requests.Response, target: str = None, argument: str = None, keep_tree: bool = False):
+        """
+        Atualiza a pagina atual com a resposta recebida (e grava, se configurado).
+        Com keep_tree, a arvore da pagina atual eh reaproveitada (ver _parse_keeping_tree).
+        """
+        response.raise_for_status()
+        self.requests_made += 1
+        self.current_url = response.url
+        soup = self._parse_keeping_tree(response.text) if keep_tree and self.soup is not None else None
+        if soup is None:
+            self.soup = parse_html(response.text)
+            self._link_index = None
+        else:
+            self.soup = soup
+
+        if self.record_dir:
+            file_name = f"{self.requests_made:05d}.html"
+            (self.record_dir / file_name).write_text(response.text, encoding="utf-8")
+            entry = {
+                "method": response.request.method,
+                "target": target,
+                "argument": argument,
+                "file": file_name,
+            }
+            with open(self.record_dir / "manifest.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _parse_keeping_tree(self, html: str):
+        """
+        Parse so do que esta fora do ua_treeview; a arvore ja processada da pagina
+        atual entra no lugar. A arvore eh a maior parte do documento e um postback
+        que nao muda a selecao nem a expansao (ex: dropdown) a devolve igual.
+
+        Returns:
+            BeautifulSoup ou None se a pagina nao tem o ua_treeview (parse completo)
+        """
+        stripped = strip_tree(html)
+        tree = self.soup.select_one("div[id*='ua_treeview']")
+        if stripped is None or tree is None:
+            return None
+        soup = parse_html(stripped)
+        placeholder = soup.select_one("div[id*='ua_treeview']")
+        if placeholder is None:
+            return None
+        placeholder.replace_with(tree.extract())
+        return soup
+
+    def _postback(self, target: str, argument: str, overrides: dict = None, keep_tree: bool = False):
+        """
+        Envia um postback do ASP.NET com o estado atual do formulario.
+
+        Args:
+            target: __EVENTTARGET (UniqueID do controle)
+            argument: __EVENTARGUMENT
+            overrides: Campos do formulario a alterar (ex: valor de um dropdown)
+            keep_tree: A resposta traz a mesma arvore; nao refazer o parse dela
+        """
+        action, fields = form_fields(self.soup)
+        fields["__EVENTTARGET"] = target
+        fields["__EVENTARGUMENT"] = argument
+        if overrides:
+            fields.update(overrides)
+
+        url = urljoin(self.current_url, action or "")
+        response = self.session.post(url, data=fields, timeout=HTTP_TIMEOUT / 1000)
+        self._load(response, target, argument, keep_tree)
+
+    def open_site(self):
+        """
+        Carrega a pagina principal do SICI.
+        """
+        print(f"[*] Acessando {self.base_url} (HTTP)...")
+        response = self.session.get(self.base_url, timeout=HTTP_TIMEOUT / 1000)
+        self._load(response)
+
+        if self.soup.select_one("div[id*='ua_treeview']"):
+            print("[OK] Pagina carregada com sucesso.")
+        else:
+            print("[!] TreeView nao encontrado na pagina, mas prosseguindo...")
+
+    def _node_key(self, node_id: str) -> tuple:
+        """
+        Chave estavel de um no: (__EVENTTARGET, __EVENTARGUMENT) do seu link de texto.
+        """
+        link = self.soup.find(id=node_id)
+        postback = parse_postback(link.get("href")) if link else None
+        return postback or (None, node_id)
+
+    def _resolve(self, key: tuple) -> str:
+        """
+        Encontra o ID atual do link de texto a partir da chave estavel.
+        """
+        target, argument = key
+        if target is None:
+            return argument
+
+        # Indice chave -> ID montado uma vez por pagina recebida
+        if self._link_index is None:
+            self._link_index = {}
+            for link in self.soup.select('a[id*="ua_treeview"]'):
+                postback = parse_postback(link.get("href"))
+                if postback:
+                    self._link_index.setdefault(postback, link.get("id"))
+        return self._link_index.get(key)
+
+    def _select(self, key: tuple):
+        """
+        Seleciona o no (equivale a clicar no link de texto).
+        """
+        target, argument = key
+        if target is None:
+            raise RuntimeError(f"Link '{argument}' nao dispara postback")
+        self._postback(target, argument)
+
+    def _expand(self, key: tuple) -> bool:
+        """
+        Expande o no (equivale a clicar no icone +).
+
+        Returns:
+            bool: True se os filhos estao no HTML atual
+        """
+        node_id = self._resolve(key)
+        link = expander_link(self.soup, node_id) if node_id else None
+        if link is None:
+            return False
+
+        img = link.find("img")
+        if "Collapse" in (img.get("alt") or "") or "minus" in (img.get("src") or ""):
+            return True  # Ja expandido
+
+        postback = parse_postback(link.get("href"))
+        if postback:
+            self._postback(*postback)
+            return True
+
+        # TreeView_ToggleNode: filhos ja vieram no HTML, so estao ocultos
+        if "TreeView_ToggleNode" in (link.get("href") or ""):
+            return True
+
+        print(f"[!] Expansao do no '{node_id}' nao usa postback: {link.get('href')}")
+        return False
+
+    def _extract_node_info(self, tree_path: list = None) -> dict:
+        """
+        Extrai as informacoes do no selecionado a partir do HTML atual.
+        Seleciona "Informacoes Gerais" no dropdown (postback) se ainda nao for a opcao
+        atual (a marcada como selected ou a primeira, como select.value no navegador).
+        Com tree_path (e PANEL_SNAPSHOTS), grava o HTML da pagina sem a arvore.
+        """
+        try:
+            select, option = find_info_gerais_select(self.soup)
+            if select is not None and select.get("name") and option is not current_option(select):
+                name = select["name"]
+                self._postback(name, "", {name: option.get("value", "")}, keep_tree=True)
+        except Exception as e:
+            print(f"[!] Erro ao selecionar dropdown: {e}")
+
+        with self._without_tree() as body:
+            payload = extract_payload(self.soup)
+            if self.snapshots and tree_path:
+                self.snapshots.put(tree_path, str(body))
+        return self._build_node_info(payload["titulo"], payload["decreto"], payload["pairs"])
+
+    @contextlib.contextmanager
+    def _without_tree(self):
+        """
+        Retira o ua_treeview do soup atual enquanto o bloco roda: a extracao percorre
+        so o painel de detalhes, o cabecalho e o dropdown (mesmo recorte do snapshot),
+        sem repetir o parse. Entrega o <body>.
+        """
+        body = self.soup.body or self.soup
+        tree = body.select_one("div[id*='ua_treeview']")
+        if tree is None:
+            yield body
+            return
+        marker = self.soup.new_tag("div")
+        tree.replace_with(marker)
+        try:
+            yield body
+        finally:
+            marker.replace_with(tree)
+
+    def _push_children(self, frontier: Frontier, parent_key: tuple, parent_path: list, filhos: dict):
+        """
+        Coloca na fronteira os filhos de um no ja expandido, reservando em
+        `filhos` a posicao de cada um na ordem de exibicao.
+        """
+        indent = "  " * (len(parent_path) - 1)
+        parent_id = self._resolve(parent_key)
+        children = list_children(self.soup, parent_id) if parent_id else []
+
+        if not children:
+            print(f"{indent}[*] No '{parent_path[-1]}' nao tem filhos")
+            return
+
+        # Guardar as chaves antes dos postbacks (os IDs mudam quando a arvore eh redesenhada)
+        entries = [(self._node_key(child["id"]), child["text"]) for child in children]
+        print(f"{indent}[*] Processando {len(entries)} filho(s) de '{parent_path[-1]}':")
+
+        for idx, (key, child_name) in enumerate(entries, 1):
+            filhos[child_name] = {"info": None, "filhos": {}}
+            frontier.push({
+                "caminho": parent_path + [child_name],
+                "chave": key,
+                "saida": filhos[child_name],
+                "posicao": f"{idx}/{len(entries)}",
+            })
+
+    def _crawl_children(self, parent_key: tuple, parent_path: list) -> tuple:
+        """
+        Percorre pela fronteira de coleta (ordem de CRAWL_ORDER) a subarvore de um
+        no ja expandido.
+
+        Returns:
+            tuple: ({nome: {"info": ..., "filhos": {...}}} na ordem de exibicao,
+                    False se algum no falhou e ficou com "erro" no lugar dos dados)
+        """
+        filhos = {}
+        complete = True
+        frontier = Frontier(CRAWL_ORDER, staleness=self._staleness)
+        self._push_children(frontier, parent_key, parent_path, filhos)
+
+        while frontier:
+            task = frontier.pop()
+            key, child_path, node = task["chave"], task["caminho"], task["saida"]
+            child_name = child_path[-1]
+            indent = "  " * (len(child_path) - 2)
+            print(f"{indent}[{task['posicao']}] {child_name}")
+            try:
+                with self.tracer.span("clique", child_path):
+                    self._select(key)
+                with self.tracer.span("extracao", child_path):
+                    node["info"] = self._extract_node_info(child_path)
+                with self.tracer.span("gravacao", child_path):
+                    self._save_node_data(child_name, node["info"], tree_path=child_path)
+
+                child_id = self._resolve(key)
+                if child_id and has_expander(self.soup, child_id):
+                    print(f"{indent}   [*] Expandindo '{child_name}' para ver filhos...")
+                    with self.tracer.span("expansao", child_path):
+                        expanded = self._expand(key)
+                    if expanded:
+                        self._push_children(frontier, key, child_path, node["filhos"])
+            except Exception as e:
+                print(f"{indent}   [ERRO] Falha ao processar '{child_name}': {e}")
+                node.clear()
+                node["erro"] = str(e)
+                complete = False
+
+        return filhos, complete
+
+    def expand_all_nodes(self) -> bool:
+        """
+        Expande o orgao raiz (root_text) e processa todos os seus descendentes via
+        postbacks HTTP. Preenche self.collected_data com a hierarquia completa.
+        
+        Returns:
+            bool: True se a arvore foi percorrida inteira; False se o orgao nao foi
+                  encontrado ou expandido, ou se algum no falhou (crawl() tenta de novo)
+        """
+        root = self.root_text
+        print(f"[*] Acessando todos os nos de {root} e coletando informacoes (HTTP)...")
+
+        root_id = find_node_by_text(self.soup, root)
+        if not root_id:
+            print(f"[!] No {root} nao encontrado!")
+            return False
+
+        root_key = self._node_key(root_id)
+
+        print(f"[*] Extraindo informacoes do {root}...")
+        with self.tracer.span("clique", [root]):
+            self._select(root_key)
+        with self.tracer.span("extracao", [root]):
+            root_info = self._extract_node_info([root])
+        with self.tracer.span("gravacao", [root]):
+            self._save_node_data(root, root_info, tree_path=[root])
+
+        filhos = {}
+        with self.tracer.span("expansao", [root]):
+            expanded = self._expand(root_key)
+        if expanded:
+            filhos, complete = self._crawl_children(root_key, [root])
+        else:
+            print(f"[!] Ícone de expansão de {root} não encontrado")
+            complete = False
+
+        self.collected_data = {root: {"info": root_info, "filhos": filhos}}
+        print(f"   [OK] {self.requests_made} requisicoes HTTP realizadas\n")
+        if not complete:
+            print(f"[!] Arvore de {root} incompleta: ha nos com erro")
+        return complete
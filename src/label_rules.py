@@ -0,0 +1,161 @@
+"""
+Classificador dos rotulos do painel de detalhes do SICI.
+
+As regras (src/label_rules.json, ou LABEL_RULES_FILE) dizem em que secao/campo
+do dict de info cada par rotulo/valor eh gravado. Elas sao compiladas em UMA
+expressao regular ancorada no inicio do rotulo, com uma alternativa por regra
+na ordem do arquivo: a primeira alternativa que casa eh a regra vencedora, o
+mesmo resultado da antiga cadeia de if/elif. Como o SICI usa poucos rotulos
+distintos, a decisao de cada rotulo eh memorizada durante a coleta.
+
+normalize_value() da a forma canonica de um valor para o conjunto de valores
+ja gravados de um no (deteccao de duplicatas em O(1)). build_node_info() monta
+o dict de info a partir dos dados brutos do painel; nao depende do navegador nem
+do scraper, entao tambem serve a reextracao offline (panel_snapshots).
+"""
+
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+
+from .config import LABEL_RULES_FILE
+
+DEFAULT_RULES_FILE = Path(__file__).with_name("label_rules.json")
+
+
+def normalize_value(value: str) -> str:
+    """Forma canonica de um valor: minusculas, sem espacos extras."""
+    return " ".join(value.split()).lower()
+
+
+def _rule_pattern(rule: dict) -> str:
+    """Condicao (lookahead a partir do inicio do rotulo) de uma regra."""
+    options = []
+    if rule.get("igual"):
+        options.append("(?:" + "|".join(re.escape(x) for x in rule["igual"]) + r")\Z")
+    if rule.get("contem"):
+        options.append(".*?(?:" + "|".join(re.escape(x) for x in rule["contem"]) + ")")
+    if not options:
+        raise ValueError(f"Regra sem 'igual' nem 'contem': {rule}")
+
+    pattern = "(?=" + "|".join(options) + ")"
+    if rule.get("exceto"):
+        pattern = "(?!.*?(?:" + "|".join(re.escape(x) for x in rule["exceto"]) + "))" + pattern
+    return pattern
+
+
+class LabelClassifier:
+    """
+    Regras compiladas + memoria rotulo -> (categoria, campo).
+    """
+
+    def __init__(self, rules_file: str = None):
+        """
+        Args:
+            rules_file: JSON com a lista "regras" (None: LABEL_RULES_FILE ou o arquivo padrao)
+        """
+        self.rules_file = Path(rules_file or LABEL_RULES_FILE or DEFAULT_RULES_FILE)
+        with open(self.rules_file, "r", encoding="utf-8") as f:
+            self.rules = json.load(f)["regras"]
+
+        # Uma alternativa por regra, cada uma marcada por um grupo vazio r{i}
+        self.matcher = re.compile(
+            "|".join(f"{_rule_pattern(rule)}(?P<r{i}>)" for i, rule in enumerate(self.rules)),
+            re.DOTALL,
+        )
+        self.cache = {}
+        self.hits = 0
+
+    def classify(self, label: str) -> tuple:
+        """
+        Categoria e campo de um rotulo.
+
+        Returns:
+            tuple: (categoria, campo); campo None em comunicacoes (lista de
+                   {tipo, valor}); (None, None) se nenhuma regra casar
+        """
+        key = label.lower().strip()
+        decision = self.cache.get(key)
+        if decision is not None:
+            self.hits += 1
+            return decision
+
+        match = self.matcher.match(key)
+        if match:
+            rule = self.rules[int(match.lastgroup[1:])]
+            decision = (rule["categoria"], rule.get("campo"))
+        else:
+            decision = (None, None)
+        self.cache[key] = decision
+        return decision
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+
+def categorize(label: str, value: str, info: dict, classifier: LabelClassifier) -> bool:
+    """
+    Grava o par rotulo/valor na secao/campo de info indicada pelo classificador.
+
+    Returns:
+        bool: True se o valor foi gravado em info
+    """
+    value_clean = value.strip()
+    category, field = classifier.classify(label)
+
+    # COMUNICACOES (Telefone, E-mail, Fax): lista de {tipo, valor}
+    if category == "comunicacoes":
+        info.setdefault("comunicacoes", []).append({
+            "tipo": label.strip(),
+            "valor": value_clean
+        })
+    # GERAL (Titular, Cargo) e ENDERECO (Logradouro, Numero, Complemento, Bairro, CEP...)
+    elif category:
+        info.setdefault(category, {})[field or label.strip()] = value_clean
+
+    # OUTROS CAMPOS GERAIS (qualquer outra informacao relevante)
+    elif len(label) > 2 and len(value_clean) > 1 and value_clean not in ["", "-", "N/A", "n/a"]:
+        info.setdefault("geral", {})[label.strip()] = value_clean
+    else:
+        return False
+    return True
+
+
+def build_node_info(titulo: str, decreto: str, pairs: list, classifier: LabelClassifier, timestamp: str = None) -> dict:
+    """
+    Dicionario de informacoes de um no a partir do titulo, decreto e pares do painel.
+
+    Args:
+        titulo: Titulo do cabecalho da pagina (ou None)
+        decreto: Linha do decreto (ou None)
+        pairs: Lista de pares {label, value, method}
+        classifier: Regras de categorizacao dos rotulos
+        timestamp: Momento da coleta (None: agora)
+
+    Returns:
+        dict: Dicionario com informacoes organizadas por secao
+    """
+    info = {
+        "titulo": titulo or None,
+        "decreto": decreto or None,
+        "geral": {},
+        "endereco": {},
+        "comunicacoes": [],
+        "timestamp": timestamp or datetime.now().isoformat()
+    }
+
+    # Valores ja gravados neste no (normalizados), para descartar duplicatas
+    seen = set()
+    for pair in pairs or []:
+        label = pair.get("label", "").strip()
+        value = pair.get("value", "").strip()
+        if label and value and normalize_value(value) not in seen:
+            if categorize(label, value, info, classifier):
+                seen.add(normalize_value(value))
+
+    # Limpar dados vazios
+    for section in ("geral", "endereco", "comunicacoes"):
+        if not info.get(section):
+            info.pop(section, None)
+    return info
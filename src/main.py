@@ -3,16 +3,54 @@ Ponto de entrada da aplicação RPA SICI SMS.
 Executa o scraper em um contexto de gerenciamento de recursos.
 """
 
+import asyncio
+
+from .config import ENGINE, ROOTS
 from .sici_scraper import SiciSmsScraper
 
 
+async def run_async():
+    """
+    Executa o motor assincrono (varios contextos em paralelo).
+    """
+    from .async_scraper import AsyncSiciSmsScraper
+
+    async with AsyncSiciSmsScraper() as scraper:
+        await scraper.run()
+
+
 def main():
     """
     Função principal que executa a RPA.
     Utiliza context manager para garantir limpeza de recursos.
     """
+    if ROOTS != ["SMS"] and ENGINE != "sync":
+        # Os outros motores percorrem so SMS; nao ignorar ROOTS em silencio
+        raise ValueError(f"ROOTS = {ROOTS!r} so eh suportado com ENGINE = \"sync\" (atual: {ENGINE!r})")
+
+    if ENGINE == "async":
+        asyncio.run(run_async())
+        return
+
+    if ENGINE == "sharded":
+        from .sharded_crawl import crawl_sharded
+
+        crawl_sharded()
+        return
+
+    if ENGINE == "http":
+        from .http_crawler import HttpPostbackCrawler
+
+        with HttpPostbackCrawler() as crawler:
+            crawler.run()
+        return
+
     with SiciSmsScraper() as scraper:
-        scraper.run()
+        if ROOTS == ["SMS"]:
+            scraper.run()
+        else:
+            # Varios orgaos (ou outro orgao que nao SMS) na mesma sessao do navegador
+            scraper.run_roots(ROOTS)
 
 
 if __name__ == "__main__":
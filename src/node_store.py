@@ -0,0 +1,460 @@
+"""
+Armazenamento dos dados por no em um unico arquivo append-only (JSON Lines).
+
+Substitui a gravacao de um diretorio + um JSON formatado por no
+(collected_data/<nome>/<nome>.json): cada no vira uma linha em
+collected_data/nos.jsonl, gravada em lotes de NODE_STORE_BATCH registros.
+Os registros sao identificados pelo caminho do no desde a raiz (path_key), ja
+que nomes se repetem em ramos diferentes; registros mais novos de um mesmo
+caminho prevalecem sobre os antigos.
+
+Para quem ainda precisa do layout de diretorios, export_directory_layout()
+materializa collected_data/<nome>/<nome>.json a partir do arquivo:
+
+    python -m src.node_store export
+    python -m src.node_store compact
+    python -m src.node_store stats
+
+InternedNodeStore (STORAGE_BACKEND = "interned") grava os mesmos registros com
+os valores que se repetem de no para no (titulo com o banner da pagina,
+decreto, cargo, bairro, cidade) em uma tabela de strings compartilhada, e cada
+lote comprimido com zlib. A leitura devolve os registros ja expandidos, com uma
+unica copia (sys.intern) de cada string repetida em memoria.
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from .config import COLLECTED_DATA_DIR, INTERNED_STORE_FILE, NODE_STORE_BATCH, NODE_STORE_FILE, STORAGE_BACKEND
+from .tree_model import path_key
+
+# Campos do info movidos para a tabela de strings (caminho dentro do dict)
+INTERNED_FIELDS = (
+    ("titulo",),
+    ("decreto",),
+    ("geral", "cargo"),
+    ("endereco", "bairro"),
+    ("endereco", "cidade"),
+)
+
+# Cabecalho de cada lote do arquivo interned: tamanho do bloco comprimido
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def safe_filename(name: str) -> str:
+    """
+    Converte um nome em um nome de arquivo seguro.
+    Remove caracteres invalidos em nomes de arquivo.
+    """
+    # Remover caracteres invalidos
+    invalid_chars = r'<>:"/\|?*'
+    safe_name = name
+    for char in invalid_chars:
+        safe_name = safe_name.replace(char, '_')
+
+    # Limitar o tamanho
+    max_length = 200
+    if len(safe_name) > max_length:
+        safe_name = safe_name[:max_length]
+
+    return safe_name.strip()
+
+
+def record_key(tree_path, node_name: str = None) -> str:
+    """
+    Chave de um no no armazenamento: o caminho desde a raiz (lista ou path_key)
+    ou, para registros antigos gravados sem caminho, o nome.
+    """
+    if tree_path:
+        return tree_path if isinstance(tree_path, str) else path_key(tree_path)
+    return node_name
+
+
+class JsonlNodeStore:
+    """
+    Registros de nos em um arquivo JSON Lines, com escrita em lotes.
+    """
+
+    def __init__(self, store_file: str = NODE_STORE_FILE, batch_size: int = NODE_STORE_BATCH):
+        """
+        Args:
+            store_file: Arquivo .jsonl com os registros
+            batch_size: Quantos registros acumular antes de gravar em disco
+        """
+        self.store_file = Path(store_file)
+        self.batch_size = max(1, batch_size)
+        self._pending = []
+        self._latest = None
+
+    def _read_records(self):
+        """Registros gravados, em ordem (linhas incompletas sao ignoradas)."""
+        if not self.store_file.exists():
+            return
+        with open(self.store_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def _index(self) -> dict:
+        """Registro mais recente por caminho (carregado na primeira consulta)."""
+        if self._latest is None:
+            self._latest = {}
+            for record in self._read_records():
+                self._latest[record_key(record.get("caminho"), record["nome"])] = record
+        return self._latest
+
+    def put(self, node_name: str, node_data: dict, tree_path: list = None):
+        """
+        Acrescenta o registro de um no; a gravacao acontece a cada lote completo.
+
+        Args:
+            node_name: Nome do no
+            node_data: Dados coletados do no
+            tree_path: Nomes dos nos desde a raiz (chave do registro; sem ele, o nome)
+        """
+        record = {
+            "nome": node_name,
+            "caminho": list(tree_path) if tree_path else None,
+            "dados": node_data,
+            "gravado_em": datetime.now().isoformat(),
+        }
+        self._pending.append(record)
+        if self._latest is not None:
+            self._latest[record_key(tree_path, node_name)] = record
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def get(self, tree_path) -> dict:
+        """Dados mais recentes do no no caminho (lista ou path_key), ou None."""
+        record = self._index().get(record_key(tree_path))
+        return record["dados"] if record else None
+
+    def latest(self) -> dict:
+        """{path_key: registro} com o registro mais recente de cada no."""
+        return dict(self._index())
+
+    def flush(self):
+        """Grava o lote pendente em uma unica escrita."""
+        if not self._pending:
+            return
+        self.store_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.store_file, "a+b") as f:
+            # Ultima linha truncada (queda durante uma gravacao): comecar numa linha nova
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        with open(self.store_file, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in self._pending))
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending = []
+
+    def close(self):
+        """Grava o que estiver pendente."""
+        self.flush()
+
+    def compact(self) -> int:
+        """
+        Reescreve o arquivo mantendo apenas o registro mais recente de cada caminho.
+
+        Returns:
+            int: Numero de registros mantidos
+        """
+        self.flush()
+        records = list(self._index().values())
+        tmp_file = self.store_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_file, self.store_file)
+        return len(records)
+
+
+class InternedNodeStore(JsonlNodeStore):
+    """
+    Registros de nos com tabela de strings compartilhada e lotes comprimidos.
+
+    O arquivo eh uma sequencia de lotes [tamanho (4 bytes) + zlib(linhas JSON)].
+    Cada lote traz primeiro as strings novas ({"s": [id, texto]}) e depois os
+    registros, com os campos de INTERNED_FIELDS trocados por ids em "refs".
+    Um lote incompleto no fim (queda durante a gravacao) eh descartado.
+    """
+
+    def __init__(self, store_file: str = INTERNED_STORE_FILE, batch_size: int = NODE_STORE_BATCH):
+        """
+        Args:
+            store_file: Arquivo com os lotes comprimidos
+            batch_size: Quantos registros acumular antes de gravar em disco
+        """
+        super().__init__(store_file, batch_size)
+        self.strings = None
+        self._string_ids = None
+        self._valid_size = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def _frames(self):
+        """Conteudo descomprimido de cada lote completo; atualiza _valid_size."""
+        self._valid_size = 0
+        if not self.store_file.exists():
+            return
+        with open(self.store_file, "rb") as f:
+            while True:
+                header = f.read(_FRAME_HEADER.size)
+                if len(header) < _FRAME_HEADER.size:
+                    return
+                (size,) = _FRAME_HEADER.unpack(header)
+                block = f.read(size)
+                try:
+                    payload = zlib.decompress(block)
+                except zlib.error:
+                    return
+                self._valid_size += _FRAME_HEADER.size + size
+                yield payload.decode("utf-8")
+
+    def _read_records(self):
+        """Registros expandidos, em ordem; carrega a tabela de strings no caminho."""
+        self.strings = []
+        self._string_ids = {}
+        for payload in self._frames():
+            for line in payload.splitlines():
+                entry = json.loads(line)
+                if "s" in entry:
+                    string_id, text = entry["s"]
+                    text = sys.intern(text)
+                    self.strings.append(text)
+                    self._string_ids[text] = string_id
+                else:
+                    yield self._expand(entry)
+
+    def _load_strings(self):
+        """Tabela de strings do arquivo (lida uma vez, antes do primeiro lote gravado)."""
+        if self._string_ids is None:
+            for _ in self._read_records():
+                pass
+
+    def _expand(self, record: dict) -> dict:
+        """Recoloca as strings da tabela nos campos referenciados."""
+        refs = record.pop("refs", None)
+        if not refs:
+            return record
+        data = record["dados"]
+        for field, string_id in refs.items():
+            *parents, leaf = field.split(".")
+            target = data
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = self.strings[string_id]
+        return record
+
+    def _encode(self, record: dict, new_strings: list) -> dict:
+        """Copia do registro com os campos repetidos trocados por ids da tabela."""
+        if not isinstance(record.get("dados"), dict):
+            return record
+        data = dict(record["dados"])
+        refs = {}
+        for field in INTERNED_FIELDS:
+            *parents, leaf = field
+            container = data
+            for parent in parents:
+                container = container.get(parent) if isinstance(container, dict) else None
+            value = container.get(leaf) if isinstance(container, dict) else None
+            if not isinstance(value, str):
+                continue
+
+            string_id = self._string_ids.get(value)
+            if string_id is None:
+                string_id = len(self.strings)
+                value = sys.intern(value)
+                self.strings.append(value)
+                self._string_ids[value] = string_id
+                new_strings.append({"s": [string_id, value]})
+
+            # Copiar so o caminho alterado (o dict original segue em _latest)
+            target = data
+            for parent in parents:
+                target[parent] = dict(target[parent])
+                target = target[parent]
+            del target[leaf]
+            refs[".".join(field)] = string_id
+
+        encoded = dict(record, dados=data)
+        if refs:
+            encoded["refs"] = refs
+        return encoded
+
+    def flush(self):
+        """Grava o lote pendente como um bloco comprimido."""
+        if not self._pending:
+            return
+        self._load_strings()
+        new_strings = []
+        records = [self._encode(record, new_strings) for record in self._pending]
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in new_strings + records)
+        block = zlib.compress(lines.encode("utf-8"), 9)
+
+        self.store_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.store_file, "ab") as f:
+            # Lote incompleto no fim (queda durante uma gravacao): descartar antes de acrescentar
+            if f.tell() > self._valid_size:
+                f.truncate(self._valid_size)
+            f.write(_FRAME_HEADER.pack(len(block)) + block)
+            f.flush()
+            os.fsync(f.fileno())
+        self._valid_size += _FRAME_HEADER.size + len(block)
+
+        self.raw_bytes += sum(len(json.dumps(r, ensure_ascii=False).encode("utf-8")) + 1 for r in self._pending)
+        self.stored_bytes += _FRAME_HEADER.size + len(block)
+        self._pending = []
+
+    def compact(self) -> int:
+        """
+        Reescreve o arquivo com o registro mais recente de cada caminho e so as strings usadas.
+
+        Returns:
+            int: Numero de registros mantidos
+        """
+        self.flush()
+        records = list(self._index().values())
+        tmp_file = self.store_file.with_suffix(".tmp")
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+        compacted = InternedNodeStore(tmp_file, self.batch_size)
+        compacted.strings, compacted._string_ids = [], {}
+        for record in records:
+            compacted._pending.append(record)
+            if len(compacted._pending) >= compacted.batch_size:
+                compacted.flush()
+        compacted.flush()
+        os.replace(tmp_file, self.store_file)
+
+        self.strings = self._string_ids = None
+        self._latest = None
+        return len(records)
+
+    def stats(self) -> dict:
+        """
+        Tamanho em disco e tamanho equivalente em JSON Lines dos registros do arquivo.
+
+        Returns:
+            dict: {registros, strings, bytes_json, bytes_disco, taxa}
+        """
+        self.flush()
+        raw = 0
+        count = 0
+        for record in self._read_records():
+            raw += len(json.dumps(record, ensure_ascii=False).encode("utf-8")) + 1
+            count += 1
+        stored = self.store_file.stat().st_size if self.store_file.exists() else 0
+        return {
+            "registros": count,
+            "strings": len(self.strings or []),
+            "bytes_json": raw,
+            "bytes_disco": stored,
+            "taxa": raw / stored if stored else 0.0,
+        }
+
+    def report(self):
+        """Imprime a taxa de compressao obtida nos lotes gravados nesta execucao."""
+        if not self.stored_bytes:
+            return
+        print(
+            f"[*] Armazenamento interned: {self.raw_bytes / 1024:.1f} KiB de JSON gravados em "
+            f"{self.stored_bytes / 1024:.1f} KiB ({self.raw_bytes / self.stored_bytes:.1f}x), "
+            f"{len(self.strings)} string(s) compartilhada(s)"
+        )
+
+    def close(self):
+        """Grava o que estiver pendente e informa a taxa de compressao."""
+        self.flush()
+        self.report()
+
+
+def open_node_store(backend: str = STORAGE_BACKEND, store_file: str = None, store_dir: str = None) -> JsonlNodeStore:
+    """
+    Armazenamento de arquivo unico do backend configurado (None para "dirs").
+
+    Args:
+        backend: "jsonl", "interned" ou "dirs"
+        store_file: Arquivo dos registros (None: o padrao do backend)
+        store_dir: Pasta onde criar o arquivo padrao do backend (ex.: pasta de um ramo)
+    """
+    defaults = {"jsonl": (JsonlNodeStore, NODE_STORE_FILE), "interned": (InternedNodeStore, INTERNED_STORE_FILE)}
+    if backend not in defaults:
+        return None
+    store_class, default_file = defaults[backend]
+    if store_file is None and store_dir is not None:
+        store_file = Path(store_dir) / Path(default_file).name
+    return store_class(store_file or default_file)
+
+
+def export_directory_layout(store: JsonlNodeStore, output_dir: str = COLLECTED_DATA_DIR) -> int:
+    """
+    Materializa o layout antigo <output_dir>/<nome>/<nome>.json a partir do arquivo unico.
+    O layout eh por nome: entre nos de mesmo nome em ramos diferentes, o ultimo gravado prevalece.
+
+    Returns:
+        int: Numero de arquivos gravados
+    """
+    count = 0
+    for record in store.latest().values():
+        safe_name = safe_filename(record["nome"])
+        node_dir = Path(output_dir) / safe_name
+        node_dir.mkdir(parents=True, exist_ok=True)
+        with open(node_dir / f"{safe_name}.json", "w", encoding="utf-8") as f:
+            json.dump(record["dados"], f, ensure_ascii=False, indent=2)
+        count += 1
+    return count
+
+
+def main():
+    """
+    Linha de comando: exporta o layout de diretorios ou compacta o arquivo.
+    """
+    parser = argparse.ArgumentParser(description="Armazenamento em arquivo unico dos nos coletados")
+    parser.add_argument("comando", choices=["export", "compact", "stats", "converter"])
+    parser.add_argument("--backend", choices=["jsonl", "interned"],
+                        default=STORAGE_BACKEND if STORAGE_BACKEND != "dirs" else "jsonl",
+                        help="Formato do arquivo (padrao: STORAGE_BACKEND)")
+    parser.add_argument("--arquivo", default=None, help="Arquivo com os registros (padrao: o do backend)")
+    parser.add_argument("--saida", default=COLLECTED_DATA_DIR, help="Pasta de destino do export")
+    args = parser.parse_args()
+
+    store = open_node_store(args.backend, args.arquivo)
+    if args.comando == "export":
+        count = export_directory_layout(store, args.saida)
+        print(f"[OK] {count} arquivo(s) gravado(s) em {args.saida}")
+    elif args.comando == "compact":
+        count = store.compact()
+        print(f"[OK] {store.store_file} compactado: {count} registro(s)")
+    elif args.comando == "converter":
+        # JSON Lines (NODE_STORE_FILE) -> interned (INTERNED_STORE_FILE)
+        target = InternedNodeStore()
+        for record in JsonlNodeStore(args.arquivo or NODE_STORE_FILE).latest().values():
+            target.put(record["nome"], record["dados"], record.get("caminho"))
+        target.close()
+        print(f"[OK] Registros convertidos para {target.store_file}")
+    else:
+        if not isinstance(store, InternedNodeStore):
+            size = store.store_file.stat().st_size if store.store_file.exists() else 0
+            print(f"[*] {store.store_file}: {len(store.latest())} no(s), {size / 1024:.1f} KiB (sem compressao)")
+            return
+        stats = store.stats()
+        print(
+            f"[*] {store.store_file}: {stats['registros']} registro(s), {stats['strings']} string(s) compartilhada(s); "
+            f"{stats['bytes_json'] / 1024:.1f} KiB em JSON -> {stats['bytes_disco'] / 1024:.1f} KiB em disco ({stats['taxa']:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
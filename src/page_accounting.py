@@ -0,0 +1,214 @@
+"""
+Contabilidade das chamadas do Playwright feitas pelos scrapers.
+
+Cada chamada em self.page (ou em um ElementHandle obtido dela) eh uma ida e
+volta ate o navegador. CallAccountant embrulha a pagina em um proxy fino que,
+para cada chamada, registra:
+- o tipo (evaluate, query_selector_all, text_content, click, ...)
+- os bytes enviados (argumentos, inclusive o texto dos scripts) e recebidos
+  (resultado serializado em JSON)
+- a latencia
+
+e atribui tudo ao no em processamento (set_node). Ao final da coleta report()
+imprime a tabela de orcamento por tipo de chamada, os nos mais caros e se o
+limite MAX_CALLS_PER_NODE foi ultrapassado. O benchmark usa o mesmo limite
+para reprovar uma execucao.
+"""
+
+import contextvars
+import inspect
+import json
+import threading
+import time
+
+from .config import MAX_CALLS_PER_NODE
+
+# Metodos que nao conversam com o navegador
+_LOCAL_METHODS = {"on", "once", "remove_listener", "is_closed"}
+
+# No atual; tarefas asyncio (contextos do motor assincrono) tem o seu proprio
+_current_node = contextvars.ContextVar("page_accounting_node", default=None)
+
+OUTSIDE_NODES = "(fora de nos)"
+
+
+def _payload_size(value) -> int:
+    """Tamanho aproximado de um argumento/resultado no protocolo (JSON)."""
+    if value is None or _is_handle(value) or isinstance(value, _InstrumentedProxy):
+        return 0
+    if isinstance(value, list) and value and _is_handle(value[0]):
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, bytes):
+        return len(value)
+    if not isinstance(value, (dict, list, tuple, int, float, bool)):
+        return 0
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _is_handle(value) -> bool:
+    """JSHandle/ElementHandle ou Page do Playwright (objetos que recebem chamadas)."""
+    return hasattr(value, "as_element") or hasattr(value, "goto")
+
+
+class CallAccountant:
+    """
+    Contadores de chamadas, bytes e latencia por tipo de chamada e por no.
+    """
+
+    def __init__(self, max_calls_per_node: float = MAX_CALLS_PER_NODE):
+        """
+        Args:
+            max_calls_per_node: Orcamento de chamadas por no (None: sem limite)
+        """
+        self.max_calls_per_node = max_calls_per_node
+        self.by_type = {}
+        self.by_node = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, target):
+        """Proxy contabilizado de uma Page, BrowserContext ou ElementHandle."""
+        if target is None or isinstance(target, _InstrumentedProxy):
+            return target
+        return _InstrumentedProxy(target, self)
+
+    def set_node(self, node: str):
+        """Atribui as proximas chamadas (nesta tarefa/thread) ao no informado."""
+        _current_node.set(node)
+
+    def record(self, call_type: str, sent: int, received: int, seconds: float):
+        node = _current_node.get() or OUTSIDE_NODES
+        with self._lock:
+            stats = self.by_type.setdefault(call_type, [0, 0, 0, 0.0])
+            stats[0] += 1
+            stats[1] += sent
+            stats[2] += received
+            stats[3] += seconds
+            stats = self.by_node.setdefault(node, [0, 0, 0.0])
+            stats[0] += 1
+            stats[1] += sent + received
+            stats[2] += seconds
+
+    def total_calls(self) -> int:
+        return sum(stats[0] for stats in self.by_type.values())
+
+    def node_count(self) -> int:
+        return sum(1 for node in self.by_node if node != OUTSIDE_NODES)
+
+    def calls_per_node(self) -> float:
+        """Media de chamadas por no processado (incluindo as feitas fora dos nos)."""
+        nodes = self.node_count()
+        return self.total_calls() / nodes if nodes else 0.0
+
+    def over_budget(self) -> bool:
+        """True se a media de chamadas por no passou de max_calls_per_node."""
+        return bool(self.max_calls_per_node) and self.calls_per_node() > self.max_calls_per_node
+
+    def summary(self) -> dict:
+        """Totais e detalhamento por tipo de chamada (para relatorios em JSON)."""
+        nodes = max(self.node_count(), 1)
+        return {
+            "chamadas": self.total_calls(),
+            "nos": self.node_count(),
+            "chamadas_por_no": self.calls_per_node(),
+            "kib_por_no": sum(s[1] + s[2] for s in self.by_type.values()) / 1024 / nodes,
+            "segundos_por_no": sum(s[3] for s in self.by_type.values()) / nodes,
+            "por_tipo": {
+                call_type: {"chamadas": s[0], "bytes_enviados": s[1], "bytes_recebidos": s[2], "segundos": round(s[3], 4)}
+                for call_type, s in sorted(self.by_type.items(), key=lambda item: -item[1][0])
+            },
+        }
+
+    def report(self, top_nodes: int = 5):
+        """Imprime a tabela de orcamento da coleta."""
+        total = self.total_calls()
+        if not total:
+            return
+        nodes = max(self.node_count(), 1)
+        sent = sum(s[1] for s in self.by_type.values())
+        received = sum(s[2] for s in self.by_type.values())
+        seconds = sum(s[3] for s in self.by_type.values())
+
+        print(
+            f"[*] Chamadas ao navegador: {total} em {self.node_count()} no(s) "
+            f"({total / nodes:.1f}/no), {(sent + received) / 1024:.1f} KiB, {seconds:.2f}s"
+        )
+        print(f"    {'Tipo':<24}{'Chamadas':>9}{'Por no':>8}{'KiB env.':>10}{'KiB rec.':>10}{'Tempo(s)':>10}{'ms/cham.':>10}")
+        for call_type, (count, type_sent, type_received, type_seconds) in sorted(
+                self.by_type.items(), key=lambda item: -item[1][0]):
+            print(
+                f"    {call_type:<24}{count:>9}{count / nodes:>8.2f}{type_sent / 1024:>10.1f}"
+                f"{type_received / 1024:>10.1f}{type_seconds:>10.2f}{type_seconds / count * 1000:>10.1f}"
+            )
+
+        costly = sorted(
+            ((node, stats) for node, stats in self.by_node.items() if node != OUTSIDE_NODES),
+            key=lambda item: -item[1][0],
+        )[:top_nodes]
+        if costly:
+            print("    Nos com mais chamadas:")
+            for node, (count, size, node_seconds) in costly:
+                print(f"      {count:>5} chamadas  {size / 1024:>8.1f} KiB  {node_seconds:>6.2f}s  {node}")
+
+        if self.over_budget():
+            print(f"[!] Orcamento excedido: {self.calls_per_node():.1f} chamadas/no > {self.max_calls_per_node} (MAX_CALLS_PER_NODE)")
+
+
+class _InstrumentedProxy:
+    """
+    Repassa atributos ao objeto do Playwright; chamadas de metodo sao medidas e
+    os handles/paginas devolvidos tambem sao embrulhados.
+    """
+
+    def __init__(self, target, accountant: CallAccountant):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_accountant", accountant)
+
+    def _wrap_result(self, result):
+        accountant = self._accountant
+        if isinstance(result, list) and result and _is_handle(result[0]):
+            return [accountant.wrap(item) for item in result]
+        if _is_handle(result):
+            return accountant.wrap(result)
+        return result
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr) or name.startswith("_") or name in _LOCAL_METHODS:
+            return attr
+        accountant = self._accountant
+
+        def call(*args, **kwargs):
+            sent = sum(_payload_size(a) for a in args) + sum(_payload_size(v) for v in kwargs.values())
+            start = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                accountant.record(name, sent, 0, time.perf_counter() - start)
+                raise
+
+            if inspect.isawaitable(result):
+                async def measured():
+                    try:
+                        value = await result
+                    except Exception:
+                        accountant.record(name, sent, 0, time.perf_counter() - start)
+                        raise
+                    accountant.record(name, sent, _payload_size(value), time.perf_counter() - start)
+                    return self._wrap_result(value)
+                return measured()
+
+            accountant.record(name, sent, _payload_size(result), time.perf_counter() - start)
+            return self._wrap_result(result)
+
+        return call
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __repr__(self):
+        return f"<instrumentado {self._target!r}>"
@@ -0,0 +1,259 @@
+"""
+Snapshots do painel de detalhes e reextracao offline, sem navegador.
+
+Alem do dict de info, cada no extraido guarda o HTML da pagina sem o ua_treeview
+(o painel de detalhes, o cabecalho e o dropdown), comprimido com gzip, em
+PANEL_SNAPSHOT_DIR:
+- <hash do caminho>.html.gz: snapshot mais recente do no
+- indice.jsonl: uma linha {caminho, arquivo, timestamp, bytes} por gravacao
+  (compactado para a mais recente de cada no com `compactar` e apos cada merge)
+
+Depois de uma mudanca nas regras de categorizacao (label_rules) ou no parser
+(html_extract), o conjunto inteiro eh refeito a partir dos snapshots, em
+paralelo em todos os nucleos, sem acessar o SICI:
+
+    python -m src.panel_snapshots reextrair
+    python -m src.panel_snapshots reextrair --saida data/arvore_sms.ndjson --processos 8
+    python -m src.panel_snapshots compactar
+
+A saida tem o formato de TREE_STREAM_FILE (uma linha por no, ver tree_stream).
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from .config import PANEL_SNAPSHOT_DIR
+from .html_extract import extract_payload, parse_html
+from .label_rules import LabelClassifier, build_node_info
+from .tree_model import path_key
+from .tree_stream import TreeStreamWriter
+
+INDEX_FILE = "indice.jsonl"
+
+
+class PanelSnapshotStore:
+    """
+    Pasta de snapshots HTML comprimidos, um arquivo por no.
+    """
+
+    def __init__(self, snapshot_dir: str = PANEL_SNAPSHOT_DIR):
+        """
+        Args:
+            snapshot_dir: Pasta dos snapshots e do indice
+        """
+        self.snapshot_dir = Path(snapshot_dir)
+        self.count = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self._lock = threading.Lock()
+
+    def file_for(self, tree_path: list) -> Path:
+        """Arquivo do snapshot de um no (nome derivado do caminho, estavel entre coletas)."""
+        digest = hashlib.sha1(path_key(tree_path).encode("utf-8")).hexdigest()[:20]
+        return self.snapshot_dir / f"{digest}.html.gz"
+
+    def put(self, tree_path: list, html: str):
+        """
+        Grava o snapshot do no (substitui o anterior) e registra no indice.
+
+        Args:
+            tree_path: Nomes dos nos desde a raiz ate o no
+            html: HTML da pagina sem a arvore
+        """
+        raw = html.encode("utf-8")
+        data = gzip.compress(raw, compresslevel=6)
+        target = self.file_for(tree_path)
+        entry = {
+            "caminho": list(tree_path),
+            "arquivo": target.name,
+            "timestamp": datetime.now().isoformat(),
+            "bytes": len(data),
+        }
+        with self._lock:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+            with open(self.snapshot_dir / INDEX_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.count += 1
+            self.raw_bytes += len(raw)
+            self.stored_bytes += len(data)
+
+    def entries(self) -> list:
+        """Registro mais recente de cada no, na ordem da primeira gravacao."""
+        latest = {}
+        index = self.snapshot_dir / INDEX_FILE
+        if not index.exists():
+            return []
+        with open(index, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                latest[path_key(entry["caminho"])] = entry
+        return list(latest.values())
+
+    def merge(self, other: "PanelSnapshotStore") -> int:
+        """
+        Copia o snapshot mais recente de cada no de outra pasta (ex.: a de um ramo
+        da coleta em varios processos), mantendo o timestamp da gravacao original.
+        O indice eh compactado em seguida, para nao acumular uma linha por merge.
+
+        Returns:
+            int: Numero de snapshots copiados
+        """
+        copied = 0
+        for entry in other.entries():
+            source = other.snapshot_dir / entry["arquivo"]
+            if not source.exists():
+                continue
+            target = self.file_for(entry["caminho"])
+            merged = dict(entry, arquivo=target.name)
+            with self._lock:
+                self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(source.read_bytes())
+                with open(self.snapshot_dir / INDEX_FILE, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(merged, ensure_ascii=False) + "\n")
+            copied += 1
+        if copied:
+            self.compact()
+        return copied
+
+    def compact(self) -> int:
+        """
+        Reescreve o indice mantendo apenas o registro mais recente de cada no.
+
+        Returns:
+            int: Numero de registros mantidos
+        """
+        with self._lock:
+            entries = self.entries()
+            index = self.snapshot_dir / INDEX_FILE
+            if not index.exists():
+                return 0
+            tmp_file = index.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_file, index)
+        return len(entries)
+
+    def read(self, entry: dict) -> str:
+        """HTML de um snapshot do indice."""
+        return gzip.decompress((self.snapshot_dir / entry["arquivo"]).read_bytes()).decode("utf-8")
+
+    def report(self):
+        """Imprime quantos snapshots foram gravados nesta coleta e a taxa de compressao."""
+        if not self.count:
+            return
+        ratio = self.raw_bytes / self.stored_bytes if self.stored_bytes else 0
+        print(
+            f"[*] Snapshots do painel: {self.count} em {self.snapshot_dir} "
+            f"({self.stored_bytes / 1024:.1f} KiB, {ratio:.1f}x comprimido)"
+        )
+
+
+# Classificador de cada processo trabalhador (regras compiladas uma vez por processo)
+_worker_classifier = None
+
+
+def _reextract_entry(job: tuple) -> tuple:
+    """
+    Trabalhador: refaz o info de um no a partir do snapshot.
+
+    Returns:
+        tuple: (caminho, info) ou (caminho, {"erro": ...})
+    """
+    global _worker_classifier
+    snapshot_dir, entry = job
+    if _worker_classifier is None:
+        _worker_classifier = LabelClassifier()
+    try:
+        html = PanelSnapshotStore(snapshot_dir).read(entry)
+        payload = extract_payload(parse_html(html))
+        info = build_node_info(payload["titulo"], payload["decreto"], payload["pairs"],
+                               _worker_classifier, timestamp=entry.get("timestamp"))
+    except Exception as e:
+        info = {"erro": f"{type(e).__name__}: {e}"}
+    return entry["caminho"], info
+
+
+def reextract(snapshot_dir: str = PANEL_SNAPSHOT_DIR, output_file: str = "data/arvore_sms_reextraida.ndjson",
+              workers: int = None) -> int:
+    """
+    Refaz o info de todos os nos a partir dos snapshots, em varios processos.
+
+    Args:
+        snapshot_dir: Pasta dos snapshots
+        output_file: NDJSON de saida (formato de TREE_STREAM_FILE)
+        workers: Processos (None: um por nucleo)
+
+    Returns:
+        int: Numero de nos reextraidos
+    """
+    entries = PanelSnapshotStore(snapshot_dir).entries()
+    if not entries:
+        print(f"[!] Nenhum snapshot em {snapshot_dir}")
+        return 0
+
+    workers = workers or os.cpu_count() or 1
+    print(f"[*] Reextraindo {len(entries)} no(s) de {snapshot_dir} com {workers} processo(s)...")
+    start = time.perf_counter()
+    writer = TreeStreamWriter(output_file)
+    errors = 0
+    try:
+        jobs = [(str(snapshot_dir), entry) for entry in entries]
+        chunksize = max(1, len(jobs) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for tree_path, info in pool.map(_reextract_entry, jobs, chunksize=chunksize):
+                if "erro" in info:
+                    errors += 1
+                    print(f"   [ERRO] {path_key(tree_path)}: {info['erro']}")
+                writer.write(tree_path, info)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"[OK] {len(entries)} no(s) em {elapsed:.1f}s ({len(entries) / elapsed:.0f} nos/s), "
+        f"{errors} erro(s); saida em {output_file}"
+    )
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshots do painel de detalhes do SICI")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    reextrair = sub.add_parser("reextrair", help="Refaz os dados de todos os nos a partir dos snapshots")
+    reextrair.add_argument("--pasta", default=PANEL_SNAPSHOT_DIR, help="Pasta dos snapshots")
+    reextrair.add_argument("--saida", default="data/arvore_sms_reextraida.ndjson", help="NDJSON de saida")
+    reextrair.add_argument("--processos", type=int, default=None, help="Processos (padrao: um por nucleo)")
+
+    sub.add_parser("info", help="Quantidade e tamanho dos snapshots gravados")
+    sub.add_parser("compactar", help="Reescreve o indice com a gravacao mais recente de cada no")
+
+    args = parser.parse_args()
+    if args.comando == "reextrair":
+        reextract(args.pasta, args.saida, args.processos)
+    elif args.comando == "compactar":
+        store = PanelSnapshotStore()
+        kept = store.compact()
+        print(f"[OK] Indice de {store.snapshot_dir} compactado: {kept} no(s)")
+    else:
+        store = PanelSnapshotStore()
+        entries = store.entries()
+        total = sum(entry.get("bytes", 0) for entry in entries)
+        print(f"[*] {len(entries)} no(s) com snapshot em {store.snapshot_dir} ({total / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
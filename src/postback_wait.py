@@ -0,0 +1,225 @@
+"""
+Espera por conclusao de postbacks do ASP.NET no SICI.
+
+Substitui as esperas fixas (wait_for_timeout) por deteccao do fim do postback:
+uma acao (clique, troca de dropdown) so eh considerada concluida quando
+1. a resposta POST do servidor chegou e
+2. o alvo observado (container ...treeviewn{N}Nodes ou painel de detalhes) mudou.
+
+A mudanca do alvo eh detectada por uma assinatura (atributo style + tamanho e hash
+do innerHTML) e por um token gravado em window: se a pagina foi recarregada por um
+postback completo, o token some e o novo documento ja conta como mudanca.
+Os timeouts configurados sao apenas limites superiores.
+"""
+
+import itertools
+import re
+import time
+from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+from .config import POSTBACK_TIMEOUT
+from .tree_scripts import JS_SIGNATURE_FN
+
+# Assinatura do alvo e marcacao do documento atual
+JS_MARK_AND_SIGN = """
+    ([selector, token]) => {
+        """ + JS_SIGNATURE_FN + """
+        window.__rpaPostbackToken = token;
+        return __rpaSignature(selector);
+    }
+"""
+
+# Verdadeiro quando o documento foi trocado ou o alvo mudou de assinatura
+JS_TARGET_CHANGED = """
+    ([selector, before, token]) => {
+        """ + JS_SIGNATURE_FN + """
+        if (window.__rpaPostbackToken !== token) {
+            // Postback completo: novo documento
+            return document.readyState !== 'loading';
+        }
+        if (!selector) return true;
+        return __rpaSignature(selector) !== before;
+    }
+"""
+
+_tokens = itertools.count(1)
+
+
+def new_token() -> int:
+    """
+    Token unico para marcar o documento atual antes de disparar um postback.
+    Scripts que disparam o postback por conta propria (ex: JS_EXTRACT_NODE)
+    gravam o token e devolvem a assinatura; depois basta wait_for_change().
+    """
+    return next(_tokens)
+
+
+class _NoAction(Exception):
+    """A acao nao disparou nada (ex.: elemento nao encontrado); nao ha o que esperar."""
+
+
+def children_container_selector(node_id: str) -> str:
+    """
+    Converte o ID do link de um no no seletor do container de filhos.
+    Ex: ContentPlaceHolder1_ua_treeviewt31 -> #ContentPlaceHolder1_ua_treeviewn31Nodes
+    """
+    match = re.search(r"t(\d+)i?$", node_id or "")
+    if not match:
+        return None
+    return f"#ContentPlaceHolder1_ua_treeviewn{match.group(1)}Nodes"
+
+
+def _is_postback(response) -> bool:
+    """Resposta de um postback/callback do ASP.NET (POST de documento ou XHR)."""
+    request = response.request
+    return request.method == "POST" and request.resource_type in ("document", "xhr", "fetch")
+
+
+class PostbackWaiter:
+    """
+    Executa acoes na pagina e aguarda o postback correspondente terminar.
+    """
+
+    def __init__(self, page: Page, timeout: int = POSTBACK_TIMEOUT):
+        """
+        Args:
+            page: Pagina do Playwright (API sincrona)
+            timeout: Limite superior de espera por acao (ms)
+        """
+        self.page = page
+        self.timeout = timeout
+
+    def run(self, action, target_selector: str = None) -> bool:
+        """
+        Executa a acao e aguarda a resposta do postback e a mudanca do alvo.
+
+        Args:
+            action: Funcao sem argumentos que dispara o postback; se retornar
+                    um valor falso, considera-se que nada foi disparado
+            target_selector: Seletor CSS do elemento que deve mudar
+
+        Returns:
+            bool: True se o postback terminou dentro do limite, False caso contrario
+        """
+        token = new_token()
+        deadline = time.monotonic() + self.timeout / 1000
+
+        try:
+            before = self.page.evaluate(JS_MARK_AND_SIGN, [target_selector, token])
+        except Exception:
+            before = 'missing'
+
+        try:
+            with self.page.expect_response(_is_postback, timeout=self.timeout):
+                if not action():
+                    raise _NoAction()
+        except _NoAction:
+            return False
+        except PlaywrightTimeoutError:
+            # Nenhum POST: a acao pode ter sido resolvida so no cliente
+            pass
+
+        remaining = max(1, int((deadline - time.monotonic()) * 1000))
+        return self.wait_for_change(target_selector, before, token, remaining)
+
+    def wait_for_change(self, target_selector: str, before: str, token: int, timeout: int = None) -> bool:
+        """
+        Aguarda o alvo mudar em relacao a assinatura 'before' (ou o documento ser trocado).
+        A mudanca so acontece depois que a resposta do postback foi aplicada.
+
+        Returns:
+            bool: True se mudou dentro do limite, False caso contrario
+        """
+        try:
+            self.page.wait_for_function(
+                JS_TARGET_CHANGED, arg=[target_selector, before, token], timeout=timeout or self.timeout
+            )
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    def click_and_wait(self, script: str, node_id: str, target_selector: str = None) -> bool:
+        """
+        Atalho: executa um script de clique (retornando truthy) e aguarda o postback.
+        """
+        return self.run(lambda: self.page.evaluate(script, node_id) is not False, target_selector)
+
+
+class AsyncPostbackWaiter:
+    """
+    Versao assincrona de PostbackWaiter para o motor AsyncSiciSmsScraper.
+    """
+
+    def __init__(self, page, timeout: int = POSTBACK_TIMEOUT, limiter=None):
+        """
+        Args:
+            page: Pagina (API assincrona)
+            timeout: Limite superior de espera por acao (ms)
+            limiter: AdaptiveLimiter compartilhado entre as paginas (opcional); cada
+                     postback ocupa uma vaga e tem a latencia registrada
+        """
+        self.page = page
+        self.timeout = timeout
+        self.limiter = limiter
+        self.timed_out = False
+        self.fired = False
+
+    async def run(self, action, target_selector: str = None, token: int = None) -> bool:
+        """
+        Mesmo contrato de PostbackWaiter.run, com action sendo uma corrotina.
+        token: marcacao ja usada pela acao (ex.: JS_EXTRACT_NODE); None gera uma nova.
+        Se a acao nao disparar nada, a vaga do limitador nao vira amostra de latencia.
+        """
+        if self.limiter is None:
+            return await self._run(action, target_selector, token)
+        async with self.limiter.slot() as outcome:
+            changed = await self._run(action, target_selector, token)
+            outcome["ok"] = not self.timed_out
+            outcome["skip"] = not self.fired
+            return changed
+
+    async def _run(self, action, target_selector: str = None, token: int = None) -> bool:
+        self.timed_out = False
+        self.fired = False
+        token = token or new_token()
+        deadline = time.monotonic() + self.timeout / 1000
+
+        try:
+            before = await self.page.evaluate(JS_MARK_AND_SIGN, [target_selector, token])
+        except Exception:
+            before = 'missing'
+
+        try:
+            async with self.page.expect_response(_is_postback, timeout=self.timeout):
+                if not await action():
+                    raise _NoAction()
+                self.fired = True
+        except _NoAction:
+            return False
+        except PlaywrightTimeoutError:
+            self.timed_out = True
+
+        remaining = max(1, int((deadline - time.monotonic()) * 1000))
+        changed = await self.wait_for_change(target_selector, before, token, remaining)
+        if not changed:
+            self.timed_out = True
+        return changed
+
+    async def wait_for_change(self, target_selector: str, before: str, token: int, timeout: int = None) -> bool:
+        """
+        Mesmo contrato de PostbackWaiter.wait_for_change.
+        """
+        try:
+            await self.page.wait_for_function(
+                JS_TARGET_CHANGED, arg=[target_selector, before, token], timeout=timeout or self.timeout
+            )
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def click_and_wait(self, script: str, node_id: str, target_selector: str = None) -> bool:
+        """
+        Atalho: executa um script de clique (retornando truthy) e aguarda o postback.
+        """
+        async def action():
+            return await self.page.evaluate(script, node_id) is not False
+        return await self.run(action, target_selector)
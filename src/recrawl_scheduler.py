@@ -0,0 +1,175 @@
+"""
+Agenda de recoleta incremental baseada na frequencia de mudanca de cada no.
+
+A maioria das unidades (titular, endereco, comunicacoes) muda raramente, entao
+nao precisa ser clicada e extraida em toda execucao. Para cada caminho de no a
+agenda guarda quando as informacoes extraidas mudaram pela ultima vez:
+- No novo ou que mudou na ultima visita (volatil): visitado em toda execucao
+- No estavel: o intervalo (em execucoes) dobra a cada visita sem mudanca,
+  ate RECRAWL_MAX_INTERVAL
+- Nos nao devidos continuam recebendo a passada estrutural (a arvore ainda eh
+  expandida), entao inclusoes e remocoes sao detectadas em toda execucao
+
+O historico eh alimentado pelos JSON por no gravados em _save_node_data: o
+conteudo anterior do arquivo (sem o timestamp) eh comparado com o novo.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+from .config import RECRAWL_MAX_INTERVAL, RECRAWL_STATE_FILE
+from .tree_model import PATH_SEPARATOR
+
+
+def info_fingerprint(info: dict) -> str:
+    """
+    Hash das informacoes de um no, ignorando o timestamp da coleta.
+    """
+    content = {k: v for k, v in (info or {}).items() if k != "timestamp"}
+    encoded = json.dumps(content, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class RecrawlScheduler:
+    """
+    Decide, por caminho de no, se as informacoes devem ser recoletadas nesta execucao.
+    """
+
+    def __init__(self, state_file: str = RECRAWL_STATE_FILE, max_interval: int = RECRAWL_MAX_INTERVAL):
+        """
+        Args:
+            state_file: Arquivo JSON com o historico por caminho
+            max_interval: Intervalo maximo (em execucoes) entre visitas de um no estavel
+        """
+        self.state_file = Path(state_file)
+        self.max_interval = max(1, max_interval)
+        self.run = 0
+        self.nodes = {}
+        self.stats = {"visitados": 0, "pulados": 0, "novos": 0, "alterados": 0, "removidos": []}
+        self._load()
+
+    def _load(self):
+        """Carrega o historico salvo (se existir)."""
+        if not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.run = state.get("run", 0)
+            self.nodes = state.get("nodes", {})
+        except Exception as e:
+            print(f"[!] Agenda de recoleta ilegivel, recomecando: {e}")
+
+    def save(self):
+        """Grava o historico."""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump({"run": self.run, "nodes": self.nodes}, f, ensure_ascii=False, indent=2)
+
+    def start_run(self):
+        """Inicia uma nova execucao."""
+        self.run += 1
+        self.stats = {"visitados": 0, "pulados": 0, "novos": 0, "alterados": 0, "removidos": []}
+
+    def interval(self, path: str) -> int:
+        """Intervalo atual (em execucoes) entre visitas do no."""
+        entry = self.nodes.get(path)
+        if not entry:
+            return 1
+        return min(2 ** entry.get("stable_visits", 0), self.max_interval)
+
+    def staleness(self, path: str) -> float:
+        """
+        Quao atrasado o no esta: execucoes desde a ultima visita divididas pelo
+        intervalo dele (>= 1: vencido). Nos nunca visitados: infinito.
+        """
+        entry = self.nodes.get(path)
+        if entry is None or "run_last_visited" not in entry:
+            return float("inf")
+        return (self.run - entry["run_last_visited"]) / self.interval(path)
+
+    def mark_seen(self, path: str):
+        """Passada estrutural: o no existe na arvore nesta execucao."""
+        entry = self.nodes.get(path)
+        if entry is not None:
+            entry["run_last_seen"] = self.run
+
+    def mark_subtree_seen(self, path: str):
+        """
+        Mantem o no e seus descendentes conhecidos quando a subarvore nao pode ser
+        percorrida (erro), para nao confundir uma falha com remocao.
+        """
+        prefix = path + PATH_SEPARATOR
+        for key, entry in self.nodes.items():
+            if key == path or key.startswith(prefix):
+                entry["run_last_seen"] = self.run
+
+    def is_due(self, path: str) -> bool:
+        """
+        True se o no deve ser clicado e extraido nesta execucao.
+        """
+        entry = self.nodes.get(path)
+        if entry is None:
+            return True
+        due = self.run - entry.get("run_last_visited", 0) >= self.interval(path)
+        if not due:
+            self.stats["pulados"] += 1
+        return due
+
+    def record_visit(self, path: str, info: dict, previous_info: dict = None):
+        """
+        Registra as informacoes extraidas de um no.
+
+        Args:
+            path: Caminho do no
+            info: Informacoes extraidas agora
+            previous_info: Conteudo anterior do JSON do no (usado quando ainda nao ha historico)
+        """
+        now = datetime.now().isoformat()
+        fingerprint = info_fingerprint(info)
+        entry = self.nodes.get(path)
+
+        if entry is None and previous_info is not None:
+            # Primeira vez na agenda: usar o JSON ja gravado como referencia
+            entry = {
+                "fingerprint": info_fingerprint(previous_info),
+                "last_changed": previous_info.get("timestamp"),
+                "stable_visits": 0,
+            }
+
+        self.stats["visitados"] += 1
+        if entry is None:
+            self.stats["novos"] += 1
+            entry = {"fingerprint": fingerprint, "last_changed": now, "stable_visits": 0}
+        elif entry.get("fingerprint") != fingerprint:
+            self.stats["alterados"] += 1
+            entry.update({"fingerprint": fingerprint, "last_changed": now, "stable_visits": 0})
+        else:
+            entry["stable_visits"] = entry.get("stable_visits", 0) + 1
+
+        entry["last_visited"] = now
+        entry["run_last_visited"] = self.run
+        entry["run_last_seen"] = self.run
+        self.nodes[path] = entry
+
+    def finish_run(self) -> dict:
+        """
+        Encerra a execucao: nos que nao apareceram na passada estrutural sao removidos
+        da agenda. Grava o historico e retorna as estatisticas.
+        """
+        removed = [path for path, entry in self.nodes.items() if entry.get("run_last_seen", 0) < self.run]
+        for path in removed:
+            del self.nodes[path]
+        self.stats["removidos"] = removed
+        self.save()
+
+        print(
+            f"[*] Agenda de recoleta (execucao {self.run}): {self.stats['visitados']} visitado(s), "
+            f"{self.stats['pulados']} estavel(is) pulado(s), {self.stats['novos']} novo(s), "
+            f"{self.stats['alterados']} alterado(s), {len(removed)} removido(s)"
+        )
+        for path in removed:
+            print(f"   [-] Removido: {path}")
+        return self.stats
@@ -0,0 +1,143 @@
+"""
+Bloqueio de recursos desnecessarios via roteamento de requisicoes do Playwright.
+
+Cada clique no TreeView gera um postback, e o navegador volta a baixar ou
+decodificar imagens, fontes e scripts de terceiros que a coleta nunca usa:
+o scraper so le texto, e dos icones de expandir/colapsar so precisa dos
+atributos alt/src, que estao no HTML mesmo com a imagem bloqueada.
+
+ResourceBlocker instala uma rota em todo o contexto e aborta:
+- tipos de recurso em BLOCKED_RESOURCE_TYPES (padrao: image, font, media)
+- qualquer requisicao para hosts de analytics em BLOCKED_HOSTS
+- scripts de outros hosts, se BLOCK_THIRD_PARTY_SCRIPTS
+
+Folhas de estilo NAO sao bloqueadas por padrao: a extracao de pares usa
+innerText, que depende do layout (DIVs de Titular/Cargo lado a lado).
+
+Com MEASURE_BLOCKED_BYTES (desligado por padrao), o tamanho de cada URL
+bloqueada eh descoberto uma vez pelo content-length de um HEAD e somado a cada
+bloqueio seguinte. O HEAD eh uma requisicao a mais ao servidor que o bloqueio
+deveria poupar, e segura a rota ate a resposta: serve so para medir a economia.
+"""
+
+import fnmatch
+from urllib.parse import urlparse
+
+from .config import (
+    BASE_URL,
+    BLOCKED_HOSTS,
+    BLOCKED_RESOURCE_TYPES,
+    BLOCK_THIRD_PARTY_SCRIPTS,
+    MEASURE_BLOCKED_BYTES,
+)
+
+
+class ResourceBlocker:
+    """
+    Rota "**/*" que aborta recursos nao essenciais e contabiliza a economia.
+    """
+
+    def __init__(
+        self,
+        blocked_types=BLOCKED_RESOURCE_TYPES,
+        blocked_hosts=BLOCKED_HOSTS,
+        block_third_party_scripts: bool = BLOCK_THIRD_PARTY_SCRIPTS,
+        measure: bool = MEASURE_BLOCKED_BYTES,
+        base_url: str = BASE_URL,
+    ):
+        """
+        Args:
+            blocked_types: Tipos de recurso do Playwright a abortar (request.resource_type)
+            blocked_hosts: Hosts (aceita curingas, ex: "*.doubleclick.net") sempre abortados
+            block_third_party_scripts: Abortar scripts de hosts diferentes do SICI
+            measure: Descobrir o tamanho de cada URL bloqueada com um HEAD (uma vez por URL;
+                     uma requisicao a mais por URL nova)
+            base_url: URL do SICI (define o host "proprio")
+        """
+        self.blocked_types = set(blocked_types)
+        self.blocked_hosts = list(blocked_hosts)
+        self.block_third_party_scripts = block_third_party_scripts
+        self.measure = measure
+        self.first_party_host = urlparse(base_url).hostname
+        self.sizes = {}
+        self.stats = {"bloqueadas": 0, "permitidas": 0, "bytes_economizados": 0, "por_tipo": {}}
+
+    def _is_blocked_host(self, host: str) -> bool:
+        return any(host == pattern or fnmatch.fnmatch(host, pattern) for pattern in self.blocked_hosts)
+
+    def reason(self, request) -> str:
+        """
+        Motivo do bloqueio da requisicao, ou None se ela deve seguir.
+        """
+        host = urlparse(request.url).hostname or ""
+        if self._is_blocked_host(host):
+            return "analytics"
+        if request.resource_type in self.blocked_types:
+            return request.resource_type
+        if (self.block_third_party_scripts and request.resource_type == "script"
+                and host and host != self.first_party_host):
+            return "script-terceiro"
+        return None
+
+    def _count_blocked(self, url: str, reason: str):
+        self.stats["bloqueadas"] += 1
+        self.stats["por_tipo"][reason] = self.stats["por_tipo"].get(reason, 0) + 1
+        self.stats["bytes_economizados"] += self.sizes.get(url) or 0
+
+    def _learn_size(self, response):
+        """Registra o tamanho declarado de uma resposta (content-length)."""
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.sizes[response.url] = int(length)
+
+    def _handle(self, route):
+        request = route.request
+        reason = self.reason(request)
+        if reason is None:
+            self.stats["permitidas"] += 1
+            route.fallback()
+            return
+
+        if self.measure and reason != "analytics" and request.url not in self.sizes:
+            self.sizes[request.url] = 0
+            try:
+                self._learn_size(route.fetch(method="HEAD"))
+            except Exception:
+                pass
+        self._count_blocked(request.url, reason)
+        route.abort("blockedbyclient")
+
+    async def _handle_async(self, route):
+        request = route.request
+        reason = self.reason(request)
+        if reason is None:
+            self.stats["permitidas"] += 1
+            await route.fallback()
+            return
+
+        if self.measure and reason != "analytics" and request.url not in self.sizes:
+            self.sizes[request.url] = 0
+            try:
+                self._learn_size(await route.fetch(method="HEAD"))
+            except Exception:
+                pass
+        self._count_blocked(request.url, reason)
+        await route.abort("blockedbyclient")
+
+    def install(self, context):
+        """Instala a rota em um BrowserContext (API sincrona)."""
+        context.route("**/*", self._handle)
+
+    async def install_async(self, context):
+        """Instala a rota em um BrowserContext (API assincrona)."""
+        await context.route("**/*", self._handle_async)
+
+    def report(self):
+        """Imprime o resumo do que foi bloqueado nesta coleta."""
+        stats = self.stats
+        por_tipo = ", ".join(f"{k}: {v}" for k, v in sorted(stats["por_tipo"].items())) or "nenhum"
+        saved = f"; ~{stats['bytes_economizados'] / 1024:.1f} KiB economizados" if self.measure else ""
+        print(
+            f"[*] Recursos bloqueados: {stats['bloqueadas']} ({por_tipo}); "
+            f"permitidos: {stats['permitidas']}{saved}"
+        )
@@ -0,0 +1,178 @@
+"""
+Fila de novas tentativas e disjuntor por subarvore para os nos que falham.
+
+Um no que falha durante a passada (timeout de postback, painel que nao carrega...)
+nao eh mais perdido junto com a subarvore: o caminho vai para RetryQueue e a
+coleta segue. Ao final da passada, drain() tenta de novo cada caminho, em ordem,
+esperando RETRY_BACKOFF_BASE * 2^(tentativa-1) segundos entre as tentativas do
+mesmo no, ate RETRY_MAX_ATTEMPTS tentativas.
+
+O disjuntor conta falhas seguidas sob o mesmo pai. Com BREAKER_THRESHOLD falhas,
+ele abre: os irmaos ainda nao visitados vao direto para a fila, sem clique (e sem
+gastar um timeout cada). Na fila, um no por subarvore aberta eh tentado de cada
+vez; se ele conseguir, o disjuntor fecha, se falhar, os irmaos esperam a proxima
+janela de espera dele.
+
+Os caminhos que esgotarem as tentativas ficam em INCOMPLETE_PATHS_FILE; o diario
+de coleta (crawl_journal) mantem os nos ja concluidos, entao a proxima execucao
+so visita esses caminhos e reexpande seus ancestrais.
+"""
+
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .config import BREAKER_THRESHOLD, INCOMPLETE_PATHS_FILE, RETRY_BACKOFF_BASE, RETRY_MAX_ATTEMPTS
+from .tree_model import path_key
+
+
+class RetryQueue:
+    """
+    Caminhos de nos que falharam, com espera exponencial e disjuntor por pai.
+    """
+
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, backoff_base: float = RETRY_BACKOFF_BASE,
+                 breaker_threshold: int = BREAKER_THRESHOLD):
+        """
+        Args:
+            max_attempts: Tentativas por no, contando a falha da passada
+            backoff_base: Espera (s) antes da primeira nova tentativa; dobra a cada falha
+            breaker_threshold: Falhas seguidas sob o mesmo pai que abrem o disjuntor
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.breaker_threshold = max(1, breaker_threshold)
+        self.entries = {}
+        self.failed = []
+        self.recovered = 0
+        self._failures = {}
+        self._open = set()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def breaker_open(self, parent_path: list) -> bool:
+        """True se os filhos deste pai vem falhando em sequencia (nao clicar agora)."""
+        return path_key(parent_path) in self._open
+
+    def record_success(self, parent_path: list):
+        """Um filho do pai foi visitado com sucesso: zera a contagem e fecha o disjuntor."""
+        key = path_key(parent_path)
+        self._failures.pop(key, None)
+        if key in self._open:
+            self._open.discard(key)
+            print(f"[OK] Disjuntor de '{key}' fechado")
+
+    def _record_failure(self, parent_path: list):
+        key = path_key(parent_path)
+        self._failures[key] = self._failures.get(key, 0) + 1
+        if self._failures[key] >= self.breaker_threshold and key not in self._open:
+            self._open.add(key)
+            print(f"[!] Disjuntor de '{key}' aberto apos {self._failures[key]} falha(s) seguida(s)")
+
+    def defer(self, path: list, error=None, attempted: bool = True):
+        """
+        Coloca (ou recoloca) um caminho na fila.
+
+        Args:
+            path: Caminho do no desde a raiz
+            error: Falha observada (None se o no foi adiado sem tentativa)
+            attempted: False quando o disjuntor adiou o no sem clicar
+        """
+        key = path_key(path)
+        entry = self.entries.get(key) or {"caminho": list(path), "tentativas": 0, "erro": None, "proxima": 0.0}
+        if attempted:
+            entry["tentativas"] += 1
+            entry["erro"] = f"{type(error).__name__}: {error}" if isinstance(error, Exception) else error
+            entry["proxima"] = time.monotonic() + self.backoff_base * 2 ** (entry["tentativas"] - 1)
+            self._record_failure(path[:-1])
+        else:
+            # Adiado pelo disjuntor: nao antes da nova tentativa dos irmaos que falharam
+            parent = list(path[:-1])
+            entry["proxima"] = max([entry["proxima"]] + [
+                other["proxima"] for other in self.entries.values() if other["caminho"][:-1] == parent
+            ])
+        self.entries[key] = entry
+
+    def _next_entry(self) -> tuple:
+        """
+        Proxima entrada a tentar: a de menor horario entre os nos com disjuntor
+        fechado e, em cada subarvore com disjuntor aberto, so a primeira (a sonda);
+        os irmaos dela esperam o resultado.
+        """
+        def order(entry):
+            # Empate: a sonda atual (mais tentativas) continua sendo a sonda
+            return (entry["proxima"], -entry["tentativas"])
+
+        probes = {}
+        candidates = []
+        for key, entry in self.entries.items():
+            parent = path_key(entry["caminho"][:-1])
+            if parent in self._open:
+                probe = probes.get(parent)
+                if probe is not None and order(probe[1]) <= order(entry):
+                    continue
+                probes[parent] = (key, entry)
+            else:
+                candidates.append((key, entry))
+        return min(candidates + list(probes.values()), key=lambda item: order(item[1]))
+
+    def drain(self, retry) -> list:
+        """
+        Tenta de novo cada caminho da fila ate ele passar ou esgotar as tentativas.
+        Nos que falharem dentro de retry() (ex.: filhos do no) entram na mesma fila.
+
+        Args:
+            retry: Funcao retry(caminho) que revisita o no e sua subarvore (levanta excecao se falhar)
+
+        Returns:
+            list: Entradas {caminho, tentativas, erro} que esgotaram as tentativas
+        """
+        while self.entries:
+            key, entry = self._next_entry()
+            wait = entry["proxima"] - time.monotonic()
+            if wait > 0:
+                print(f"[*] Aguardando {wait:.1f}s antes de tentar de novo '{key}' ({len(self.entries)} na fila)")
+                time.sleep(wait)
+
+            del self.entries[key]
+            parent = entry["caminho"][:-1]
+            print(f"[*] Nova tentativa ({entry['tentativas'] + 1}/{self.max_attempts}): {key}")
+            try:
+                retry(entry["caminho"])
+            except Exception as e:
+                self.entries[key] = entry
+                self.defer(entry["caminho"], e)
+                if entry["tentativas"] >= self.max_attempts:
+                    del self.entries[key]
+                    self.failed.append({k: entry[k] for k in ("caminho", "tentativas", "erro")})
+                    print(f"   [ERRO] Desistindo de '{key}' apos {entry['tentativas']} tentativa(s): {entry['erro']}")
+                elif self.breaker_open(parent):
+                    # Subarvore ainda falhando: os irmaos esperam pelo menos o mesmo tempo
+                    for other in self.entries.values():
+                        if other["caminho"][:-1] == parent:
+                            other["proxima"] = max(other["proxima"], entry["proxima"])
+                continue
+            self.recovered += 1
+            self.record_success(parent)
+        return self.failed
+
+    def report(self, incomplete_file: str = INCOMPLETE_PATHS_FILE):
+        """
+        Grava e imprime os caminhos que continuam incompletos (remove o arquivo se nenhum).
+        """
+        target = Path(incomplete_file)
+        if self.recovered:
+            print(f"[OK] {self.recovered} no(s) recuperado(s) na fila de novas tentativas")
+        if not self.failed:
+            if target.exists():
+                target.unlink()
+            return
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump({"gerado_em": datetime.now().isoformat(), "caminhos": self.failed}, f, ensure_ascii=False, indent=2)
+        print(f"[!] {len(self.failed)} caminho(s) incompleto(s) (lista em {target}; a proxima execucao retoma so estes):")
+        for entry in self.failed:
+            print(f"    {path_key(entry['caminho'])}  ({entry['tentativas']} tentativa(s): {entry['erro']})")
@@ -0,0 +1,198 @@
+"""
+Coleta em varios processos, um ramo (filho direto de SMS) por vez em cada um.
+
+Um unico processo Python com um navegador nao passa de um nucleo. A arvore se
+divide naturalmente sob SMS (coordenadorias de AP, hospitais, CERs...):
+- o processo principal abre o site, expande SMS, extrai os dados do proprio SMS
+  e lista seus filhos diretos
+- um ProcessPoolExecutor com SHARD_PROCESSES processos recebe um ramo por vez
+  (o proximo ramo vai para o primeiro processo livre); cada ramo roda em um
+  SiciSmsScraper proprio, com navegador proprio, restrito ao ramo
+- diario, NDJSON, agenda de recoleta, armazenamento, snapshots e log de cada
+  ramo ficam em SHARD_DIR/<ramo>/; um ramo interrompido continua do diario na proxima execucao
+- ao final, o processo principal junta os ramos na ordem de exibicao da arvore
+  (SMS, depois cada ramo na ordem em que foi gravado), independente de qual
+  processo terminou primeiro, e gera TREE_STREAM_FILE, sms_informacoes.json,
+  resumo.json, o armazenamento, o indice SQLite e junta os snapshots em
+  PANEL_SNAPSHOT_DIR
+
+    python -m src.sharded_crawl
+    python -m src.sharded_crawl --processos 8
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .config import BASE_URL, PANEL_SNAPSHOT_DIR, PANEL_SNAPSHOTS, SHARD_DIR, SHARD_PROCESSES, STORAGE_BACKEND, TRACE_FILE, TRACE_SUMMARY_FILE, TREE_STREAM_FILE, UNIT_INDEX_DB
+from .node_store import open_node_store, safe_filename
+from .panel_snapshots import PanelSnapshotStore
+from .sici_scraper import SiciSmsScraper
+from .tree_stream import TreeStreamWriter, rebuild_outputs
+from .unit_index import UnitIndex
+
+
+def branch_dir(shard_dir: str, name: str) -> Path:
+    """Pasta de estado de um ramo (nome estavel entre execucoes, independente da posicao)."""
+    return Path(shard_dir) / safe_filename(name)
+
+
+def _crawl_branch(job: tuple) -> dict:
+    """
+    Trabalhador: percorre um ramo de SMS com um SiciSmsScraper proprio.
+    A saida do scraper vai para <pasta do ramo>/coleta.log.
+
+    Returns:
+        dict: {ramo, completo, nos, segundos, erro}
+    """
+    name, state_dir, base_url = job
+    state_dir = Path(state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    result = {"ramo": name, "completo": False, "nos": 0, "segundos": 0.0, "erro": None}
+    start = time.perf_counter()
+
+    with open(state_dir / "coleta.log", "w", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+        scraper = SiciSmsScraper(base_url=base_url, branches=[name], state_dir=state_dir)
+        try:
+            with scraper:
+                result["completo"] = scraper.crawl()
+            scraper.tracer.export(state_dir / Path(TRACE_FILE).name, state_dir / Path(TRACE_SUMMARY_FILE).name)
+            if scraper.accountant:
+                scraper.accountant.report()
+        except Exception as e:
+            print(f"[ERRO] Falha no ramo '{name}': {e}")
+            result["erro"] = f"{type(e).__name__}: {e}"
+        finally:
+            if scraper.tree_stream:
+                scraper.tree_stream.close()
+                result["nos"] = scraper.tree_stream.count
+
+    result["segundos"] = time.perf_counter() - start
+    return result
+
+
+def merge_branches(sms_info: dict, branches: list, shard_dir: str = SHARD_DIR,
+                   stream_file: str = TREE_STREAM_FILE, data_dir: str = "data") -> int:
+    """
+    Junta os NDJSON dos ramos (na ordem de branches) em stream_file e gera
+    sms_informacoes.json e resumo.json; grava cada no no armazenamento e no indice
+    SQLite e copia os snapshots de cada ramo para PANEL_SNAPSHOT_DIR.
+
+    Returns:
+        int: Numero de nos na arvore
+    """
+    writer = TreeStreamWriter(stream_file)
+    store = open_node_store(STORAGE_BACKEND)
+    index = UnitIndex() if UNIT_INDEX_DB else None
+    snapshots = PanelSnapshotStore() if PANEL_SNAPSHOTS else None
+
+    def add(path, info, position=None):
+        writer.write(path, info, position)
+        if info is None:
+            return
+        if store:
+            store.put(path[-1], info, path)
+        if index:
+            index.upsert(path[-1], info, path)
+
+    try:
+        add(["SMS"], sms_info)
+        for name in branches:
+            if snapshots:
+                snapshots.merge(PanelSnapshotStore(branch_dir(shard_dir, name) / Path(PANEL_SNAPSHOT_DIR).name))
+            branch_stream = branch_dir(shard_dir, name) / Path(TREE_STREAM_FILE).name
+            if not branch_stream.exists():
+                continue
+            with open(branch_stream, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    add(record["caminho"], record.get("info"), record.get("posicao"))
+    finally:
+        writer.close()
+        if store:
+            store.close()
+        if index:
+            index.commit()
+
+    os.makedirs(data_dir, exist_ok=True)
+    json_file = os.path.join(data_dir, "sms_informacoes.json")
+    resumo_file = os.path.join(data_dir, "resumo.json")
+    total = rebuild_outputs(stream_file, json_file, resumo_file)
+    print(f"Dados completos salvos em {json_file} ({total} nos)")
+    print(f"Resumo salvo em {resumo_file}")
+    return total
+
+
+def crawl_sharded(processes: int = SHARD_PROCESSES, shard_dir: str = SHARD_DIR, base_url: str = BASE_URL) -> bool:
+    """
+    Coleta a arvore de SMS distribuindo os ramos entre processos.
+
+    Args:
+        processes: Processos trabalhadores (None: um por nucleo; nunca mais que o numero de ramos)
+        shard_dir: Pasta com o estado de cada ramo
+        base_url: URL da pagina principal do SICI
+
+    Returns:
+        bool: True se todos os ramos foram concluidos
+    """
+    print("\n" + "="*60)
+    print("Iniciando RPA SICI SMS (varios processos)")
+    print("="*60 + "\n")
+    start = time.perf_counter()
+
+    with SiciSmsScraper(base_url=base_url, listing_only=True) as scraper:
+        scraper.open_site()
+        sms_info, branches = scraper.list_root_children()
+    if sms_info is None:
+        return False
+
+    workers = max(1, min(processes or os.cpu_count() or 1, len(branches) or 1))
+    print(f"[*] {len(branches)} ramo(s) de SMS em {workers} processo(s); logs em {shard_dir}/<ramo>/coleta.log")
+
+    results = {}
+    jobs = [(name, str(branch_dir(shard_dir, name)), base_url) for name in branches]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_crawl_branch, job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["ramo"]] = result
+            status = "[OK]" if result["completo"] else "[!]"
+            detail = f", {result['erro']}" if result["erro"] else ""
+            print(f"{status} {result['ramo']}: {result['nos']} no(s) em {result['segundos']:.1f}s{detail} "
+                  f"({len(results)}/{len(branches)})")
+
+    merge_branches(sms_info, branches, shard_dir)
+
+    elapsed = time.perf_counter() - start
+    busy = sum(result["segundos"] for result in results.values())
+    print(f"[*] {elapsed:.1f}s no total; {busy:.1f}s somados nos ramos ({busy / elapsed:.1f}x em {workers} processo(s))")
+
+    incomplete = [name for name in branches if not results.get(name, {}).get("completo")]
+    if incomplete:
+        print(f"[!] {len(incomplete)} ramo(s) incompleto(s), retomados do diario na proxima execucao: {', '.join(incomplete)}")
+        return False
+
+    print("\n" + "="*60)
+    print("RPA concluida com sucesso!")
+    print("="*60 + "\n")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta da arvore de SMS em varios processos (um ramo por vez em cada)")
+    parser.add_argument("--processos", type=int, default=SHARD_PROCESSES, help="Processos (padrao: SHARD_PROCESSES ou um por nucleo)")
+    parser.add_argument("--pasta", default=SHARD_DIR, help="Pasta com o estado de cada ramo")
+    parser.add_argument("--url", default=BASE_URL, help="URL da pagina principal (ex.: servidor sintetico)")
+    args = parser.parse_args()
+    crawl_sharded(args.processos, args.pasta, args.url)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,33 @@ Este scraper funciona com um TreeView customizado do ASP.NET onde:
 
 import json
 import os
+import time
 from pathlib import Path
 from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
-from .config import BASE_URL, HEADLESS, OUTPUT_JSON, CLICK_TIMEOUT, ROUND_TIMEOUT, COLLECTED_DATA_DIR
+from .config import BASE_URL, COLLECTED_DATA_DIR, RECRAWL_SCHEDULE, CRAWL_RESTARTS, STORAGE_BACKEND, UNIT_INDEX_DB, BLOCK_RESOURCES, BROWSER_CDP_ENDPOINT, LAUNCH_PROFILE, TRACE_SPANS, PAGE_ACCOUNTING, TRAFFIC_ARCHIVE_MODE, PANEL_SNAPSHOTS, PANEL_SNAPSHOT_DIR, CRAWL_JOURNAL_FILE, RECRAWL_STATE_FILE, TREE_STREAM_FILE, TRAFFIC_ARCHIVE_DIR, INCOMPLETE_PATHS_FILE, CRAWL_ORDER, ROOTS, ROOTS_DIR
+from .postback_wait import PostbackWaiter, children_container_selector, new_token
+from .tree_scripts import (
+    DETAIL_PANEL_SELECTOR,
+    JS_CLICK_EXPANDER,
+    JS_CLICK_NODE,
+    JS_EXTRACT_NODE,
+    JS_HAS_EXPANDER,
+)
+from .browser_service import BrowserService, StageTimer, claim_warm_page, launch_options
+from .crawl_frontier import Frontier, SubtreeTracker
+from .crawl_journal import CrawlJournal
+from .crawl_trace import CrawlTracer
+from .label_rules import LabelClassifier, build_node_info, categorize, normalize_value
+from .node_store import JsonlNodeStore, open_node_store, safe_filename
+from .page_accounting import CallAccountant
+from .panel_snapshots import PanelSnapshotStore
+from .recrawl_scheduler import RecrawlScheduler
+from .resource_blocker import ResourceBlocker
+from .retry_queue import RetryQueue
+from .traffic_archive import TrafficArchive
+from .tree_model import TreeModel, path_key
+from .tree_stream import TreeStreamWriter, rebuild_outputs
+from .unit_index import UnitIndex
 
 
 class SiciSmsScraper:
@@ -21,29 +45,119 @@ class SiciSmsScraper:
     Automatiza a expansao de nos e extracao de hierarquias.
     """
 
-    def __init__(self):
-        """Inicializa os atributos da classe."""
+    def __init__(self, browser_service: BrowserService = None, base_url: str = BASE_URL, launch_profile: str = LAUNCH_PROFILE,
+                 branches: list = None, state_dir: str = None, root_text: str = "SMS", listing_only: bool = False,
+                 recrawl_schedule: bool = True):
+        """
+        Inicializa os atributos da classe.
+        
+        Args:
+            browser_service: Servico de navegador ja iniciado no mesmo processo; se
+                             informado, a coleta usa uma de suas paginas pre-aquecidas
+            base_url: URL da pagina principal do SICI (ou de um servidor local, ex: synthetic_sici)
+            launch_profile: Perfil de LAUNCH_PROFILES usado ao abrir o navegador
+            branches: Nomes dos filhos de SMS a percorrer (None: todos). Com a lista,
+                      os dados do proprio SMS ficam com quem distribuiu os ramos
+            state_dir: Pasta propria para diario, NDJSON, agenda, armazenamento,
+                       snapshots e trafego (coleta em varios processos); sem indice SQLite
+            root_text: Texto do orgao de primeiro nivel percorrido (ver run_roots)
+            listing_only: So lista os ramos (processo que distribui a coleta, ver
+                          sharded_crawl): sem agenda, armazenamento nem indice SQLite
+            recrawl_schedule: Usa a agenda de recoleta (RECRAWL_SCHEDULE); so o
+                              expand_all_nodes sincrono a avanca, entao os motores
+                              assincrono e HTTP passam False
+        """
+        self.browser_service = browser_service
+        self.base_url = base_url
+        self.launch_profile = launch_profile
+        self.branches = set(branches) if branches else None
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.root_text = root_text
+        self.warm_page = False
+        self.startup_timer: StageTimer = None
         self.playwright = None
         self.browser: Browser = None
         self.context: BrowserContext = None
         self.page: Page = None
+        self.waiter: PostbackWaiter = None
+        self.tree: TreeModel = TreeModel()
         self.collected_data = {}
         self._setup_directories()
+        self.scheduler: RecrawlScheduler = None
+        self.journal: CrawlJournal = None
+        self.retries: RetryQueue = None
+        self.node_store: JsonlNodeStore = None
+        self.unit_index: UnitIndex = None
+        if not listing_only:
+            self.scheduler = RecrawlScheduler(self._state_file(RECRAWL_STATE_FILE)) if RECRAWL_SCHEDULE and recrawl_schedule else None
+            self.node_store = open_node_store(STORAGE_BACKEND, store_dir=self.state_dir)
+            self.unit_index = UnitIndex() if UNIT_INDEX_DB and not self.state_dir else None
+        self.tree_stream: TreeStreamWriter = None
+        self.blocker: ResourceBlocker = ResourceBlocker(base_url=base_url) if BLOCK_RESOURCES else None
+        self.archive: TrafficArchive = TrafficArchive(TRAFFIC_ARCHIVE_MODE, self._state_file(TRAFFIC_ARCHIVE_DIR)) if TRAFFIC_ARCHIVE_MODE else None
+        if self.archive and self.archive.mode == "reproduzir" and self.blocker:
+            # Sem rede na reproducao: nao medir os recursos bloqueados com HEAD
+            self.blocker.measure = False
+        self.tracer: CrawlTracer = CrawlTracer(TRACE_SPANS)
+        self.accountant: CallAccountant = CallAccountant() if PAGE_ACCOUNTING else None
+        self.classifier: LabelClassifier = LabelClassifier()
+        self.snapshots: PanelSnapshotStore = PanelSnapshotStore(self._state_file(PANEL_SNAPSHOT_DIR)) if PANEL_SNAPSHOTS else None
 
     def __enter__(self):
         """
         Context manager: inicia o Playwright e abre o navegador.
         Retorna a instancia da classe para uso com 'with'.
         """
-        # Iniciar Playwright
-        self.playwright = sync_playwright().start()
-        
-        # Abrir navegador Chromium
-        self.browser = self.playwright.chromium.launch(headless=HEADLESS)
+        self.startup_timer = StageTimer("Inicializacao do navegador")
+        self.playwright = self.browser = self.context = self.page = None
+        self.warm_page = False
         
-        # Criar contexto e pagina
-        self.context = self.browser.new_context()
-        self.page = self.context.new_page()
+        try:
+            if self.browser_service:
+                # Pagina pre-aquecida de um servico no mesmo processo
+                with self.startup_timer.stage("pagina pre-aquecida"):
+                    self.page = self.browser_service.acquire()
+                self.warm_page = True
+            else:
+                # Iniciar Playwright
+                with self.startup_timer.stage("playwright"):
+                    self.playwright = sync_playwright().start()
+            
+                if BROWSER_CDP_ENDPOINT:
+                    # Conectar ao servico de navegador ja aberto (python -m src.browser_service)
+                    with self.startup_timer.stage("conexao CDP"):
+                        self.browser = self.playwright.chromium.connect_over_cdp(BROWSER_CDP_ENDPOINT)
+                    with self.startup_timer.stage("pagina pre-aquecida"):
+                        self.page = claim_warm_page(self.browser, self.base_url)
+                    self.warm_page = self.page is not None
+                else:
+                    # Abrir navegador Chromium com o perfil configurado
+                    with self.startup_timer.stage("launch"):
+                        self.browser = self.playwright.chromium.launch(**launch_options(self.launch_profile))
+        
+            if self.page is None:
+                # Criar contexto e pagina
+                with self.startup_timer.stage("contexto"):
+                    self.context = self.browser.new_context()
+                    # Arquivo de trafego antes do bloqueio (a ultima rota instalada roda primeiro)
+                    if self.archive:
+                        self.archive.install(self.context)
+                    if self.blocker:
+                        self.blocker.install(self.context)
+                    self.page = self.context.new_page()
+            else:
+                if self.archive:
+                    self.archive.install(self.page)
+                if self.blocker:
+                    self.blocker.install(self.page)
+            if self.accountant:
+                # Toda chamada em self.page (e nos handles obtidos dela) passa a ser contabilizada
+                self.page = self.accountant.wrap(self.page)
+            self.waiter = PostbackWaiter(self.page)
+        except Exception:
+            # Falha ao abrir (ex.: navegador nao instalado): nao deixar o Playwright iniciado
+            self.__exit__(None, None, None)
+            raise
         
         return self
 
@@ -51,6 +165,16 @@ class SiciSmsScraper:
         """
         Context manager: fecha o navegador e encerra o Playwright.
         """
+        self.close_storage()
+        if self.blocker:
+            self.blocker.report()
+        if self.archive:
+            self.archive.report()
+        if self.browser_service and self.page:
+            self.browser_service.release(self.page)
+        elif self.warm_page and self.page:
+            # Pagina tomada do servico via CDP: o servico descarta o contexto
+            self.page.close()
         if self.context:
             self.context.close()
         if self.browser:
@@ -58,6 +182,51 @@ class SiciSmsScraper:
         if self.playwright:
             self.playwright.stop()
 
+    def _restart(self):
+        """
+        Fecha e reabre o navegador (ex.: apos o Chromium cair no meio da coleta).
+        """
+        try:
+            self.__exit__(None, None, None)
+        except Exception as e:
+            print(f"[!] Erro ao fechar a sessao anterior: {e}")
+        self.__enter__()
+
+    def close_storage(self):
+        """
+        Grava os registros pendentes do armazenamento em arquivo unico e
+        confirma o indice SQLite (se em uso).
+        """
+        if self.node_store:
+            self.node_store.close()
+        if self.unit_index:
+            self.unit_index.commit()
+
+    def _state_file(self, default: str) -> str:
+        """Arquivo/pasta de estado da coleta: o padrao ou, com state_dir, o mesmo nome dentro dela."""
+        if self.state_dir is None:
+            return default
+        return str(self.state_dir / Path(default).name)
+    
+    def _select_root(self, root_text: str, state_dir: str):
+        """
+        Passa a percorrer outro orgao de primeiro nivel na mesma sessao do navegador:
+        grava o que esta pendente do orgao anterior e abre agenda, diario, NDJSON e
+        armazenamento proprios em state_dir (None: os arquivos padrao). O indice
+        SQLite continua compartilhado (os caminhos ja comecam pelo orgao).
+        """
+        self.close_storage()
+        if self.tree_stream:
+            self.tree_stream.close()
+        self.root_text = root_text
+        self.state_dir = Path(state_dir) if state_dir else None
+        if self.state_dir:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.scheduler = RecrawlScheduler(self._state_file(RECRAWL_STATE_FILE)) if RECRAWL_SCHEDULE else None
+        self.journal = None
+        self.tree_stream = None
+        self.node_store = open_node_store(STORAGE_BACKEND, store_dir=self.state_dir)
+    
     def _setup_directories(self):
         """
         Cria a estrutura de diretorios para armazenar os dados coletados.
@@ -74,18 +243,7 @@ class SiciSmsScraper:
         Converte um nome em um nome de arquivo seguro.
         Remove caracteres invalidos em nomes de arquivo.
         """
-        # Remover caracteres invalidos
-        invalid_chars = r'<>:"/\|?*'
-        safe_name = name
-        for char in invalid_chars:
-            safe_name = safe_name.replace(char, '_')
-        
-        # Limitar o tamanho
-        max_length = 200
-        if len(safe_name) > max_length:
-            safe_name = safe_name[:max_length]
-        
-        return safe_name.strip()
+        return safe_filename(name)
     
     def _get_node_directory(self, node_name: str, parent_path: Path = None) -> Path:
         """
@@ -108,7 +266,7 @@ class SiciSmsScraper:
         
         return node_path
     
-    def _save_node_data(self, node_name: str, node_data: dict, parent_path: Path = None):
+    def _save_node_data(self, node_name: str, node_data: dict, parent_path: Path = None, tree_path: list = None):
         """
         Salva os dados de um no em um arquivo JSON com nome do no.
         
@@ -116,623 +274,457 @@ class SiciSmsScraper:
             node_name: Nome do no (sera usado como nome do arquivo)
             node_data: Dados coletados do no
             parent_path: Caminho pai para organizacao hierarquica
+            tree_path: Nomes dos nos desde a raiz (ex: ["SMS", "CAP 1"]); se informado,
+                       a visita eh registrada na agenda de recoleta
         """
         try:
-            node_path = self._get_node_directory(node_name, parent_path)
+            # Conteudo anterior: referencia para saber se o no mudou desde a ultima coleta
+            previous_data = self._load_node_data(node_name, tree_path) if self.scheduler and tree_path else None
             
-            # Salvar arquivo com nome do no e extensao .json
-            safe_filename = self._get_safe_filename(node_name)
-            json_file = node_path / f"{safe_filename}.json"
+            if self.node_store:
+                # Arquivo unico: sem mkdir nem arquivo por no
+                self.node_store.put(node_name, node_data, tree_path)
+                print(f"   [OK] Dados registrados: {node_name}")
+            else:
+                node_path = self._get_node_directory(node_name, parent_path)
+                
+                # Salvar arquivo com nome do no e extensao .json
+                safe_filename = self._get_safe_filename(node_name)
+                json_file = node_path / f"{safe_filename}.json"
+                
+                with open(json_file, 'w', encoding='utf-8') as f:
+                    json.dump(node_data, f, ensure_ascii=False, indent=2)
+                
+                print(f"   [OK] Dados salvos: {safe_filename}.json")
             
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(node_data, f, ensure_ascii=False, indent=2)
+            if self.scheduler and tree_path:
+                self.scheduler.record_visit(path_key(tree_path), node_data, previous_data)
             
-            print(f"   [OK] Dados salvos: {safe_filename}.json")
+            if self.unit_index:
+                self.unit_index.upsert(node_name, node_data, tree_path)
             
         except Exception as e:
             print(f"   [ERRO] Erro ao salvar dados de '{node_name}': {e}")
 
-    def open_site(self):
+    def _load_node_data(self, node_name: str, tree_path: list = None) -> dict:
         """
-        Abre o site SICI e aguarda o carregamento da pagina.
-        Aguarda pela arvore estar disponivel (detectando um elemento da arvore).
+        Dados gravados anteriormente para um no, ou None: do arquivo unico pelo
+        caminho (tree_path; nomes se repetem entre ramos) ou do JSON do diretorio pelo nome.
         """
-        print(f"[*] Acessando {BASE_URL}...")
-        
-        # Navegar para a pagina
-        self.page.goto(BASE_URL, wait_until="networkidle")
-        
-        # Aguardar extra para JavaScript carregar completamente
-        self.page.wait_for_timeout(2000)
-        
-        # Aguardar pelo TreeView customizado do SICI (componente ua_treeview)
+        if self.node_store:
+            return self.node_store.get(tree_path or [node_name])
+        safe_name = self._get_safe_filename(node_name)
+        json_file = Path(COLLECTED_DATA_DIR) / safe_name / f"{safe_name}.json"
+        if not json_file.exists():
+            return None
         try:
-            self.page.wait_for_selector("div[id*='ua_treeview']", timeout=10000)
-            print("[OK] Pagina carregada com sucesso.")
+            with open(json_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
         except Exception:
-            print("[!] TreeView nao encontrado no tempo esperado, mas prosseguindo...")
+            return None
 
-    def expand_all_nodes(self):
-        """
-        Expande o SMS e processa todos os seus filhos recursivamente.
-        """
-        print("[*] Acessando todos os nos de SMS e coletando informacoes...")
-        
-        # Encontrar SMS
-        print("[*] Localizando SMS...")
-        sms_node_id = self.page.evaluate("""
-            () => {
-                let links = document.querySelectorAll('a[id*="ua_treeview"]');
-                for (let link of links) {
-                    if (link.innerText.trim() === 'SMS') {
-                        return link.id;
-                    }
-                }
-                return null;
-            }
-        """)
-        
-        if not sms_node_id:
-            print("[!] No SMS nao encontrado!")
-            return
-        
-        # Clicar no ÍCONE de expansão de SMS (não no texto)
-        # O TreeView ASP.NET tem dois links: um para expandir (com imagem) e outro para selecionar (com texto)
-        print("[*] Clicando no ícone de expansão de SMS...")
-        
-        # Primeiro, encontrar o link
-        expand_link_info = self.page.evaluate(f"""
-            (nodeId) => {{
-                // O ícone de expansão está em um <a> com <img> no mesmo <tr>
-                let textLink = document.getElementById(nodeId);
-                if (!textLink) return false;
-                
-                let tr = textLink.closest('tr');
-                if (!tr) return false;
-                
-                // Procurar por <a> que contém <img> com "Expand"
-                let allLinks = tr.querySelectorAll('a');
-                for (let link of allLinks) {{
-                    let img = link.querySelector('img');
-                    if (img && (img.alt.includes('Expand') || img.alt.includes('Collapse'))) {{
-                        return true;
-                    }}
-                }}
-                return false;
-            }}
-        """, sms_node_id)
-        
-        if not expand_link_info:
-            print("[!] Ícone de expansão de SMS não encontrado")
-            return
-        
-        # Sem ID, vamos usar um seletor que encontre o link direto
-        # O link de expansão está dentro de uma <tr> que contém o link com texto (sms_node_id)
-        # e tem uma imagem com alt contendo "Expand" ou "Collapse"
-        
-        expand_link_selector = f"#{sms_node_id}"
-        expand_link_element = self.page.query_selector(expand_link_selector)
-        
-        if not expand_link_element:
-            print("[!] SMS node not found")
-            return
-        
-        # Encontrar a TR pai
-        tr_element = self.page.evaluate(f"""
-            (selector) => {{
-                let el = document.querySelector(selector);
-                if (!el) return null;
-                let tr = el.closest('tr');
-                return tr;
-            }}
-        """, expand_link_selector)
-        
-        if not tr_element:
-            print("[!] TR parent not found")
-            return
+    def _resolve_node(self, node_name: str, node_id: str = None, parent_id: str = None) -> dict:
+        """
+        Registro do no no indice da arvore (self.tree), por ID do link ou pelo nome.
+        Se o no ainda nao esta no indice, rele a arvore inteira uma vez.
         
-        # Agora clicar no link que contém a imagem de expansão
-        # Vou clicar diretamente via coordenadas do elemento da imagem
-        try:
-            # Encontrar a imagem de expansão e clicar nela
-            expand_img = self.page.query_selector(f"#{sms_node_id} ~ img, {expand_link_selector} ~ * img")
-            if not expand_img:
-                # Tentar outra abordagem: encontrar qualquer <a> na TR que tenha imagem
-                expand_link = self.page.query_selector(f"tr:has(#{sms_node_id}) a:has(img)")
-                if expand_link:
-                    expand_link.click(timeout=5000)
-                    expand_clicked = True
-                else:
-                    expand_clicked = False
-            else:
-                expand_img.click(timeout=5000)
-                expand_clicked = True
-        except Exception as e:
-            print(f"[!] Falha ao clicar: {e}")
-            expand_clicked = False
+        Args:
+            node_name: Texto exibido do no
+            node_id: ID do link de texto, quando conhecido (desambigua nomes repetidos)
+            parent_id: Restringe a busca por nome aos filhos deste no
         
-        if not expand_clicked:
-            print("[!] Ícone de expansão de SMS não encontrado")
+        Returns:
+            dict: Registro do TreeModel, ou None se o no nao esta na pagina
+        """
+        for attempt in range(2):
+            record = self.tree.get(node_id) if node_id else self.tree.find_by_text(node_name, parent_id)
+            if record is not None:
+                if not node_id and not parent_id and self.tree.count_by_text(node_name) > 1:
+                    print(f"[!] Ha {self.tree.count_by_text(node_name)} nos '{node_name}' na arvore; usando {record['id']}")
+                return record
+            if attempt == 0:
+                with self.tracer.span("leitura_arvore", [node_name]):
+                    self.tree.refresh(self.page)
+        return None
+
+    def _account_node(self, node: str):
+        """
+        Atribui as proximas chamadas do Playwright ao no informado (contabilidade por no).
+        """
+        if self.accountant:
+            self.accountant.set_node(node)
+
+    def open_site(self):
+        """
+        Abre o site SICI e aguarda o carregamento da pagina.
+        Aguarda pela arvore estar disponivel (detectando um elemento da arvore).
+        """
+        if self.warm_page and self.page.url.startswith(self.base_url):
+            # Pagina pre-aquecida pelo servico de navegador: ja esta em base_url
+            print(f"[OK] Usando pagina pre-aquecida em {self.page.url}")
+            self.startup_timer.report()
             return
         
-        # Aguardar pelo postback do servidor
-        try:
-            self.page.wait_for_load_state('networkidle', timeout=10000)
-        except:
-            self.page.wait_for_timeout(ROUND_TIMEOUT + 1000)
+        print(f"[*] Acessando {self.base_url}...")
         
-        # Agora clicar no TEXTO do SMS para carregar seus dados no painel lateral
-        print("[*] Clicando no texto de SMS para carregar dados...")
-        self.page.evaluate(f"""
-            (smsId) => {{
-                let el = document.getElementById(smsId);
-                if (el) el.click();
-            }}
-        """, sms_node_id)
+        with self.startup_timer.stage("open_site"):
+            # Navegar para a pagina
+            self.page.goto(self.base_url, wait_until="networkidle")
+            
+            # Aguardar pelo TreeView customizado do SICI (componente ua_treeview),
+            # sem espera fixa: termina assim que a arvore aparece
+            try:
+                self.page.wait_for_selector("div[id*='ua_treeview']", timeout=10000)
+                print("[OK] Pagina carregada com sucesso.")
+            except Exception:
+                print("[!] TreeView nao encontrado no tempo esperado, mas prosseguindo...")
         
-        self.page.wait_for_timeout(ROUND_TIMEOUT)
+        self.startup_timer.report()
+
+    def expand_all_nodes(self) -> bool:
+        """
+        Expande o orgao raiz (root_text) e processa todos os seus descendentes.
+        Nos ja registrados no diario de coleta (tentativa anterior interrompida) sao pulados.
         
-        # Aguardar um pouco mais antes de processar filhos
-        # Isso é crítico para o ASP.NET postback completar
-        self.page.wait_for_timeout(2000)
+        Returns:
+            bool: True se a arvore inteira foi concluida
+        """
+        print(f"[*] Acessando todos os nos de {self.root_text} e coletando informacoes...")
+        
+        if self.journal is None:
+            self.journal = CrawlJournal(self._state_file(CRAWL_JOURNAL_FILE))
+        
+        # Registro NDJSON da arvore: continua o arquivo existente numa retomada
+        if self.tree_stream is None:
+            self.tree_stream = TreeStreamWriter(self._state_file(TREE_STREAM_FILE), append=bool(len(self.journal)))
+        
+        # Registros ainda no lote do armazenamento podem ter se perdido na queda:
+        # regravar a partir do diario (o registro mais recente prevalece)
+        if self.node_store and len(self.journal):
+            for path, info in self.journal.completed_nodes():
+                if info is not None:
+                    self.node_store.put(path[-1], info, path)
+        
+        # Uma retomada continua a mesma execucao da agenda de recoleta
+        if self.scheduler and not len(self.journal):
+            self.scheduler.start_run()
+        
+        # Encontrar o orgao: uma leitura da arvore (so os orgaos de primeiro nivel estao
+        # renderizados, alem dos ja expandidos) monta o indice usado daqui em diante
+        print(f"[*] Localizando {self.root_text}...")
+        self._account_node(self.root_text)
+        with self.tracer.span("leitura_arvore", [self.root_text]):
+            self.tree.refresh(self.page)
+        root_record = self._resolve_node(self.root_text)
+        
+        if not root_record:
+            print(f"[!] No {self.root_text} nao encontrado!")
+            return False
+        root_node_id = root_record['id']
+        
+        # Clicar no ÍCONE de expansão (não no texto): o TreeView ASP.NET tem dois links,
+        # um para expandir (com imagem) e outro para selecionar (com texto).
+        # O indice ja informa se o no tem o icone e se ja esta aberto (pagina
+        # pre-aquecida, orgao anterior na mesma sessao): clicar de novo o recolheria
+        if not root_record['hasExpander']:
+            print(f"[!] Ícone de expansão de {self.root_text} não encontrado")
+            return False
+        
+        if not root_record['expanded']:
+            print(f"[*] Clicando no ícone de expansão de {self.root_text}...")
+            # Aguardar pelo postback do servidor e pelo container de filhos do orgao
+            with self.tracer.span("expansao", [self.root_text]):
+                expand_clicked = self.waiter.click_and_wait(JS_CLICK_EXPANDER, root_node_id, children_container_selector(root_node_id))
+            if not expand_clicked and not self.page.evaluate(JS_HAS_EXPANDER, root_node_id):
+                print(f"[!] Ícone de expansão de {self.root_text} não encontrado")
+                return False
+        
+        # Agora clicar no TEXTO do orgao para carregar seus dados no painel lateral
+        # (aguarda o postback que atualiza o painel de detalhes)
+        print(f"[*] Clicando no texto de {self.root_text} para carregar dados...")
+        with self.tracer.span("clique", [self.root_text]):
+            self.waiter.click_and_wait(JS_CLICK_NODE, root_node_id, DETAIL_PANEL_SELECTOR)
         
         # IMPORTANTE: Processar filhos ANTES de extrair informações
         # porque _extract_node_info() pode mudar o DOM (via eventos em dropdowns)
-        print("   [*] Procurando filhos do SMS...")
-        self._process_children_recursive("SMS", depth=0, skip_click=True, parent_element=sms_node_id)
+        print(f"   [*] Procurando filhos do {self.root_text}...")
+        self.retries = RetryQueue()
+        children = self._read_children(root_node_id, [self.root_text])
+        if self.branches is not None:
+            # Coleta de alguns ramos: so os filhos de SMS atribuidos a esta instancia
+            children = [child for child in children if child['text'] in self.branches]
+        print(f"   [*] Ordem de coleta: {CRAWL_ORDER}")
+        complete = self._crawl_frontier([self.root_text], children)
+        
+        if len(self.retries):
+            # Nos que falharam na passada: novas tentativas com espera exponencial
+            print(f"[*] {len(self.retries)} no(s) na fila de novas tentativas")
+            complete = not self.retries.drain(self._retry_node)
+        self.retries.report(self._state_file(INCOMPLETE_PATHS_FILE))
         
         # DEPOIS extrair informacoes do SMS
-        print("[*] Extraindo informacoes do SMS...")
-        sms_info = self._extract_node_info()
-        self._save_node_data("SMS", sms_info)
-        print("   [OK] Informacoes do SMS coletadas\n")
+        if self.branches is not None:
+            # Coleta de alguns ramos: SMS eh coletado por quem distribuiu os ramos
+            pass
+        elif self.journal.is_node_done([self.root_text]):
+            print(f"[*] {self.root_text} ja coletado (diario)\n")
+        elif self._is_due([self.root_text]):
+            print(f"[*] Extraindo informacoes do {self.root_text}...")
+            self._account_node(self.root_text)
+            # O painel mostra o ultimo no clicado; voltar para o orgao se algum filho foi acessado
+            with self.tracer.span("clique", [self.root_text]):
+                self.waiter.click_and_wait(JS_CLICK_NODE, root_node_id, DETAIL_PANEL_SELECTOR)
+            with self.tracer.span("extracao", [self.root_text]):
+                root_info = self._extract_node_info([self.root_text])
+            with self.tracer.span("gravacao", [self.root_text]):
+                self._save_node_data(self.root_text, root_info, tree_path=[self.root_text])
+                self.tree_stream.write([self.root_text], root_info)
+                self.journal.record_node([self.root_text], root_info)
+            print(f"   [OK] Informacoes do {self.root_text} coletadas\n")
+        else:
+            print(f"[*] {self.root_text} estavel: informacoes mantidas da ultima coleta\n")
+            with self.tracer.span("gravacao", [self.root_text], estavel=True):
+                self.tree_stream.write([self.root_text], self._load_node_data(self.root_text, [self.root_text]))
+                self.journal.record_node([self.root_text])
+        
+        if not complete:
+            # Manter o diario para a retomada; a deteccao de remocoes so vale para uma passada completa
+            print(f"[!] Coleta incompleta: {len(self.journal)} no(s) concluido(s) registrados no diario")
+            if self.scheduler:
+                self.scheduler.save()
+            return False
+        
+        if self.scheduler:
+            self.scheduler.finish_run()
+        self.journal.clear()
+        return True
+    
+    def _is_due(self, tree_path: list) -> bool:
+        """
+        Consulta a agenda de recoleta: True se o no deve ser clicado e extraido nesta execucao.
+        A passada estrutural (expansao) acontece sempre, independente da agenda.
+        """
+        if not self.scheduler:
+            return True
+        key = path_key(tree_path)
+        self.scheduler.mark_seen(key)
+        return self.scheduler.is_due(key)
+    
+    
+    def _staleness(self, tree_path: list) -> float:
+        """Prioridade "desatualizados" da fronteira, pela agenda de recoleta (0 sem agenda)."""
+        return self.scheduler.staleness(path_key(tree_path)) if self.scheduler else 0.0
     
+    def _read_children(self, node_id: str, tree_path: list) -> list:
+        """
+        Le so o container de filhos recem-expandido do no (uma chamada), atualiza o
+        indice e devolve os registros dos filhos na ordem de exibicao.
+        """
+        container = children_container_selector(node_id)
+        if container:
+            try:
+                self.page.wait_for_selector(container, timeout=self.waiter.timeout, state='attached')
+            except Exception:
+                pass
+        with self.tracer.span("leitura_arvore", tree_path):
+            self.tree.refresh(self.page, under=node_id)
+        return self.tree.children_of(node_id)
     
-    def _process_children_recursive(self, parent_node_name: str, depth: int = 0, skip_click: bool = False, parent_element: str = None):
+    def _crawl_frontier(self, parent_path: list, children: list) -> bool:
         """
-        Processa recursivamente todos os filhos de um no.
+        Percorre as subarvores dos nos informados (filhos de parent_path) pela
+        fronteira de coleta: cada tarefa visita um no e coloca os filhos dele na
+        fronteira, atendidos na ordem de CRAWL_ORDER.
         
         Args:
-            parent_node_name: Nome do no pai cujos filhos serao processados
-            depth: Profundidade atual na arvore
-            skip_click: Se True, não clica no node (já foi clicado antes)
-            parent_element: ID do elemento pai (se None, busca pelo nome)
-        """
-        indent = "  " * depth
-        
-        # Encontrar o elemento do no pai
-        if parent_element is None:
-            parent_element = self.page.evaluate(f"""
-                (parentName) => {{
-                    let allLinks = document.querySelectorAll('a[id*="ua_treeview"]');
-                    for (let link of allLinks) {{
-                        if (link.innerText.trim() === parentName) {{
-                            return link.id;
-                        }}
-                    }}
-                    return null;
-                }}
-            """, parent_node_name)
-        
-        if not parent_element:
-            print(f"{indent}[!] No pai '{parent_node_name}' nao encontrado")
-            return
+            parent_path: Nomes dos nos desde a raiz ate o pai dos nos iniciais
+            children: Registros (TreeModel) dos nos iniciais
         
-        # Clicar no nó pai APENAS se não foi clicado antes
-        if not skip_click:
-            # O TreeView ASP.NET tem dois links:
-            # 1. Link com imagem (ícone +/-) para EXPANDIR/COLAPSAR filhos
-            # 2. Link com texto para SELECIONAR o nó
-            # Precisamos clicar no link com a imagem para carregar os filhos do servidor
+        Returns:
+            bool: True se todas as subarvores foram concluidas
+        """
+        frontier = Frontier(CRAWL_ORDER, staleness=self._staleness)
+        tracker = SubtreeTracker(self.journal.record_subtree if self.journal else None)
+        self._push_children(frontier, tracker, parent_path, children)
+        
+        complete = True
+        while frontier:
+            task = frontier.pop()
+            node_path = task['caminho']
+            parent = node_path[:-1]
+            indent = "  " * (len(node_path) - 2)
+            print(f"{indent}[{task['posicao']}] {node_path[-1]}")
+            self._account_node(path_key(node_path))
             
-            print(f"{indent}[*] Clicando no ícone de expansão de '{parent_node_name}'...")
+            # Subarvore inteira concluida numa tentativa anterior: nem expandir
+            if self.journal and self.journal.is_subtree_done(node_path):
+                print(f"{indent}   [=] Ja concluido (diario)")
+                if self.scheduler:
+                    self.scheduler.mark_subtree_seen(path_key(node_path))
+                tracker.finished(node_path, True)
+                continue
             
-            # Encontrar e clicar no ícone de expansão
-            expand_clicked = self.page.evaluate(f"""
-                (nodeId) => {{
-                    // Procurar pelo <a> que contém <img> com "expand"
-                    // Este link está no mesmo <tr> que o link do texto
-                    let textLink = document.getElementById(nodeId);
-                    if (!textLink) return false;
-                    
-                    // Procurar na estrutura: TR > TD > A > IMG
-                    let tr = textLink.closest('tr');
-                    if (!tr) return false;
-                    
-                    // Procurar por um <a> que tem <img> com "expand"
-                    let expandLinks = tr.querySelectorAll('a');
-                    for (let link of expandLinks) {{
-                        let img = link.querySelector('img');
-                        if (img && (img.alt.includes('Expand') || img.alt.includes('Collapse') || img.src.includes('plus') || img.src.includes('minus'))) {{
-                            link.click();
-                            return true;
-                        }}
-                    }}
-                    
-                    return false;
-                }}
-            """, parent_element)
+            if self.retries is not None and self.retries.breaker_open(parent):
+                # Irmaos falhando em sequencia: adiar sem clicar (sem gastar outro timeout)
+                print(f"{indent}   [!] Disjuntor aberto em '{parent[-1]}': adiado para nova tentativa")
+                if self.scheduler:
+                    self.scheduler.mark_subtree_seen(path_key(node_path))
+                self.retries.defer(node_path, attempted=False)
+                tracker.finished(node_path, False)
+                complete = False
+                continue
             
-            if expand_clicked:
-                # Aguardar o postback do servidor
-                try:
-                    self.page.wait_for_load_state('networkidle', timeout=10000)
-                except:
-                    self.page.wait_for_timeout(ROUND_TIMEOUT + 1000)
-            else:
-                print(f"{indent}[!] Ícone de expansão não encontrado para '{parent_node_name}'")
-        else:
-            # Se skip_click=True, ainda precisa aguardar um pouco para o DOM estar pronto
-            # Especialmente importante na primeira chamada quando SMS foi expandido
-            # Usar wait_for_load_state como no caso acima
             try:
-                self.page.wait_for_load_state('networkidle', timeout=10000)
-            except:
-                self.page.wait_for_timeout(ROUND_TIMEOUT + 1000)
-            # Aguardar extra para garantir que o JavaScript renderizou tudo
-            self.page.wait_for_timeout(3000)  # Aumentado para 3s
+                grandchildren = self._visit_task(task)
+                if self.retries is not None:
+                    self.retries.record_success(parent)
+            except Exception as e:
+                print(f"{indent}   [ERRO] Falha ao processar '{node_path[-1]}': {e}")
+                if self.scheduler:
+                    self.scheduler.mark_subtree_seen(path_key(node_path))
+                if self.retries is not None:
+                    # Subarvore preservada: o no volta ao final da passada
+                    self.retries.defer(node_path, e)
+                tracker.finished(node_path, False)
+                complete = False
+                continue
             
-            # Também aguardar que o container de filhos fique visível
-            # Este é um passo CRÍTICO quando skip_click=True
-            try:
-                container_id = self.page.evaluate(f"""
-                    (parentId) => {{
-                        let match = parentId.match(/t(\\d+)i?$/);
-                        if (!match) return null;
-                        return 'ContentPlaceHolder1_ua_treeviewn' + match[1] + 'Nodes';
-                    }}
-                """, parent_element)
-                
-                if container_id:
-                    # Tentar esperar o container ficar visível
-                    try:
-                        self.page.wait_for_selector(f"#{container_id}", timeout=5000, state='attached')
-                    except:
-                        pass
-            except:
-                pass
-        
-        # Buscar filhos diretos usando JavaScript
-        children = self.page.evaluate(f"""
-            (parentId) => {{
-                // Converter parentId para container ID
-                // Exemplo: parentId = ContentPlaceHolder1_ua_treeviewt0i ou ContentPlaceHolder1_ua_treeviewt31
-                //          container = ContentPlaceHolder1_ua_treeviewn0Nodes ou ContentPlaceHolder1_ua_treeviewn31Nodes
-                let match = parentId.match(/t(\\d+)i?$/);
-                if (!match) return [];
-                
-                let nodeIndex = match[1];
-                let containerId = 'ContentPlaceHolder1_ua_treeviewn' + nodeIndex + 'Nodes';
-                let childrenContainer = document.getElementById(containerId);
-                
-                if (!childrenContainer) {{
-                    return [];
-                }}
-                
-                // Coletar links filhos do container, deduplicando por ID
-                let children = [];
-                let seenIds = new Set();
-                let childLinks = childrenContainer.querySelectorAll('a[id*="treeview"]');
-                
-                for (let link of childLinks) {{
-                    let linkId = link.id;
-                    
-                    // Pular se já vimos esse ID
-                    if (seenIds.has(linkId)) continue;
-                    seenIds.add(linkId);
-                    
-                    let text = link.innerText.trim();
-                    if (text && text !== '0') {{  // Ignorar placeholder "0"
-                        children.push({{
-                            id: linkId,
-                            text: text
-                        }});
-                    }}
-                }}
-                
-                return children;
-            }}
-        """, parent_element)
-        
-        if not children or len(children) == 0:
-            print(f"{indent}[DEBUG] Nenhum filho encontrado. parent_element={parent_element}")
-            print(f"{indent}[*] No '{parent_node_name}' nao tem filhos")
-            return
-        
-        print(f"{indent}[*] Processando {len(children)} filho(s) de '{parent_node_name}':")
+            self._push_children(frontier, tracker, node_path, grandchildren)
         
+        return complete
+    
+    def _push_children(self, frontier: Frontier, tracker: SubtreeTracker, parent_path: list, children: list):
+        """Coloca os filhos de um no visitado na fronteira."""
+        indent = "  " * (len(parent_path) - 1)
+        if children:
+            print(f"{indent}[*] Processando {len(children)} filho(s) de '{parent_path[-1]}':")
+        tracker.expanded(parent_path, len(children))
         for idx, child in enumerate(children, 1):
-            child_name = child['text']
-            child_id = child['id']
-            
-            print(f"{indent}[{idx}/{len(children)}] {child_name}")
-            
-            try:
-                # Clicar no filho
-                self.page.evaluate(f"""
-                    (childId) => {{
-                        let el = document.getElementById(childId);
-                        if (el) el.click();
-                    }}
-                """, child_id)
-                
-                self.page.wait_for_timeout(ROUND_TIMEOUT)
-                
-                # Extrair informacoes
-                child_info = self._extract_node_info()
-                
-                # Salvar dados
-                self._save_node_data(child_name, child_info)
-                
-                # Verificar se este filho tem filhos - procurando pelo ícone de expandir
-                has_children = self.page.evaluate(f"""
-                    (childId) => {{
-                        // Buscar o link do texto na árvore
-                        let textLink = document.getElementById(childId);
-                        if (!textLink) return false;
-                        
-                        // Procurar na mesma TR pelo ícone de expandir
-                        let tr = textLink.closest('tr');
-                        if (!tr) return false;
-                        
-                        // Buscar um <a> que tem <img> com alt contendo "Expand" ou "Collapse"
-                        let expandLinks = tr.querySelectorAll('a');
-                        for (let link of expandLinks) {{
-                            let img = link.querySelector('img');
-                            if (img && (img.alt.includes('Expand') || img.alt.includes('Collapse'))) {{
-                                return true;  // Tem ícone de expandir
-                            }}
-                        }}
-                        return false;
-                    }}
-                """, child_id)
-                
-                if has_children:
-                    print(f"{indent}   [*] Expandindo '{child_name}' para ver filhos...")
-                    # Expandir o filho usando o mesmo método que funcionou para SMS
-                    self.page.evaluate(f"""
-                        (childId) => {{
-                            let textLink = document.getElementById(childId);
-                            if (!textLink) return;
-                            
-                            let tr = textLink.closest('tr');
-                            if (!tr) return;
-                            
-                            // Buscar o link de expandir (primeiro <a> com <img>)
-                            let expandLinks = tr.querySelectorAll('a');
-                            for (let link of expandLinks) {{
-                                let img = link.querySelector('img');
-                                if (img && (img.alt.includes('Expand') || img.alt.includes('Collapse'))) {{
-                                    link.click();
-                                    return;
-                                }}
-                            }}
-                        }}
-                    """, child_id)
-                    
-                    # Aguardar o postback do servidor
-                    try:
-                        self.page.wait_for_load_state('networkidle', timeout=10000)
-                    except:
-                        self.page.wait_for_timeout(ROUND_TIMEOUT + 1000)
-                    
-                    # Processar filhos deste filho recursivamente, passando o ID
-                    self._process_children_recursive(child_name, depth + 1, skip_click=True, parent_element=child_id)
-                
-            except Exception as e:
-                print(f"{indent}   [ERRO] Falha ao processar '{child_name}': {e}")
-                continue
+            frontier.push({
+                "caminho": parent_path + [child['text']],
+                "registro": child,
+                "posicao": f"{idx}/{len(children)}",
+            })
     
-    def _process_node_recursive(self, node_name: str, parent_dict: dict, depth: int = 0):
+    def _task_record(self, task: dict) -> dict:
         """
-        Processa um no recursivamente:
-        1. Expande o no (se tiver icone de +)
-        2. Clica no placeholder '0' se existir para revelar filhos
-        3. Coleta informacoes de cada filho
-        4. Para cada filho, chama recursivamente esta funcao
-        
-        Args:
-            node_name: Nome do no a processar
-            parent_dict: Dicionario onde armazenar os filhos
-            depth: Profundidade atual na arvore
+        Registro atual do no de uma tarefa. Em largura ou por prioridade, outras
+        expansoes podem ter acontecido desde que a tarefa entrou na fronteira: o no
+        eh reencontrado pelo ValuePath (estavel) ou, se preciso, a partir da raiz.
         """
-        indent = "  " * depth
-        
-        # Encontrar o no atual
-        all_links = self.page.query_selector_all("a[id*='ua_treeview']:not([id$='i'])")
-        current_node = None
-        current_node_id = None
-        
-        for link in all_links:
-            if link.text_content().strip() == node_name:
-                current_node = link
-                current_node_id = link.get_attribute('id')
-                break
-        
-        if not current_node:
-            print(f"{indent}[AVISO] No '{node_name}' nao encontrado")
-            return
+        queued = task['registro']
+        record = self.tree.find_by_value_path(queued['valuePath']) if queued.get('valuePath') else self.tree.get(queued['id'])
+        if record is None or record['text'] != queued['text']:
+            record = self._navigate_to_path(task['caminho'])
+        if record is None:
+            raise RuntimeError(f"No nao encontrado na arvore: {path_key(task['caminho'])}")
+        return record
+    
+    def _display_position(self, record: dict) -> int:
+        """Posicao do no entre os irmaos na ordem de exibicao (as linhas do NDJSON seguem a ordem de visita)."""
+        siblings = self.tree.children_of(record['parentId']) if record.get('parentId') else self.tree.roots()
+        return next((i for i, sibling in enumerate(siblings) if sibling['id'] == record['id']), None)
+    
+    def _visit_task(self, task: dict) -> list:
+        """
+        Clica, extrai e grava um no (conforme diario e agenda) e o expande.
         
-        # Tentar expandir o no (verificar se tem icone de +)
-        try:
-            # Procurar pelo icone de expandir
-            node_id_base = current_node_id.replace('t', '').replace('i', '')  # Pegar ID base
-            expand_icon = self.page.query_selector(f"img[id*='{node_id_base}'][src*='plus']")
+        Returns:
+            list: Registros dos filhos do no, na ordem de exibicao
+        """
+        child_path = task['caminho']
+        indent = "  " * (len(child_path) - 2)
+        child = self._task_record(task)
+        child_name = child['text']
+        child_id = child['id']
+        
+        if self.journal and self.journal.is_node_done(child_path):
+            # Ancestral do primeiro no pendente: so expandir, sem clicar/extrair
+            print(f"{indent}   [=] Informacoes ja coletadas (diario)")
+            if self.scheduler:
+                self.scheduler.mark_seen(path_key(child_path))
+        elif self._is_due(child_path):
+            # Clicar no filho e aguardar o painel de detalhes ser atualizado
+            with self.tracer.span("clique", child_path):
+                self.waiter.click_and_wait(JS_CLICK_NODE, child_id, DETAIL_PANEL_SELECTOR)
             
-            if expand_icon:
-                print(f"{indent}[*] Expandindo '{node_name}'...")
-                expand_icon.click()
-                self.page.wait_for_timeout(800)
-        except:
-            pass  # No nao tem filhos ou ja esta expandido
-        
-        # Clicar no no '0' se existir (placeholder para revelar filhos reais)
-        self.page.wait_for_timeout(500)
-        placeholder_found = False
-        
-        # Procurar pelo '0' que seria filho deste no
-        all_links_after_expand = self.page.query_selector_all("a[id*='ua_treeview']:not([id$='i'])")
-        
-        for link in all_links_after_expand:
-            text = link.text_content().strip()
-            if text == "0":
-                link_id = link.get_attribute('id')
-                # Verificar se este '0' eh filho do no atual (ID do '0' contem ID do pai)
-                try:
-                    print(f"{indent}   Clicando em placeholder '0'...")
-                    self.page.evaluate(f"""
-                        () => {{
-                            let el = document.getElementById('{link_id}');
-                            if (el) el.click();
-                        }}
-                    """)
-                    self.page.wait_for_timeout(1200)
-                    placeholder_found = True
-                    break
-                except:
-                    pass
-        
-        # Atualizar lista de links apos clicar no '0'
-        self.page.wait_for_timeout(500)
-        all_links = self.page.query_selector_all("a[id*='ua_treeview']:not([id$='i'])")
-        
-        print(f"{indent}[DEBUG] Total de links apos expansao: {len(all_links)}")
-        
-        # Encontrar o indice do no atual
-        current_index = None
-        for i, link in enumerate(all_links):
-            if link.text_content().strip() == node_name:
-                current_index = i
-                break
-        
-        if current_index is None:
-            print(f"{indent}[AVISO] No '{node_name}' nao encontrado apos expansao")
-            return
-        
-        print(f"{indent}[DEBUG] No '{node_name}' esta no indice {current_index}")
-        
-        # Coletar filhos diretos deste no
-        filhos = []
-        
-        # Coletar TODOS os textos de links visiveis
-        all_texts = []
-        for link in all_links:
-            text = link.text_content().strip()
-            all_texts.append(text)
-        
-        # Encontrar quantas vezes o no atual aparece (para saber qual pegar)
-        node_count = all_texts.count(node_name)
-        
-        # Se eh no unico com esse nome, procurar filhos apos ele
-        if node_count == 1 or depth == 0:  # Se eh SMS ou no unico
-            # Procurar filhos apos o no atual
-            found_current = False
-            for i in range(len(all_texts)):
-                if all_texts[i] == node_name and not found_current:
-                    found_current = True
-                    continue
-                
-                if found_current:
-                    text = all_texts[i]
-                    
-                    # Ignorar '0'
-                    if text == "0":
-                        continue
-                    
-                    # Se eh depth 0 (SMS), parar ao encontrar outro orgao
-                    if depth == 0:
-                        if len(text) <= 5 and text.isupper() and text != node_name:
-                            break  # Proximo orgao encontrado
-                    
-                    # Adicionar como filho
-                    if text and text not in filhos:
-                        filhos.append(text)
-                    
-                    # Limitar filhos para evitar pegar toda arvore
-                    if len(filhos) >= 30:
-                        break
-        
-        # Processar cada filho
-        if filhos:
-            print(f"{indent}[OK] '{node_name}' tem {len(filhos)} filho(s)\n")
+            # Extrair informacoes
+            with self.tracer.span("extracao", child_path):
+                child_info = self._extract_node_info(child_path)
             
-            for i, child_name in enumerate(filhos):
-                print(f"{indent}[*] [{i+1}/{len(filhos)}] Processando: {child_name}")
-                
-                try:
-                    # Clicar no filho
-                    child_clicked = False
-                    all_links_updated = self.page.query_selector_all("a[id*='ua_treeview']:not([id$='i'])")
-                    
-                    for link in all_links_updated:
-                        if link.text_content().strip() == child_name:
-                            link.click()
-                            self.page.wait_for_timeout(800)
-                            child_clicked = True
-                            break
-                    
-                    if not child_clicked:
-                        print(f"{indent}   [AVISO] Nao foi possivel clicar em '{child_name}'")
-                        continue
-                    
-                    # Extrair informacoes do filho
-                    child_info = self._extract_node_info()
-                    parent_dict[child_name] = {"info": child_info, "filhos": {}}
-                    
-                    # Salvar dados do filho
-                    self._save_node_data(child_name, child_info)
-                    print(f"{indent}   [OK] Informacoes coletadas")
-                    
-                    # Processar recursivamente os filhos deste filho
-                    self._process_node_recursive(child_name, parent_dict[child_name]["filhos"], depth + 1)
-                    
-                except Exception as e:
-                    print(f"{indent}   [ERRO] Erro ao processar '{child_name}': {e}")
-                    parent_dict[child_name] = {"erro": str(e)}
-                
-                self.page.wait_for_timeout(300)
+            # Salvar dados
+            with self.tracer.span("gravacao", child_path):
+                self._save_node_data(child_name, child_info, tree_path=child_path)
+                if self.tree_stream:
+                    self.tree_stream.write(child_path, child_info, self._display_position(child))
+                if self.journal:
+                    self.journal.record_node(child_path, child_info)
         else:
-            print(f"{indent}[OK] '{node_name}' nao tem filhos (no folha)\n")
-
-    def _find_and_expand_sms(self):
-        """Helper para encontrar e expandir o no SMS."""
-        sms_links = self.page.query_selector_all("a[id*='ua_treeview']")
-        sms_node = None
-        sms_node_id = None
-        
-        for link in sms_links:
-            if link.text_content().strip() == "SMS":
-                sms_node = link
-                sms_node_id = link.get_attribute('id')
-                break
-        
-        if not sms_node or not sms_node_id:
-            return None
-        
-        # CRITICAL: O TreeView ASP.NET carrega filhos dinamicamente via postback do servidor
-        # quando o usuário clica no nó pai. Precisamos clicar no SMS e aguardar a resposta.
-        try:
-            print("[*] Clicando em SMS para carregar filhos...")
-            # Clicar usando JavaScript para evitar "element detached" 
-            self.page.evaluate(f"""
-                (smsId) => {{
-                    let el = document.getElementById(smsId);
-                    if (el) el.click();
-                }}
-            """, sms_node_id)
-            
-            # Aguardar pela requisição ao servidor e resposta
-            # O TreeView faz um postback quando você clica, que atualiza a página
-            self.page.wait_for_load_state('networkidle', timeout=5000)
-            
-            print("[*] SMS expandido - filhos carregados do servidor")
-            
-        except Exception as e:
-            print(f"   [AVISO] Erro ao expandir SMS: {e}")
+            print(f"{indent}   [=] Estavel: informacoes mantidas da ultima coleta")
+            with self.tracer.span("gravacao", child_path, estavel=True):
+                if self.tree_stream:
+                    self.tree_stream.write(child_path, self._load_node_data(child_name, child_path), self._display_position(child))
+                if self.journal:
+                    self.journal.record_node(child_path)
+        
+        # O modelo ja informa se este filho tem ícone de expandir
+        if not child['hasExpander']:
+            return []
+        
+        print(f"{indent}   [*] Expandindo '{child_name}' para ver filhos...")
+        # Expandir o filho (se ainda estiver colapsado) e aguardar o
+        # postback do servidor preencher o container de filhos
+        if not child['expanded']:
+            with self.tracer.span("expansao", child_path):
+                expand_clicked = self.waiter.click_and_wait(JS_CLICK_EXPANDER, child_id, children_container_selector(child_id))
+            if not expand_clicked and not self.page.evaluate(JS_HAS_EXPANDER, child_id):
+                print(f"{indent}   [!] Ícone de expansão não encontrado para '{child_name}'")
+        
+        children = self._read_children(child_id, child_path)
+        if not children:
+            print(f"{indent}   [*] No '{child_name}' nao tem filhos")
+        return children
+    
+    def _navigate_to_path(self, tree_path: list) -> dict:
+        """
+        Registro do no no fim do caminho, expandindo a partir da raiz os
+        ancestrais que estiverem colapsados.
         
-        return sms_node
-
-    def _extract_node_info(self) -> dict:
+        Returns:
+            dict: Registro do TreeModel, ou None se algum no do caminho nao existe
+        """
+        with self.tracer.span("leitura_arvore", tree_path):
+            self.tree.refresh(self.page)
+        record = self._resolve_node(tree_path[0])
+        for name in tree_path[1:]:
+            if record is None:
+                return None
+            parent_id = record['id']
+            if record['hasExpander'] and not record['expanded']:
+                with self.tracer.span("expansao", tree_path):
+                    self.waiter.click_and_wait(JS_CLICK_EXPANDER, parent_id, children_container_selector(parent_id))
+                    self.tree.refresh(self.page, under=parent_id)
+            record = self.tree.find_by_text(name, parent_id)
+            if record is None:
+                # Container de filhos ainda fora do indice
+                self.tree.refresh(self.page, under=parent_id)
+                record = self.tree.find_by_text(name, parent_id)
+        return record
+    
+    def _retry_node(self, tree_path: list):
+        """
+        Nova tentativa de um no adiado: navega ate ele e refaz o no e sua subarvore
+        (na fronteira; falhas dos descendentes voltam para a fila de novas tentativas).
+        Levanta excecao se o no nao for encontrado ou a visita falhar.
+        """
+        self._account_node(path_key(tree_path))
+        record = self._navigate_to_path(tree_path)
+        if record is None:
+            raise RuntimeError(f"No nao encontrado na arvore: {path_key(tree_path)}")
+        children = self._visit_task({"caminho": tree_path, "registro": record, "posicao": "-"})
+        self._crawl_frontier(tree_path, children)
+    
+    def _extract_node_info(self, tree_path: list = None) -> dict:
         """
         Extrai as informacoes estruturadas da pagina para o no atualmente selecionado.
         FORMATO ESPERADO (tabelas com multiplas colunas):
@@ -742,249 +734,66 @@ class SiciSmsScraper:
         Endereco | Numero | Complemento
         Rua X    | 455    | 7 Andar
         
+        Args:
+            tree_path: Nomes dos nos desde a raiz ate o no; se informado (e PANEL_SNAPSHOTS),
+                       o HTML do painel eh gravado para reextracao offline
+        
         Returns:
             dict: Dicionario com informacoes organizadas por secao
         """
-        info = {
-            "titulo": None,
-            "decreto": None,
-            "geral": {},
-            "endereco": {},
-            "comunicacoes": [],
-            "timestamp": None
-        }
+        payload = {}
+        with_snapshot = bool(self.snapshots and tree_path)
         
+        # Uma unica chamada devolve titulo, decreto e todos os pares rotulo/valor.
+        # So quando o dropdown ainda nao esta em "Informacoes Gerais" ha uma troca
+        # de opcao (postback) e uma segunda chamada depois do painel atualizar.
         try:
-            from datetime import datetime
-            info["timestamp"] = datetime.now().isoformat()
+            token = new_token()
+            payload = self.page.evaluate(JS_EXTRACT_NODE, [DETAIL_PANEL_SELECTOR, token, True, with_snapshot])
             
-            # Tentar selecionar "Informacoes Gerais" no dropdown se disponivel
-            try:
-                print("[*] Procurando dropdown 'Informações Gerais'...")
-                selected = self.page.evaluate("""
-                    () => {
-                        let selects = document.querySelectorAll('select');
-                        for (let select of selects) {
-                            let options = select.querySelectorAll('option');
-                            for (let option of options) {
-                                let text = option.innerText.trim();
-                                if (text.includes('Informações Gerais') || text.includes('Informacoes Gerais')) {
-                                    select.value = option.value;
-                                    select.dispatchEvent(new Event('change', { bubbles: true }));
-                                    return text;
-                                }
-                            }
-                        }
-                        return null;
-                    }
-                """)
-                
-                if selected:
-                    print(f"[OK] Selecionado '{selected}' no dropdown")
-                    try:
-                        self.page.wait_for_timeout(2000)  # Aguardar carregar conteúdo
-                    except:
-                        pass  # Continuar mesmo que timeout
-                else:
-                    print("[!] Dropdown 'Informações Gerais' não encontrado")
-                    
-            except Exception as e:
-                print(f"[!] Erro ao selecionar dropdown: {e}")
-                pass
-            
-            # Extrair TITULO do cabecalho da pagina
-            try:
-                title_match = self.page.evaluate("""
-                    () => {
-                        let h1 = document.querySelector('h1, h2, h3, [class*="titulo"], .header');
-                        return h1 ? h1.innerText.trim() : null;
-                    }
-                """)
-                if title_match:
-                    info["titulo"] = title_match
-            except:
-                pass
-            
-            # Extrair DECRETO
-            try:
-                decreto_match = self.page.evaluate("""
-                    () => {
-                        let text = document.body.innerText;
-                        let match = text.match(/Decreto[^\\n]*/i);
-                        return match ? match[0] : null;
-                    }
-                """)
-                if decreto_match:
-                    info["decreto"] = decreto_match
-            except:
-                pass
-            
-            # METODO PRINCIPAL: Extrair dados da página
-            # Baseado no print do usuário, as informações estão em um layout específico:
-            # - Titular/Cargo/Endereço/etc NÃO estão em tabelas HTML, mas em DIVs com CSS
-            # - Comunicações estão em tabelas de 2 colunas
-            try:
-                extracted_data = self.page.evaluate("""
-                    () => {
-                        let allPairs = [];
-                        
-                        // MÉTODO 1: Extrair de tabelas com 2 colunas (Comunicações)
-                        let tables = document.querySelectorAll('table');
-                        tables.forEach(table => {
-                            let rows = Array.from(table.querySelectorAll('tr'));
-                            rows.forEach(row => {
-                                let cells = Array.from(row.querySelectorAll('td, th')).map(c => c.innerText.trim());
-                                
-                                if (cells.length === 2 && cells[0] && cells[1]) {
-                                    let label = cells[0];
-                                    let value = cells[1];
-                                    
-                                    if (label.length > 0 && label.length < 100 && value.length > 0 && label !== value) {
-                                        allPairs.push({
-                                            label: label,
-                                            value: value,
-                                            method: 'table'
-                                        });
-                                    }
-                                }
-                            });
-                        });
-                        
-                        // MÉTODO 2: Extrair TODO o texto visível e procurar por padrões
-                        let contentArea = document.querySelector('#ContentPlaceHolder1_cphConteudo_divConteudoUA, [id*="Conteudo"], .content, main');
-                        if (!contentArea) {
-                            contentArea = document.body;
-                        }
-                        
-                        let fullText = contentArea.innerText;
-                        let lines = fullText.split('\\n').map(l => l.trim()).filter(l => l.length > 0);
-                        
-                        // Procurar por padrões conhecidos no texto
-                        for (let i = 0; i < lines.length - 1; i++) {
-                            let line = lines[i];
-                            let nextLine = lines[i + 1];
-                            
-                            // Padrão 1: Titular [TAB/espaços] Cargo
-                            //           Nome [TAB/espaços] Secretário
-                            if (line.includes('Titular') && line.includes('Cargo')) {
-                                // Linha tem labels, próxima linha tem valores
-                                let labels = line.split(/\\s{2,}|\\t/).map(s => s.trim()).filter(s => s);
-                                let values = nextLine.split(/\\s{2,}|\\t/).map(s => s.trim()).filter(s => s);
-                                
-                                if (labels.length === values.length) {
-                                    for (let j = 0; j < labels.length; j++) {
-                                        if (labels[j] && values[j] && labels[j] !== values[j]) {
-                                            allPairs.push({
-                                                label: labels[j],
-                                                value: values[j],
-                                                method: 'text-pattern'
-                                            });
-                                        }
-                                    }
-                                    i++; // Pular a próxima linha
-                                }
-                            }
-                            
-                            // Padrão 2: Endereço [TAB] Número [TAB] Complemento
-                            //           Rua X [TAB] 455 [TAB] 7 Andar
-                            else if (line.includes('Endereço') || line.includes('Endereco')) {
-                                let labels = line.split(/\\s{2,}|\\t/).map(s => s.trim()).filter(s => s);
-                                let values = nextLine.split(/\\s{2,}|\\t/).map(s => s.trim()).filter(s => s);
-                                
-                                if (labels.length === values.length) {
-                                    for (let j = 0; j < labels.length; j++) {
-                                        if (labels[j] && values[j] && labels[j] !== values[j]) {
-                                            allPairs.push({
-                                                label: labels[j],
-                                                value: values[j],
-                                                method: 'text-pattern'
-                                            });
-                                        }
-                                    }
-                                    i++;
-                                }
-                            }
-                            
-                            // Padrão 3: Bairro [TAB] CEP
-                            //           Cidade Nova [TAB] 20211-110
-                            else if (line.includes('Bairro') && line.includes('CEP')) {
-                                let labels = line.split(/\\s{2,}|\\t/).map(s => s.trim()).filter(s => s);
-                                let values = nextLine.split(/\\s{2,}|\\t/).map(s => s.trim()).filter(s => s);
-                                
-                                if (labels.length === values.length) {
-                                    for (let j = 0; j < labels.length; j++) {
-                                        if (labels[j] && values[j] && labels[j] !== values[j]) {
-                                            allPairs.push({
-                                                label: labels[j],
-                                                value: values[j],
-                                                method: 'text-pattern'
-                                            });
-                                        }
-                                    }
-                                    i++;
-                                }
-                            }
-                        }
-                        
-                        return allPairs;
-                    }
-                """)
-                
-                # Processar todos os pares extraidos
-                if extracted_data:
-                    print(f"[DEBUG] Extraidos {len(extracted_data)} pares da pagina")
-                    for idx, pair in enumerate(extracted_data[:15]):  # Mostrar primeiros 15
-                        method = pair.get('method', 'unknown')
-                        print(f"  [{idx}] ({method}) {pair.get('label', '')}: {pair.get('value', '')[:60]}")
-                    
-                    for pair in extracted_data:
-                        label = pair.get("label", "").strip()
-                        value = pair.get("value", "").strip()
-                        
-                        if label and value and len(label) > 0 and len(value) > 0:
-                            if not self._is_already_collected(info, label, value):
-                                self._categorize_info(label, value, info)
-                else:
-                    print("[DEBUG] Nenhum dado extraido com JavaScript")
-            
-            except Exception as e:
-                print(f"[!] Erro ao extrair com JavaScript: {e}")
-            
-            # Limpar dados vazios
-            if not info.get("geral"):
-                info.pop("geral", None)
-            if not info.get("endereco"):
-                info.pop("endereco", None)
-            if not info.get("comunicacoes"):
-                info.pop("comunicacoes", None)
-        
+            if payload.get("pending"):
+                print(f"[OK] Selecionado '{payload['selected']}' no dropdown")
+                self.waiter.wait_for_change(DETAIL_PANEL_SELECTOR, payload["before"], token)
+                payload = self.page.evaluate(JS_EXTRACT_NODE, [DETAIL_PANEL_SELECTOR, token, False, with_snapshot])
+            elif not payload.get("selected"):
+                print("[!] Dropdown 'Informações Gerais' não encontrado")
         except Exception as e:
-            info["erro"] = str(e)
+            print(f"[!] Erro ao extrair com JavaScript: {e}")
         
-        return info
+        if payload.get("snapshot"):
+            self.snapshots.put(tree_path, payload["snapshot"])
+        
+        return self._build_node_info(payload.get("titulo"), payload.get("decreto"), payload.get("pairs") or [])
     
-    def _parse_line_to_info(self, line: str, info: dict):
+    def _build_node_info(self, titulo: str, decreto: str, pairs: list) -> dict:
         """
-        Faz parse de uma linha de texto e extrai informacoes.
+        Monta o dicionario de informacoes de um no a partir dos dados brutos da pagina.
+        Nao depende do navegador: eh compartilhado pelos motores sincrono e assincrono.
+        
+        Args:
+            titulo: Titulo do cabecalho da pagina (ou None)
+            decreto: Linha do decreto (ou None)
+            pairs: Lista de pares {label, value, method} extraidos do painel
+        
+        Returns:
+            dict: Dicionario com informacoes organizadas por secao
         """
-        if " | " in line:
-            parts = line.split(" | ")
-        elif ":" in line:
-            parts = line.split(":", 1)
+        # Processar todos os pares extraidos
+        if pairs:
+            print(f"[DEBUG] Extraidos {len(pairs)} pares da pagina")
+            for idx, pair in enumerate(pairs[:15]):  # Mostrar primeiros 15
+                method = pair.get('method', 'unknown')
+                print(f"  [{idx}] ({method}) {pair.get('label', '')}: {pair.get('value', '')[:60]}")
         else:
-            return
+            print("[DEBUG] Nenhum dado extraido com JavaScript")
         
-        if len(parts) == 2:
-            label = parts[0].strip()
-            value = parts[1].strip()
-            
-            if label and value and len(label) > 1 and len(value) > 1:
-                if not self._is_already_collected(info, label, value):
-                    self._categorize_info(label, value, info)
-
-    def _categorize_info(self, label: str, value: str, info: dict):
+        return build_node_info(titulo, decreto, pairs, self.classifier)
+    
+    def _categorize_info(self, label: str, value: str, info: dict) -> bool:
         """
         Categoriza as informacoes extraidas baseado no rotulo.
+        A secao/campo de cada rotulo vem das regras compiladas de self.classifier
+        (src/label_rules.json), com a decisao memorizada por rotulo.
         CAMPOS ESPERADOS:
         - Titular, Cargo
         - Endereco, Numero, Complemento, Bairro, CEP
@@ -994,290 +803,27 @@ class SiciSmsScraper:
             label: Rotulo da informacao
             value: Valor da informacao
             info: Dicionario para armazenar
-        """
-        label_lower = label.lower().strip()
-        value_clean = value.strip()
-        
-        # GERAL (Titular, Cargo, Responsavel)
-        if any(x in label_lower for x in ["titular", "responsavel", "gerente", "coordenador", "diretor", "superintendente", "chefe", "nome"]):
-            info.setdefault("geral", {})["titular"] = value_clean
-        elif any(x in label_lower for x in ["cargo", "funcao", "função", "posicao", "posição", "posto"]):
-            info.setdefault("geral", {})["cargo"] = value_clean
-        
-        # ENDERECO (Endereco/Logradouro, Numero, Complemento, Bairro, CEP)
-        elif label_lower in ["endereco", "endereço", "logradouro"] or any(x in label_lower for x in ["rua", "avenida", "av.", "av ", "praca", "praça", "alameda", "travessa", "estrada"]):
-            info.setdefault("endereco", {})["logradouro"] = value_clean
-        elif label_lower in ["numero", "número", "n.", "no", "nº"]:
-            info.setdefault("endereco", {})["numero"] = value_clean
-        elif label_lower in ["complemento", "compl.", "compl"]:
-            info.setdefault("endereco", {})["complemento"] = value_clean
-        elif label_lower in ["bairro", "distrito"]:
-            info.setdefault("endereco", {})["bairro"] = value_clean
-        elif label_lower in ["cep", "código postal", "codigo postal", "postal"]:
-            info.setdefault("endereco", {})["cep"] = value_clean
-        elif label_lower in ["cidade", "municipio", "município", "localidade"]:
-            info.setdefault("endereco", {})["cidade"] = value_clean
-        elif label_lower in ["uf", "estado", "unidade federativa"]:
-            info.setdefault("endereco", {})["estado"] = value_clean
-        
-        # COMUNICACOES (Telefone, E-mail, Fax)
-        elif any(x in label_lower for x in ["telefone", "fone", "celular", "whatsapp", "tel.", "tel ", "ramal", "corporativo"]) and "mail" not in label_lower:
-            info.setdefault("comunicacoes", []).append({
-                "tipo": label.strip(),
-                "valor": value_clean
-            })
-        elif any(x in label_lower for x in ["e-mail", "email", "mail", "correio"]):
-            info.setdefault("comunicacoes", []).append({
-                "tipo": label.strip(),
-                "valor": value_clean
-            })
-        elif any(x in label_lower for x in ["fax", "facs"]):
-            info.setdefault("comunicacoes", []).append({
-                "tipo": label.strip(),
-                "valor": value_clean
-            })
         
-        # OUTROS CAMPOS GERAIS (qualquer outra informacao relevante)
-        else:
-            if len(label) > 2 and len(value_clean) > 1 and value_clean not in ["", "-", "N/A", "n/a"]:
-                info.setdefault("geral", {})[label.strip()] = value_clean
+        Returns:
+            bool: True se o valor foi gravado em info
+        """
+        return categorize(label, value, info, self.classifier)
 
-    def _is_already_collected(self, info: dict, label: str, value: str) -> bool:
+    def _is_already_collected(self, seen: set, value: str) -> bool:
         """
-        Verifica se uma informacao ja foi coletada para evitar duplicatas.
+        Verifica se um valor ja foi coletado no no para evitar duplicatas
+        (o mesmo dado costuma vir das tabelas e do texto do painel).
         
         Args:
-            info: Dicionario de informacoes
-            label: Rotulo
+            seen: Valores normalizados (normalize_value) ja gravados no no
             value: Valor
         
         Returns:
             bool: True se ja foi coletado
         """
-        # Verificar em geral
-        if "geral" in info:
-            for v in info["geral"].values():
-                if isinstance(v, str) and value.lower() in v.lower():
-                    return True
-        
-        # Verificar em endereco
-        if "endereco" in info:
-            for v in info["endereco"].values():
-                if isinstance(v, str) and value.lower() in v.lower():
-                    return True
-        
-        # Verificar em comunicacoes
-        if "comunicacoes" in info:
-            for comm in info["comunicacoes"]:
-                if comm.get("valor", "").lower() == value.lower():
-                    return True
-        
-        return False
+        return normalize_value(value) in seen
 
 
-    def _expand_and_access_node(self, node_text: str, parent_dict: dict, depth: int = 0) -> int:
-        """
-        Expande um no, ACESSA ele, coleta dados e processa filhos.
-        
-        Args:
-            node_text: Texto do no a processar
-            parent_dict: Dicionario para armazenar dados do no
-            depth: Profundidade na arvore
-            
-        Returns:
-            int: Numero total de cliques realizados
-        """
-        # IGNORAR NO PLACEHOLDER "0"
-        if node_text == "0":
-            return 0
-        
-        indent = "  " * depth
-        clicks = 0
-        expansion_attempts = 3  # Maximo de tentativas para expandir um no
-        expansion_count = 0
-        
-        # PRIMEIRO: Tentar encontrar o no (reencontra sempre para evitar detachment)
-        all_links = self.page.query_selector_all("a[id*='ua_treeview']:not([id$='i'])")
-        node_link = None
-        node_id = None
-        
-        for link in all_links:
-            text = link.text_content().strip()
-            if text == node_text:
-                try:
-                    node_link = link
-                    node_id = link.get_attribute('id')
-                    break
-                except Exception:
-                    # Link pode ter sido desanexado
-                    continue
-        
-        if not node_link:
-            return clicks
-        
-        # Extrair numeros e IDs
-        try:
-            node_num = node_id.replace('ContentPlaceHolder1_ua_treeviewt', '')
-            icon_id = f"ContentPlaceHolder1_ua_treeviewt{node_num}i"
-            nodes_id = f"ContentPlaceHolder1_ua_treeviewn{node_num}Nodes"
-            
-            # Obter icone e container de filhos
-            icon = self.page.query_selector(f"#{icon_id}")
-            nodes_div = self.page.query_selector(f"#{nodes_id}")
-        except Exception as e:
-            print(f"{indent}[AVISO] Erro ao processar IDs: {e}")
-            self._save_node_data(node_text, {"erro": str(e), "tipo": "erro_ids"})
-            return clicks
-        
-        # Se nao tem icone, eh um no folha
-        if not icon or not nodes_div:
-            print(f"{indent}  Acessando (folha): {node_text}")
-            try:
-                # Reencontrar antes de clicar
-                all_links = self.page.query_selector_all("a[id*='ua_treeview']:not([id$='i'])")
-                node_link = None
-                for link in all_links:
-                    if link.text_content().strip() == node_text:
-                        node_link = link
-                        break
-                
-                if node_link:
-                    node_link.click()
-                    clicks += 1
-                    self.page.wait_for_timeout(500)
-                    node_info = self._extract_node_info()
-                    parent_dict[node_text] = node_info
-                    
-                    # Salvar dados do no em arquivo JSON
-                    self._save_node_data(node_text, node_info)
-                    print(f"{indent}     Informacoes coletadas")
-            except Exception as e:
-                parent_dict[node_text] = {"erro": str(e)}
-                self._save_node_data(node_text, {"erro": str(e)})
-                print(f"{indent}[AVISO] Erro ao acessar folha: {e}")
-            
-            return clicks
-        
-        # Expandir o no (tentar ate expansion_attempts vezes)
-        while expansion_count < expansion_attempts:
-            try:
-                display = self.page.evaluate(
-                    "el => window.getComputedStyle(el).display",
-                    nodes_div
-                )
-            except Exception:
-                display = "block"
-            
-            if display == "none":
-                # Ainda colapsado, expandir
-                expansion_count += 1
-                print(f"{indent}  Expandindo (tentativa {expansion_count}): {node_text}")
-                try:
-                    # Reencontrar icone
-                    icon = self.page.query_selector(f"#{icon_id}")
-                    if icon:
-                        icon.click()
-                        clicks += 1
-                        self.page.wait_for_timeout(600)
-                except Exception as e:
-                    print(f"{indent}[AVISO] Erro ao expandir: {e}")
-                    parent_dict[node_text] = {"erro": f"Nao foi possivel expandir: {e}"}
-                    return clicks
-            else:
-                # Esta expandido, acessar e processar filhos
-                break
-        
-        # ACESSAR o no
-        print(f"{indent}  Acessando: {node_text}")
-        try:
-            # Reencontrar antes de clicar
-            all_links = self.page.query_selector_all("a[id*='ua_treeview']:not([id$='i'])")
-            node_link = None
-            for link in all_links:
-                if link.text_content().strip() == node_text:
-                    node_link = link
-                    break
-            
-            if node_link:
-                node_link.click()
-                clicks += 1
-                self.page.wait_for_timeout(500)
-                node_info = self._extract_node_info()
-                parent_dict[node_text] = {"info": node_info, "filhos": {}}
-                
-                # Salvar dados do no em arquivo JSON
-                self._save_node_data(node_text, node_info)
-                print(f"{indent}     Informacoes coletadas")
-        except Exception as e:
-            parent_dict[node_text] = {"erro": str(e), "filhos": {}}
-            self._save_node_data(node_text, {"erro": str(e)})
-            print(f"{indent}[AVISO] Erro ao acessar: {e}")
-            return clicks
-        
-        # Processar filhos
-        try:
-            nodes_div = self.page.query_selector(f"#{nodes_id}")
-            if nodes_div:
-                all_children = nodes_div.query_selector_all("a[id*='ua_treeview']:not([id$='i'])")
-            else:
-                all_children = []
-        except Exception:
-            return clicks
-        
-        # Verificar se ha apenas um placeholder "0" - se sim, clicar para revelar filhos reais
-        if len(all_children) == 1:
-            child_text = all_children[0].text_content().strip()
-            if child_text == "0":
-                print(f"{indent}     Encontrado placeholder '0', clicando para revelar filhos reais...")
-                try:
-                    all_children[0].click()
-                    self.page.wait_for_load_state('networkidle')
-                    self.page.wait_for_timeout(1000)
-                    
-                    # Tentar novamente buscar filhos apos o postback
-                    nodes_div = self.page.query_selector(f"#{nodes_id}")
-                    if nodes_div:
-                        all_children = nodes_div.query_selector_all("a[id*='ua_treeview']:not([id$='i'])")
-                    else:
-                        all_children = []
-                except Exception as e:
-                    print(f"{indent}[AVISO] Erro ao clicar em placeholder '0': {e}")
-                    all_children = []
-        
-        if all_children:
-            print(f"{indent}     {len(all_children)} filhos encontrados")
-            
-            if "filhos" not in parent_dict[node_text]:
-                parent_dict[node_text]["filhos"] = {}
-            
-            for i, child_link in enumerate(all_children):
-                try:
-                    child_text = child_link.text_content().strip()
-                except Exception:
-                    continue
-                
-                if not child_text:
-                    continue
-                
-                # Ignorar no placeholder "0"
-                if child_text == "0":
-                    continue
-                
-                print(f"{indent}       [{i+1}] Processando: {child_text}")
-                try:
-                    child_clicks = self._expand_and_access_node(
-                        child_text, 
-                        parent_dict[node_text]["filhos"],
-                        depth + 2
-                    )
-                    clicks += child_clicks
-                except Exception as e:
-                    print(f"{indent}[AVISO] Erro em filho: {e}")
-                    parent_dict[node_text]["filhos"][child_text] = {"erro": str(e)}
-                    continue
-        
-        return clicks
-
     def save_collected_data(self, data: dict) -> None:
         """
         Salva os dados coletados em um arquivo JSON estruturado.
@@ -1312,6 +858,23 @@ class SiciSmsScraper:
         except Exception as e:
             print(f"Erro ao salvar resumo: {e}")
 
+    def save_streamed_data(self, data_dir: str = "data") -> None:
+        """
+        Gera sms_informacoes.json e resumo.json (em data_dir) a partir do NDJSON
+        gravado durante a coleta, sem montar a arvore inteira em memoria.
+        """
+        os.makedirs(data_dir, exist_ok=True)
+        
+        json_file = os.path.join(data_dir, "sms_informacoes.json")
+        resumo_file = os.path.join(data_dir, "resumo.json")
+        
+        try:
+            total = rebuild_outputs(self.tree_stream.stream_file, json_file, resumo_file)
+            print(f"Dados completos salvos em {json_file} ({total} nos)")
+            print(f"Resumo salvo em {resumo_file}")
+        except Exception as e:
+            print(f"Erro ao gerar saidas a partir de {self.tree_stream.stream_file}: {e}")
+
     def _criar_resumo(self, data: dict, estrutura: dict = None) -> dict:
         """
         Cria um resumo da estrutura com apenas os nomes dos nos.
@@ -1343,6 +906,132 @@ class SiciSmsScraper:
         
         return estrutura
 
+    def crawl(self, reload: bool = True) -> bool:
+        """
+        Abre o site e percorre a arvore, reabrindo o navegador e retomando pelo
+        diario ate CRAWL_RESTARTS vezes se a coleta falhar.
+        
+        Args:
+            reload: Se False, usa a pagina ja aberta (proximo orgao na mesma sessao)
+        
+        Returns:
+            bool: True se a arvore (ou os ramos atribuidos) foi concluida
+        """
+        if reload:
+            self.open_site()
+        for attempt in range(1, CRAWL_RESTARTS + 2):
+            try:
+                complete = self.expand_all_nodes()
+            except Exception as e:
+                print(f"[AVISO] Erro durante expansao de nos: {e}")
+                complete = False
+            
+            if complete or attempt > CRAWL_RESTARTS:
+                return complete
+            
+            # Reabrir a sessao e retomar do primeiro no nao concluido
+            print(f"[*] Reiniciando e retomando a coleta (tentativa {attempt}/{CRAWL_RESTARTS})...")
+            self._restart()
+            self.open_site()
+        return False
+
+    def list_root_children(self) -> tuple:
+        """
+        Expande o orgao raiz, lista seus filhos diretos e extrai os dados do proprio
+        orgao, sem descer na arvore (distribuicao dos ramos entre processos).
+        
+        Returns:
+            tuple: (info do orgao, nomes dos filhos na ordem de exibicao, sem repeticao);
+                   (None, []) se o orgao nao for encontrado
+        """
+        self._account_node(self.root_text)
+        with self.tracer.span("leitura_arvore", [self.root_text]):
+            self.tree.refresh(self.page)
+        root_record = self._resolve_node(self.root_text)
+        if not root_record:
+            print(f"[!] No {self.root_text} nao encontrado!")
+            return None, []
+        root_node_id = root_record['id']
+        
+        if root_record['hasExpander'] and not root_record['expanded']:
+            with self.tracer.span("expansao", [self.root_text]):
+                self.waiter.click_and_wait(JS_CLICK_EXPANDER, root_node_id, children_container_selector(root_node_id))
+        with self.tracer.span("leitura_arvore", [self.root_text]):
+            self.tree.refresh(self.page, under=root_node_id)
+        names = list(dict.fromkeys(child['text'] for child in self.tree.children_of(root_node_id)))
+        
+        with self.tracer.span("clique", [self.root_text]):
+            self.waiter.click_and_wait(JS_CLICK_NODE, root_node_id, DETAIL_PANEL_SELECTOR)
+        with self.tracer.span("extracao", [self.root_text]):
+            root_info = self._extract_node_info([self.root_text])
+        return root_info, names
+
+    def list_roots(self) -> list:
+        """
+        Textos dos orgaos de primeiro nivel exibidos na arvore, na ordem de exibicao, sem repeticao.
+        """
+        self.tree.refresh(self.page)
+        return list(dict.fromkeys(record['text'] for record in self.tree.roots()))
+
+    def run_roots(self, roots=ROOTS, roots_dir: str = ROOTS_DIR) -> dict:
+        """
+        Coleta varios orgaos de primeiro nivel em uma unica sessao: o navegador eh
+        aberto e o site carregado uma vez, e cada orgao eh percorrido em seguida na
+        mesma pagina, com estado e saidas proprios em roots_dir/<orgao>/ (diario,
+        agenda, NDJSON, armazenamento, sms_informacoes.json e resumo.json).
+        SMS continua com os arquivos padrao (os mesmos de run), para nao perder o
+        diario e a agenda de recoleta das coletas anteriores.
+        
+        Args:
+            roots: Textos dos orgaos (ex: ["SMS", "SMF"]) ou "todos"
+            roots_dir: Pasta com uma subpasta por orgao
+        
+        Returns:
+            dict: orgao -> True se a arvore dele foi concluida
+        """
+        print("\n" + "="*60)
+        print("Iniciando RPA SICI (varios orgaos)")
+        print("="*60 + "\n")
+        
+        self.open_site()
+        if roots == "todos":
+            roots = self.list_roots()
+        roots = list(dict.fromkeys(roots))
+        print(f"[*] {len(roots)} orgao(s) nesta sessao: {', '.join(roots)}")
+        
+        results = {}
+        for position, root in enumerate(roots, 1):
+            print(f"\n[*] Orgao {position}/{len(roots)}: {root}")
+            start = time.perf_counter()
+            target = None if root == "SMS" else Path(roots_dir) / safe_filename(root)
+            self._select_root(root, target)
+            try:
+                # Reabrir o site so se a coleta do orgao precisar reiniciar o navegador
+                results[root] = self.crawl(reload=False)
+            except Exception as e:
+                print(f"[ERRO] Falha no orgao '{root}': {e}")
+                results[root] = False
+            if self.tree_stream:
+                self.tree_stream.close()
+                self.save_streamed_data(str(target) if target else "data")
+            status = "[OK]" if results[root] else "[!]"
+            print(f"{status} {root}: {time.perf_counter() - start:.1f}s")
+        
+        self.tracer.export()
+        if self.accountant:
+            self.accountant.report()
+        if self.snapshots:
+            self.snapshots.report()
+        
+        incomplete = [root for root, complete in results.items() if not complete]
+        if incomplete:
+            print(f"[!] {len(incomplete)} orgao(s) incompleto(s), retomados do diario na proxima execucao: {', '.join(incomplete)}")
+        else:
+            print("\n" + "="*60)
+            print("RPA concluida com sucesso!")
+            print("="*60 + "\n")
+        return results
+
     def run(self) -> None:
         """
         Executa o fluxo completo da RPA:
@@ -1356,14 +1045,23 @@ class SiciSmsScraper:
         print("="*60 + "\n")
 
         try:
-            self.open_site()
-            try:
-                self.expand_all_nodes()
-            except Exception as e:
-                print(f"[AVISO] Erro durante expansao de nos: {e}")
+            complete = self.crawl()
+            
+            if not complete:
                 print("   Continuando com dados ja coletados...")
             
-            self.save_collected_data(self.collected_data)
+            if self.tree_stream:
+                # Motor sincrono: a hierarquia foi gravada no por no em NDJSON
+                self.tree_stream.close()
+                self.save_streamed_data()
+            else:
+                self.save_collected_data(self.collected_data)
+            
+            self.tracer.export()
+            if self.accountant:
+                self.accountant.report()
+            if self.snapshots:
+                self.snapshots.report()
             
             print("\n" + "="*60)
             print("RPA concluida com sucesso!")
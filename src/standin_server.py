@@ -0,0 +1,142 @@
+"""
+Servidor local substituto do SICI, servindo paginas gravadas.
+
+Le a pasta gravada pelo HttpPostbackCrawler (record_dir): manifest.jsonl com
+uma linha por resposta ({method, target, argument, file}) e os arquivos HTML.
+- GET devolve a primeira pagina gravada
+- POST devolve a pagina gravada para o par (__EVENTTARGET, __EVENTARGUMENT);
+  se o mesmo par foi gravado mais de uma vez, as respostas sao servidas em ordem
+
+Permite testar o crawler HTTP sem acessar o site da prefeitura:
+
+    python -m src.standin_server gravacao/ --port 8765
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+
+class StandinSiciServer:
+    """
+    Servidor HTTP que reproduz uma gravacao de paginas do SICI.
+    """
+
+    def __init__(self, record_dir: str, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            record_dir: Pasta com manifest.jsonl e as paginas gravadas
+            host: Endereco de escuta
+            port: Porta (0 escolhe uma porta livre)
+        """
+        self.record_dir = Path(record_dir)
+        self.host = host
+        self.port = port
+        self.index_file = None
+        self.postbacks = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self._load_manifest()
+
+    def _load_manifest(self):
+        """Indexa as respostas gravadas por (target, argument)."""
+        with open(self.record_dir / "manifest.jsonl", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["method"] == "GET":
+                    self.index_file = self.index_file or entry["file"]
+                else:
+                    key = (entry.get("target") or "", entry.get("argument") or "")
+                    self.postbacks.setdefault(key, []).append(entry["file"])
+
+    def _page_for(self, target: str, argument: str) -> str:
+        """Proxima pagina gravada para o postback (repete a ultima quando acabam)."""
+        files = self.postbacks.get((target, argument))
+        if not files:
+            return None
+        with self._lock:
+            cursor = self._cursors.get((target, argument), 0)
+            self._cursors[(target, argument)] = cursor + 1
+        return files[min(cursor, len(files) - 1)]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_file(self, file_name):
+                if not file_name:
+                    self.send_error(404, "Resposta nao gravada")
+                    return
+                body = (server.record_dir / file_name).read_bytes()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._send_file(server.index_file)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+                target = form.get("__EVENTTARGET", [""])[0]
+                argument = form.get("__EVENTARGUMENT", [""])[0]
+                self._send_file(server._page_for(target, argument))
+
+            def log_message(self, format, *args):
+                pass  # Silencioso
+
+        return Handler
+
+    @property
+    def url(self) -> str:
+        """URL da pagina principal servida."""
+        return f"http://{self.host}:{self.port}/PAG/principal.aspx"
+
+    def start(self) -> str:
+        """Inicia o servidor em uma thread e retorna a URL da pagina principal."""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        """Encerra o servidor."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local com paginas gravadas do SICI")
+    parser.add_argument("record_dir", help="Pasta gravada pelo HttpPostbackCrawler")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = StandinSiciServer(args.record_dir, args.host, args.port)
+    print(f"[*] Servindo {args.record_dir} em {server.start()}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
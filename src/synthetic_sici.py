@@ -0,0 +1,444 @@
+"""
+Servidor local sintetico que imita o TreeView do SICI, com tamanho configuravel.
+
+Diferente de standin_server (que repete uma gravacao), este servidor gera uma
+arvore deterministica e responde aos postbacks como o ASP.NET responderia, com
+a mesma estrutura de HTML que os scrapers esperam:
+- link de texto ContentPlaceHolder1_ua_treeviewt{N} ('s' + caminho de valores),
+  link da imagem ...t{N}i e icone +/- em ...n{N} ('t' + caminho, alt "Expand X"/"Collapse X")
+- filhos em <div id="...n{N}Nodes">, renderizados so quando o no esta expandido
+- dropdown com "Informações Gerais" (AutoPostBack), que volta para "Selecione"
+  a cada no selecionado
+- painel #ContentPlaceHolder1_cphConteudo_divConteudoUA com titulo, decreto,
+  Titular/Cargo, Endereço/Número/Complemento e Bairro/CEP em DIVs com CSS de
+  tabela e Comunicações em uma tabela de 2 colunas
+- imagens (+/-, icones e logotipo) servidas de verdade, para que o bloqueio de
+  recursos tenha efeito mensuravel
+
+O estado (nos expandidos e selecionado) vai no __VIEWSTATE, entao o servidor nao
+guarda sessao e atende varios contextos/processos ao mesmo tempo.
+
+    python -m src.synthetic_sici --nos 5000 --profundidade 4 --ramificacao 12 --latencia 50
+"""
+
+import argparse
+import base64
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+TREE_TARGET = "ctl00$ContentPlaceHolder1$ua_treeview"
+DROPDOWN_NAME = "ctl00$ContentPlaceHolder1$ddlOpcoes"
+ID_PREFIX = "ContentPlaceHolder1_ua_treeview"
+PAGE_PATH = "/PAG/principal.aspx"
+
+# Outros orgaos exibidos na raiz da arvore, ao lado de SMS
+OTHER_ROOTS = ("CVL", "SMF", "SME")
+
+# Prefixo do nome e do titulo por nivel abaixo de SMS (o ultimo se repete)
+LEVEL_NAMES = (
+    ("CAP", "Coordenadoria Geral de Atencao Primaria"),
+    ("DIV", "Divisao de Acoes e Programas de Saude"),
+    ("UNID", "Unidade de Atencao Primaria"),
+    ("SETOR", "Setor Administrativo"),
+)
+
+BAIRROS = (
+    "Cidade Nova", "Centro", "Tijuca", "Bangu", "Campo Grande", "Madureira",
+    "Penha", "Botafogo", "Santa Cruz", "Jacarepaguá", "Méier", "Realengo",
+)
+
+CARGOS = ("Coordenador", "Diretor", "Gerente", "Chefe de Divisao", "Assessor")
+
+# GIF 1x1 transparente (icones) e um "logotipo" maior
+_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+_LOGO = _GIF + bytes(24 * 1024)
+_STYLESHEET = b"body { font-family: Arial, sans-serif; } .titulo { font-size: 18px; }"
+
+
+class _Node:
+    __slots__ = ("index", "name", "titulo", "parent", "children", "value_path")
+
+    def __init__(self, index: int, name: str, titulo: str, parent: "_Node"):
+        self.index = index
+        self.name = name
+        self.titulo = titulo
+        self.parent = parent
+        self.children = []
+        self.value_path = (parent.value_path + "\\" if parent else "") + name
+
+
+class SyntheticTree:
+    """
+    Arvore deterministica: SMS com ate num_nodes nos (incluindo SMS), preenchida
+    em largura ate depth niveis com fanout filhos por no, e alguns outros orgaos.
+    """
+
+    def __init__(self, num_nodes: int = 1000, depth: int = 4, fanout: int = 10):
+        self.roots = []
+        self.by_value_path = {}
+        self.nodes = []
+
+        sms = None
+        for root_name in OTHER_ROOTS[:1] + ("SMS",) + OTHER_ROOTS[1:]:
+            root = _Node(0, root_name, f"Orgao {root_name}", None)
+            self.roots.append(root)
+            if root_name == "SMS":
+                sms = root
+                root.titulo = "Secretaria Municipal de Saude"
+            else:
+                for i in range(1, 3):
+                    root.children.append(_Node(0, f"{root_name} {i}", f"Unidade {i} de {root_name}", root))
+
+        # SMS preenchida nivel a nivel, ate num_nodes nos no total
+        count = 1
+        level = [sms]
+        numbers = {id(sms): ()}
+        for depth_level in range(depth):
+            prefix, long_name = LEVEL_NAMES[min(depth_level, len(LEVEL_NAMES) - 1)]
+            next_level = []
+            for parent in level:
+                for i in range(1, fanout + 1):
+                    if count >= num_nodes:
+                        break
+                    number = numbers[id(parent)] + (i,)
+                    label = ".".join(str(n) for n in number)
+                    child = _Node(0, f"{prefix} {label}", f"{long_name} {label}", parent)
+                    numbers[id(child)] = number
+                    parent.children.append(child)
+                    next_level.append(child)
+                    count += 1
+            level = next_level
+            if count >= num_nodes or not level:
+                break
+        self.sms_size = count
+
+        # N estavel: posicao do no em pre-ordem na arvore inteira
+        stack = list(reversed(self.roots))
+        while stack:
+            node = stack.pop()
+            node.index = len(self.nodes)
+            self.nodes.append(node)
+            self.by_value_path[node.value_path] = node
+            stack.extend(reversed(node.children))
+
+    def details(self, node: _Node) -> dict:
+        """Conteudo do painel "Informações Gerais" do no."""
+        i = node.index
+        return {
+            "titulo": node.titulo,
+            "decreto": f"Decreto nº {10000 + i} de {1 + i % 28:02d}/{1 + i % 12:02d}/{1990 + i % 34}",
+            "titular": f"Servidor {i:05d} da Silva",
+            "cargo": CARGOS[i % len(CARGOS)],
+            "logradouro": f"Rua Afonso Cavalcanti {i % 97}",
+            "numero": str(100 + i % 900),
+            "complemento": f"{1 + i % 12} Andar",
+            "bairro": BAIRROS[i % len(BAIRROS)],
+            "cep": f"2{i % 10000:04d}-{i % 1000:03d}",
+            "telefone": f"(21) 2{i % 1000:03d}-{i % 10000:04d}",
+            "email": f"unidade{i}@rio.rj.gov.br",
+        }
+
+
+def _encode_state(expanded: set, selected: int) -> str:
+    data = json.dumps({"e": sorted(expanded), "s": selected}, separators=(",", ":"))
+    return base64.b64encode(data.encode("utf-8")).decode("ascii")
+
+
+def _decode_state(viewstate: str) -> tuple:
+    try:
+        data = json.loads(base64.b64decode(viewstate or ""))
+        return set(data.get("e") or []), data.get("s")
+    except ValueError:
+        return set(), None
+
+
+def _js_arg(value: str) -> str:
+    """Argumento de __doPostBack escapado como string JS dentro de um atributo HTML."""
+    return html.escape(value.replace("\\", "\\\\").replace("'", "\\'"), quote=True)
+
+
+class SyntheticSiciServer:
+    """
+    Servidor HTTP com uma imitacao do SICI sobre uma SyntheticTree.
+    """
+
+    def __init__(self, num_nodes: int = 1000, depth: int = 4, fanout: int = 10,
+                 latency_ms: float = 0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            num_nodes: Tamanho da subarvore de SMS (incluindo SMS)
+            depth: Niveis abaixo de SMS
+            fanout: Filhos por no
+            latency_ms: Atraso de cada resposta da pagina (simula o servidor remoto)
+            host: Endereco de escuta
+            port: Porta (0 escolhe uma porta livre)
+        """
+        self.tree = SyntheticTree(num_nodes, depth, fanout)
+        self.latency = latency_ms / 1000
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zera os contadores de requisicoes."""
+        with self._lock:
+            self.stats = {"paginas": 0, "postbacks": 0, "estaticos": 0, "bytes": 0}
+            self.selected_nodes = set()
+
+    def _count(self, key: str, size: int):
+        with self._lock:
+            self.stats[key] += 1
+            self.stats["bytes"] += size
+
+    # ------------------------------------------------------------------
+    # Renderizacao
+    # ------------------------------------------------------------------
+
+    def _render_node(self, out: list, node: _Node, expanded: set, selected: int, depth: int):
+        n = node.index
+        name = html.escape(node.name)
+        cells = ['<td><div style="width:20px;height:1px"></div></td>'] * depth
+        if node.children:
+            is_open = n in expanded
+            action, icon = ("Collapse", "minus") if is_open else ("Expand", "plus")
+            cells.append(
+                f'<td><a id="{ID_PREFIX}n{n}" href="javascript:__doPostBack(\'{TREE_TARGET}\','
+                f'\'t{_js_arg(node.value_path)}\')"><img src="img/{icon}.gif" alt="{action} {name}" '
+                f'style="border-width:0;" /></a></td>'
+            )
+        else:
+            is_open = False
+            cells.append('<td><img src="img/spacer.gif" alt="" /></td>')
+        select_href = f"javascript:__doPostBack('{TREE_TARGET}','s{_js_arg(node.value_path)}')"
+        cells.append(
+            f'<td><a id="{ID_PREFIX}t{n}i" href="{select_href}" tabindex="-1">'
+            f'<img src="img/folder.gif" alt="" style="border-width:0;" /></a></td>'
+        )
+        style = "ua_treeview_0 ua_treeview_3" if n == selected else "ua_treeview_0"
+        cells.append(f'<td style="white-space:nowrap;"><a class="{style}" href="{select_href}" id="{ID_PREFIX}t{n}">{name}</a></td>')
+        out.append(f'<table cellpadding="0" cellspacing="0" style="border-width:0;"><tr>{"".join(cells)}</tr></table>')
+        if is_open:
+            out.append(f'<div id="{ID_PREFIX}n{n}Nodes" style="display:block;">')
+            for child in node.children:
+                self._render_node(out, child, expanded, selected, depth + 1)
+            out.append("</div>")
+
+    def _render_panel(self, node: _Node, tab: str) -> str:
+        if node is None:
+            return "<p>Selecione uma unidade na arvore.</p>"
+        if tab != "geral":
+            return f'<h2 class="titulo">{html.escape(node.titulo)}</h2><p>Selecione uma opção.</p>'
+
+        d = {k: html.escape(v) for k, v in self.tree.details(node).items()}
+
+        def row(*values):
+            cells = "".join(f'<div style="display:table-cell;padding-right:20px">{v}</div>' for v in values)
+            return f'<div style="display:table-row">{cells}</div>'
+
+        return (
+            f'<h2 class="titulo">{d["titulo"]}</h2>'
+            f'<div class="decreto">{d["decreto"]}</div>'
+            f'<div style="display:table">{row("Titular", "Cargo")}{row(d["titular"], d["cargo"])}</div>'
+            f'<div style="display:table">{row("Endereço", "Número", "Complemento")}'
+            f'{row(d["logradouro"], d["numero"], d["complemento"])}</div>'
+            f'<div style="display:table">{row("Bairro", "CEP")}{row(d["bairro"], d["cep"])}</div>'
+            f'<h4>Comunicações</h4>'
+            f'<table class="comunicacoes">'
+            f'<tr><td>Telefone corporativo</td><td>{d["telefone"]}</td></tr>'
+            f'<tr><td>E-mail corporativo</td><td>{d["email"]}</td></tr>'
+            f'</table>'
+        )
+
+    def render(self, expanded: set, selected: int, tab: str) -> str:
+        """Pagina principal completa para o estado informado."""
+        tree_html = []
+        for root in self.tree.roots:
+            self._render_node(tree_html, root, expanded, selected, 0)
+
+        node = self.tree.nodes[selected] if selected is not None else None
+        selected_attr = ' selected="selected"'
+        options = "".join(
+            f'<option value="{value}"{selected_attr if value == tab else ""}>{label}</option>'
+            for value, label in (("", "Selecione"), ("geral", "Informações Gerais"), ("estrutura", "Estrutura"))
+        )
+        dropdown = (
+            f'<select name="{DROPDOWN_NAME}" id="ContentPlaceHolder1_ddlOpcoes" '
+            f'onchange="javascript:setTimeout(&#39;__doPostBack(\\&#39;{DROPDOWN_NAME}\\&#39;,\\&#39;\\&#39;)&#39;, 0)">'
+            f'{options}</select>'
+        ) if node is not None else ""
+
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>SICI - Sistema de Informacoes Cadastrais</title>
+<link rel="stylesheet" href="estilo.css" /></head>
+<body>
+<form method="post" action="./principal.aspx" id="form1">
+<input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="" />
+<input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="" />
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{_encode_state(expanded, selected)}" />
+<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="sintetico" />
+<script type="text/javascript">
+var theForm = document.forms['form1'];
+function __doPostBack(eventTarget, eventArgument) {{
+    if (!theForm.onsubmit || (theForm.onsubmit() != false)) {{
+        theForm.__EVENTTARGET.value = eventTarget;
+        theForm.__EVENTARGUMENT.value = eventArgument;
+        theForm.submit();
+    }}
+}}
+</script>
+<div class="cabecalho"><img src="img/logo.png" alt="Prefeitura" /></div>
+<div id="ContentPlaceHolder1_ua_treeview" style="float:left;width:40%">
+{"".join(tree_html)}
+</div>
+<div style="float:left;width:55%">
+{dropdown}
+<div id="ContentPlaceHolder1_cphConteudo_divConteudoUA">{self._render_panel(node, tab)}</div>
+</div>
+</form>
+</body></html>"""
+
+    def handle_postback(self, form: dict) -> str:
+        """Aplica o evento do formulario ao estado do __VIEWSTATE e renderiza a pagina."""
+        expanded, selected = _decode_state(form.get("__VIEWSTATE", ""))
+        target = form.get("__EVENTTARGET", "")
+        argument = form.get("__EVENTARGUMENT", "")
+        tab = form.get(DROPDOWN_NAME, "")
+
+        if target == TREE_TARGET and argument[:1] in ("s", "t"):
+            node = self.tree.by_value_path.get(argument[1:])
+            if node is not None and argument[0] == "s":
+                selected = node.index
+                tab = ""  # O painel volta para "Selecione" a cada no selecionado
+            elif node is not None:
+                expanded ^= {node.index}
+
+        if selected is not None and tab == "geral":
+            with self._lock:
+                self.selected_nodes.add(selected)
+        return self.render(expanded, selected, tab)
+
+    # ------------------------------------------------------------------
+    # Servidor HTTP
+    # ------------------------------------------------------------------
+
+    def _make_handler(self):
+        server = self
+        static = {
+            "/PAG/img/plus.gif": ("image/gif", _GIF),
+            "/PAG/img/minus.gif": ("image/gif", _GIF),
+            "/PAG/img/spacer.gif": ("image/gif", _GIF),
+            "/PAG/img/folder.gif": ("image/gif", _GIF),
+            "/PAG/img/logo.png": ("image/png", _LOGO),
+            "/PAG/estilo.css": ("text/css", _STYLESHEET),
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, content_type: str, body: bytes, head: bool = False):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+            def _send_page(self, page: str, key: str):
+                if server.latency:
+                    time.sleep(server.latency)
+                body = page.encode("utf-8")
+                server._count(key, len(body))
+                self._send("text/html; charset=utf-8", body)
+
+            def _static(self, head: bool = False) -> bool:
+                entry = static.get(urlparse(self.path).path)
+                if entry is None:
+                    return False
+                server._count("estaticos", 0 if head else len(entry[1]))
+                self._send(*entry, head=head)
+                return True
+
+            def do_HEAD(self):
+                if not self._static(head=True):
+                    self.send_error(404)
+
+            def do_GET(self):
+                if self._static():
+                    return
+                if urlparse(self.path).path != PAGE_PATH:
+                    self.send_error(404)
+                    return
+                self._send_page(server.render(set(), None, ""), "paginas")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                fields = parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+                form = {name: values[0] for name, values in fields.items()}
+                self._send_page(server.handle_postback(form), "postbacks")
+
+            def log_message(self, format, *args):
+                pass  # Silencioso
+
+        return Handler
+
+    @property
+    def url(self) -> str:
+        """URL da pagina principal servida."""
+        return f"http://{self.host}:{self.port}{PAGE_PATH}"
+
+    def start(self) -> str:
+        """Inicia o servidor em uma thread e retorna a URL da pagina principal."""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        """Encerra o servidor."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main():
+    """
+    Linha de comando: sobe o servidor sintetico ate Ctrl+C.
+    """
+    parser = argparse.ArgumentParser(description="Imitacao local do TreeView do SICI")
+    parser.add_argument("--nos", type=int, default=1000, help="Nos na subarvore de SMS")
+    parser.add_argument("--profundidade", type=int, default=4, help="Niveis abaixo de SMS")
+    parser.add_argument("--ramificacao", type=int, default=10, help="Filhos por no")
+    parser.add_argument("--latencia", type=float, default=0, help="Atraso por resposta (ms)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = SyntheticSiciServer(args.nos, args.profundidade, args.ramificacao, args.latencia, port=args.port)
+    url = server.start()
+    print(f"[*] SICI sintetico ({server.tree.sms_size} nos em SMS) em {url} (Ctrl+C para parar)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
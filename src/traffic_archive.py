@@ -0,0 +1,199 @@
+"""
+Gravacao e reproducao do trafego do navegador com o SICI.
+
+Com TRAFFIC_ARCHIVE_MODE = "gravar", TrafficArchive instala uma rota "**/*" no
+contexto que busca cada requisicao no servidor (route.fetch), grava a resposta
+em TRAFFIC_ARCHIVE_DIR e a entrega ao navegador. Com "reproduzir", a mesma rota
+atende tudo a partir do arquivo, sem rede: uma coleta inteira (expand_all_nodes
+contra a gravacao de ontem) roda em segundos, sem carga no site da prefeitura.
+
+Cada resposta eh indexada por:
+- chave exata: metodo, caminho da URL, __EVENTTARGET, __EVENTARGUMENT e o estado
+  do formulario (campos visiveis e estado do TreeView; __VIEWSTATE e
+  __EVENTVALIDATION ficam de fora, mudam a cada resposta)
+- chave curta: metodo, caminho, __EVENTTARGET e __EVENTARGUMENT, usada quando o
+  estado exato nao foi gravado (ex.: a ordem dos cliques mudou)
+
+Uma chave gravada mais de uma vez eh servida em ordem (a ultima se repete), como
+em standin_server. O manifest.jsonl tambem traz method/target/argument/file, entao
+a mesma pasta pode ser servida ao crawler HTTP com python -m src.standin_server.
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from urllib.parse import parse_qsl, urlparse
+
+from .config import TRAFFIC_ARCHIVE_DIR
+
+MODES = ("gravar", "reproduzir")
+
+# Campos do formulario ASP.NET que mudam a cada resposta (fora da chave)
+_VOLATILE_FIELDS = {"__VIEWSTATE", "__VIEWSTATEGENERATOR", "__EVENTVALIDATION", "__LASTFOCUS", "__SCROLLPOSITIONX", "__SCROLLPOSITIONY"}
+
+# Cabecalhos que nao valem para o corpo ja decodificado por route.fetch
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def request_keys(method: str, url: str, post_data: str = None) -> tuple:
+    """
+    Chaves (exata, curta) de uma requisicao.
+
+    Returns:
+        tuple: (chave exata, chave curta), ambas strings
+    """
+    path = urlparse(url)
+    location = path.path + ("?" + path.query if path.query else "")
+    fields = dict(parse_qsl(post_data or "", keep_blank_values=True))
+    target = fields.get("__EVENTTARGET", "")
+    argument = fields.get("__EVENTARGUMENT", "")
+    short = f"{method} {location} {target} {argument}"
+    state = sorted((k, v) for k, v in fields.items() if k not in _VOLATILE_FIELDS)
+    digest = hashlib.sha1(json.dumps(state, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    return f"{short} #{digest}", short
+
+
+class TrafficArchive:
+    """
+    Rota "**/*" que grava ou reproduz as respostas do SICI.
+    """
+
+    def __init__(self, mode: str, archive_dir: str = TRAFFIC_ARCHIVE_DIR):
+        """
+        Args:
+            mode: "gravar" ou "reproduzir"
+            archive_dir: Pasta do arquivo (manifest.jsonl + corpos das respostas)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Modo de arquivo de trafego invalido: {mode!r} (use {' ou '.join(MODES)})")
+        self.mode = mode
+        self.archive_dir = Path(archive_dir)
+        self.entries = {}
+        self.by_key = {}
+        self.by_short_key = {}
+        self._cursors = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self.stats = {"gravadas": 0, "reproduzidas": 0, "aproximadas": 0, "faltando": 0}
+
+        if mode == "gravar":
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            # Uma gravacao nova substitui a anterior
+            (self.archive_dir / "manifest.jsonl").write_text("", encoding="utf-8")
+        else:
+            self._load_manifest()
+
+    def _load_manifest(self):
+        """Indexa as respostas gravadas pelas chaves exata e curta."""
+        manifest = self.archive_dir / "manifest.jsonl"
+        if not manifest.exists():
+            raise FileNotFoundError(f"Arquivo de trafego nao encontrado: {manifest}")
+        with open(manifest, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.entries[entry["file"]] = entry
+                self.by_key.setdefault(entry["chave"], []).append(entry["file"])
+                self.by_short_key.setdefault(entry["chave_curta"], []).append(entry["file"])
+
+    def _record(self, request, status: int, headers: dict, body: bytes):
+        key, short = request_keys(request.method, request.url, request.post_data)
+        fields = dict(parse_qsl(request.post_data or "", keep_blank_values=True))
+        with self._lock:
+            self._count += 1
+            file_name = f"{self._count:06d}.bin"
+            (self.archive_dir / file_name).write_bytes(body)
+            entry = {
+                "method": request.method,
+                "url": request.url,
+                "target": fields.get("__EVENTTARGET"),
+                "argument": fields.get("__EVENTARGUMENT"),
+                "file": file_name,
+                "chave": key,
+                "chave_curta": short,
+                "status": status,
+                "headers": {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+            }
+            with open(self.archive_dir / "manifest.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.stats["gravadas"] += 1
+
+    def lookup(self, method: str, url: str, post_data: str = None) -> dict:
+        """
+        Proxima resposta gravada para a requisicao (ou None).
+
+        Returns:
+            dict: {status, headers, body}
+        """
+        key, short = request_keys(method, url, post_data)
+        with self._lock:
+            for index, index_key, stat in ((self.by_key, key, "reproduzidas"), (self.by_short_key, short, "aproximadas")):
+                files = index.get(index_key)
+                if not files:
+                    continue
+                cursor = self._cursors.get(index_key, 0)
+                self._cursors[index_key] = cursor + 1
+                entry = self.entries[files[min(cursor, len(files) - 1)]]
+                self.stats[stat] += 1
+                return {
+                    "status": entry["status"],
+                    "headers": entry["headers"],
+                    "body": (self.archive_dir / entry["file"]).read_bytes(),
+                }
+            self.stats["faltando"] += 1
+        return None
+
+    def _handle(self, route):
+        request = route.request
+        if self.mode == "gravar":
+            response = route.fetch()
+            body = response.body()
+            self._record(request, response.status, response.headers, body)
+            route.fulfill(response=response, body=body)
+            return
+
+        recorded = self.lookup(request.method, request.url, request.post_data)
+        if recorded is None:
+            route.abort("internetdisconnected")
+        else:
+            route.fulfill(**recorded)
+
+    async def _handle_async(self, route):
+        request = route.request
+        if self.mode == "gravar":
+            response = await route.fetch()
+            body = await response.body()
+            self._record(request, response.status, response.headers, body)
+            await route.fulfill(response=response, body=body)
+            return
+
+        recorded = self.lookup(request.method, request.url, request.post_data)
+        if recorded is None:
+            await route.abort("internetdisconnected")
+        else:
+            await route.fulfill(**recorded)
+
+    def install(self, context):
+        """
+        Instala a rota em um BrowserContext ou Page (API sincrona).
+        Instalar ANTES do ResourceBlocker: a rota registrada por ultimo roda primeiro,
+        e o bloqueio repassa (fallback) para esta so o que nao abortou.
+        """
+        context.route("**/*", self._handle)
+
+    async def install_async(self, context):
+        """Instala a rota em um BrowserContext (API assincrona)."""
+        await context.route("**/*", self._handle_async)
+
+    def report(self):
+        """Imprime o resumo da gravacao/reproducao."""
+        stats = self.stats
+        if self.mode == "gravar":
+            print(f"[*] Trafego gravado: {stats['gravadas']} resposta(s) em {self.archive_dir}")
+            return
+        print(
+            f"[*] Trafego reproduzido de {self.archive_dir}: {stats['reproduzidas']} exata(s), "
+            f"{stats['aproximadas']} pela chave curta, {stats['faltando']} sem gravacao"
+        )
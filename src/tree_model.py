@@ -0,0 +1,177 @@
+"""
+Modelo em memoria do ua_treeview do SICI.
+
+Montado a partir de uma unica chamada a JS_HARVEST_TREE, que devolve todos os
+nos atualmente renderizados como registros planos
+{id, text, parentId, depth, hasExpander, expanded, valuePath}. Com o modelo, o
+Python decide os proximos cliques e expansoes sem consultar o navegador no por no.
+
+O modelo eh mantido de forma incremental: apos o postback que expande um no,
+refresh(page, under=id) le apenas o container de filhos desse no e substitui a
+subarvore correspondente. Os indices por texto e por caminho de valores
+(argumento de __doPostBack, estavel entre postbacks) tornam a resolucao de um no
+uma consulta a dicionario, sem varrer os links da pagina.
+"""
+
+import re
+
+from .tree_scripts import JS_HARVEST_TREE
+
+
+def text_link_id(node_id: str) -> str:
+    """
+    Normaliza o ID para o link de texto do no: ...t{N}i (link da imagem) -> ...t{N}
+    """
+    return re.sub(r"(t\d+)i$", r"\1", node_id) if node_id else node_id
+
+
+class TreeModel:
+    """
+    Arvore expandida do SICI indexada por ID do link de texto.
+    """
+
+    def __init__(self, records: list = None):
+        """
+        Args:
+            records: Registros devolvidos por JS_HARVEST_TREE (em ordem de documento)
+        """
+        self.merge(records or [])
+
+    def _reset(self):
+        self.nodes = {}
+        self.children = {}
+        self.by_text = {}
+        self.by_value_path = {}
+
+    def _add_all(self, records: list) -> list:
+        """Indexa os registros; devolve os IDs novos."""
+        added = []
+        for record in records:
+            node_id = record["id"]
+            if node_id in self.nodes:
+                continue
+            self.nodes[node_id] = record
+            added.append(node_id)
+            self.children.setdefault(record.get("parentId"), []).append(node_id)
+            self.by_text.setdefault(record["text"], []).append(node_id)
+            if record.get("valuePath"):
+                self.by_value_path[record["valuePath"]] = node_id
+        return added
+
+    def _drop_descendants(self, node_id: str) -> set:
+        """Remove dos indices todos os descendentes do no; devolve os IDs removidos."""
+        removed = set()
+        stack = list(self.children.pop(node_id, []))
+        while stack:
+            child_id = stack.pop()
+            removed.add(child_id)
+            stack.extend(self.children.pop(child_id, []))
+            record = self.nodes.pop(child_id)
+            same_text = self.by_text.get(record["text"], [])
+            if child_id in same_text:
+                same_text.remove(child_id)
+                if not same_text:
+                    del self.by_text[record["text"]]
+            if self.by_value_path.get(record.get("valuePath")) == child_id:
+                del self.by_value_path[record["valuePath"]]
+        return removed
+
+    def merge(self, records: list, under: str = None):
+        """
+        Atualiza o modelo com uma nova leitura da arvore.
+
+        Args:
+            records: Registros de JS_HARVEST_TREE
+            under: Se informado, os registros sao o conteudo do container de filhos
+                   deste no e substituem apenas a sua subarvore; senao, o modelo inteiro
+        """
+        if under is None:
+            self._reset()
+            self._add_all(records)
+            return
+
+        under = text_link_id(under)
+        self._drop_descendants(under)
+        added = self._add_all(records)
+
+        record = self.nodes.get(under)
+        if record is not None and added:
+            record["expanded"] = True
+
+    def refresh(self, page, under: str = None) -> "TreeModel":
+        """
+        Rele a arvore da pagina (API sincrona) em uma chamada; com under, so a subarvore do no.
+        """
+        self.merge(page.evaluate(JS_HARVEST_TREE, text_link_id(under) if under else None), under)
+        return self
+
+    async def refresh_async(self, page, under: str = None) -> "TreeModel":
+        """
+        Rele a arvore da pagina (API assincrona) em uma chamada; com under, so a subarvore do no.
+        """
+        self.merge(await page.evaluate(JS_HARVEST_TREE, text_link_id(under) if under else None), under)
+        return self
+
+    @classmethod
+    def harvest(cls, page, under: str = None) -> "TreeModel":
+        """
+        Le a arvore inteira (ou a subarvore de under) da pagina (API sincrona) em uma chamada.
+        """
+        return cls().refresh(page, under)
+
+    @classmethod
+    async def harvest_async(cls, page, under: str = None) -> "TreeModel":
+        """
+        Le a arvore inteira (ou a subarvore de under) da pagina (API assincrona) em uma chamada.
+        """
+        return await cls().refresh_async(page, under)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node_id: str) -> bool:
+        return text_link_id(node_id) in self.nodes
+
+    def get(self, node_id: str) -> dict:
+        """Registro do no (ou None)."""
+        return self.nodes.get(text_link_id(node_id))
+
+    def children_of(self, node_id: str) -> list:
+        """Registros dos filhos diretos do no, na ordem de exibicao."""
+        return [self.nodes[child_id] for child_id in self.children.get(text_link_id(node_id), [])]
+
+    def roots(self) -> list:
+        """Registros dos nos de primeiro nivel (orgaos)."""
+        return self.children_of(None)
+
+    def find_by_text(self, text: str, parent_id: str = None) -> dict:
+        """
+        Primeiro no lido com o texto informado, opcionalmente restrito aos
+        filhos de parent_id. Consulta ao indice por texto.
+        """
+        parent_id = text_link_id(parent_id) if parent_id else None
+        for node_id in self.by_text.get(text, []):
+            record = self.nodes[node_id]
+            if parent_id is None or record.get("parentId") == parent_id:
+                return record
+        return None
+
+    def count_by_text(self, text: str) -> int:
+        """Quantos nos exibidos tem o texto informado (nomes podem se repetir)."""
+        return len(self.by_text.get(text, []))
+
+    def find_by_value_path(self, value_path: str) -> dict:
+        """No cujo caminho de valores (argumento de __doPostBack) eh o informado."""
+        node_id = self.by_value_path.get(value_path)
+        return self.nodes[node_id] if node_id else None
+
+
+# Separador usado para representar o caminho de um no (ex: "SMS > CAP 1 > CMS X")
+PATH_SEPARATOR = " > "
+
+
+def path_key(path) -> str:
+    """
+    Chave textual do caminho de um no a partir da lista de nomes desde a raiz.
+    """
+    return PATH_SEPARATOR.join(path)
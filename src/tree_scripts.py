@@ -0,0 +1,271 @@
+"""
+Trechos de JavaScript executados na pagina do SICI.
+
+Centralizados aqui para que o scraper sincrono (SiciSmsScraper) e o motor
+assincrono (AsyncSiciSmsScraper) usem exatamente a mesma logica de DOM.
+Todos sao funcoes JS prontas para page.evaluate(script, arg).
+"""
+
+# Clica no link do icone +/- que fica na mesma <tr> do link de texto
+JS_CLICK_EXPANDER = """
+    (nodeId) => {
+        let textLink = document.getElementById(nodeId);
+        if (!textLink) return false;
+
+        let tr = textLink.closest('tr');
+        if (!tr) return false;
+
+        let expandLinks = tr.querySelectorAll('a');
+        for (let link of expandLinks) {
+            let img = link.querySelector('img');
+            if (img && (img.alt.includes('Expand') || img.alt.includes('Collapse') || img.src.includes('plus') || img.src.includes('minus'))) {
+                link.click();
+                return true;
+            }
+        }
+        return false;
+    }
+"""
+
+# Verifica se o no tem icone de expandir/colapsar (ou seja, tem filhos)
+JS_HAS_EXPANDER = """
+    (nodeId) => {
+        let textLink = document.getElementById(nodeId);
+        if (!textLink) return false;
+
+        let tr = textLink.closest('tr');
+        if (!tr) return false;
+
+        let expandLinks = tr.querySelectorAll('a');
+        for (let link of expandLinks) {
+            let img = link.querySelector('img');
+            if (img && (img.alt.includes('Expand') || img.alt.includes('Collapse'))) {
+                return true;
+            }
+        }
+        return false;
+    }
+"""
+
+# Clica no link de texto (seleciona o no e carrega o painel de detalhes)
+JS_CLICK_NODE = """
+    (nodeId) => {
+        let el = document.getElementById(nodeId);
+        if (el) el.click();
+    }
+"""
+
+# Titulo do cabecalho da pagina
+JS_EXTRACT_TITLE = """
+    () => {
+        let h1 = document.querySelector('h1, h2, h3, [class*="titulo"], .header');
+        return h1 ? h1.innerText.trim() : null;
+    }
+"""
+
+# Linha do decreto de criacao/alteracao da unidade
+JS_EXTRACT_DECRETO = """
+    () => {
+        let text = document.body.innerText;
+        let match = text.match(/Decreto[^\\n]*/i);
+        return match ? match[0] : null;
+    }
+"""
+
+# Pares rotulo/valor do painel de detalhes:
+# - Titular/Cargo/Endereco/etc NAO estao em tabelas HTML, mas em DIVs com CSS
+# - Comunicacoes estao em tabelas de 2 colunas
+JS_EXTRACT_PAIRS = """
+    () => {
+        let allPairs = [];
+
+        // MÉTODO 1: Extrair de tabelas com 2 colunas (Comunicações)
+        let tables = document.querySelectorAll('table');
+        tables.forEach(table => {
+            let rows = Array.from(table.querySelectorAll('tr'));
+            rows.forEach(row => {
+                let cells = Array.from(row.querySelectorAll('td, th')).map(c => c.innerText.trim());
+
+                if (cells.length === 2 && cells[0] && cells[1]) {
+                    let label = cells[0];
+                    let value = cells[1];
+
+                    if (label.length > 0 && label.length < 100 && value.length > 0 && label !== value) {
+                        allPairs.push({label: label, value: value, method: 'table'});
+                    }
+                }
+            });
+        });
+
+        // MÉTODO 2: Extrair TODO o texto visível e procurar por padrões
+        let contentArea = document.querySelector('#ContentPlaceHolder1_cphConteudo_divConteudoUA, [id*="Conteudo"], .content, main');
+        if (!contentArea) {
+            contentArea = document.body;
+        }
+
+        let fullText = contentArea.innerText;
+        let lines = fullText.split('\\n').map(l => l.trim()).filter(l => l.length > 0);
+
+        // Padrões conhecidos: uma linha de rótulos seguida de uma linha de valores
+        //   Titular [TAB] Cargo               /  Nome [TAB] Secretário
+        //   Endereço [TAB] Número [TAB] Compl. /  Rua X [TAB] 455 [TAB] 7 Andar
+        //   Bairro [TAB] CEP                   /  Cidade Nova [TAB] 20211-110
+        for (let i = 0; i < lines.length - 1; i++) {
+            let line = lines[i];
+            let nextLine = lines[i + 1];
+
+            let isHeader = (line.includes('Titular') && line.includes('Cargo'))
+                || line.includes('Endereço') || line.includes('Endereco')
+                || (line.includes('Bairro') && line.includes('CEP'));
+            if (!isHeader) continue;
+
+            let labels = line.split(/\\s{2,}|\\t/).map(s => s.trim()).filter(s => s);
+            let values = nextLine.split(/\\s{2,}|\\t/).map(s => s.trim()).filter(s => s);
+
+            if (labels.length === values.length) {
+                for (let j = 0; j < labels.length; j++) {
+                    if (labels[j] && values[j] && labels[j] !== values[j]) {
+                        allPairs.push({label: labels[j], value: values[j], method: 'text-pattern'});
+                    }
+                }
+                i++; // Pular a linha de valores
+            }
+        }
+
+        return allPairs;
+    }
+"""
+
+# Seletor do painel de detalhes do no selecionado
+DETAIL_PANEL_SELECTOR = '#ContentPlaceHolder1_cphConteudo_divConteudoUA, [id*="Conteudo"], .content, main'
+
+# Funcao JS (declaracao) que calcula a assinatura de um elemento:
+# atributo style + tamanho e hash do innerHTML ('missing' se nao existe)
+JS_SIGNATURE_FN = """
+    function __rpaSignature(selector) {
+        let el = selector ? document.querySelector(selector) : null;
+        if (!el) return 'missing';
+        let html = el.innerHTML;
+        let hash = 0;
+        for (let i = 0; i < html.length; i++) {
+            hash = ((hash << 5) - hash + html.charCodeAt(i)) | 0;
+        }
+        return (el.getAttribute('style') || '') + '|' + html.length + '|' + hash;
+    }
+"""
+
+# Extracao completa do no selecionado em UMA chamada (titulo, decreto e pares).
+# Se o dropdown ainda nao esta em "Informacoes Gerais" (e allowSelect), troca a opcao,
+# marca o documento com o token e devolve {pending: true, before: assinatura do painel}
+# para o Python aguardar o postback (PostbackWaiter.wait_for_change) e chamar de novo.
+# Com withSnapshot, devolve tambem o HTML do <body> sem o ua_treeview (snapshot do painel
+# para a reextracao offline de panel_snapshots).
+JS_EXTRACT_NODE = """
+    ([panelSelector, token, allowSelect, withSnapshot]) => {
+        """ + JS_SIGNATURE_FN + """
+        let selected = null;
+        for (let select of document.querySelectorAll('select')) {
+            for (let option of select.querySelectorAll('option')) {
+                let text = option.innerText.trim();
+                if (text.includes('Informações Gerais') || text.includes('Informacoes Gerais')) {
+                    if (allowSelect && select.value !== option.value) {
+                        let before = __rpaSignature(panelSelector);
+                        window.__rpaPostbackToken = token;
+                        select.value = option.value;
+                        select.dispatchEvent(new Event('change', { bubbles: true }));
+                        return {pending: true, selected: text, before: before};
+                    }
+                    selected = text;
+                    break;
+                }
+            }
+            if (selected) break;
+        }
+
+        return {
+            pending: false,
+            selected: selected,
+            titulo: (""" + JS_EXTRACT_TITLE + """)(),
+            decreto: (""" + JS_EXTRACT_DECRETO + """)(),
+            pairs: (""" + JS_EXTRACT_PAIRS + """)(),
+            snapshot: withSnapshot ? (() => {
+                let body = document.body.cloneNode(true);
+                for (let tree of body.querySelectorAll('div[id*="ua_treeview"]')) tree.remove();
+                return body.outerHTML;
+            })() : null,
+        };
+    }
+"""
+
+# Varredura do ua_treeview expandido em UMA chamada.
+# Devolve uma lista plana, em ordem de documento, de
+# {id, text, parentId, depth, hasExpander, expanded, valuePath} para cada link de texto ...t{N}
+# (placeholders "0" e links sem texto sao ignorados, como em html_extract.list_children).
+# valuePath eh o caminho de valores do argumento de __doPostBack ('s' + caminho), estavel
+# entre postbacks. Com rootId, varre apenas o container de filhos desse no (atualizacao
+# incremental do TreeModel apos a expansao).
+JS_HARVEST_TREE = """
+    (rootId) => {
+        let prefix = 'ContentPlaceHolder1_ua_treeview';
+        let records = [];
+
+        let scope = document;
+        if (rootId) {
+            let rootMatch = rootId.match(/t(\\d+)i?$/);
+            scope = rootMatch ? document.getElementById(prefix + 'n' + rootMatch[1] + 'Nodes') : null;
+            if (!scope) return records;
+        }
+
+        for (let link of scope.querySelectorAll('a[id^="' + prefix + 't"]')) {
+            let match = link.id.match(/t(\\d+)$/);
+            if (!match) continue;  // ...t{N}i eh o link da imagem
+
+            let text = link.innerText.trim();
+            if (!text || text === '0') continue;
+
+            // Pai: container ...n{M}Nodes mais proximo; profundidade: quantos containers acima
+            let parentId = null;
+            let depth = 0;
+            for (let el = link.parentElement; el; el = el.parentElement) {
+                let nodesMatch = el.id ? el.id.match(/n(\\d+)Nodes$/) : null;
+                if (!nodesMatch) continue;
+                if (parentId === null) parentId = prefix + 't' + nodesMatch[1];
+                depth++;
+            }
+
+            // Icone +/- na mesma <tr> (mesmo criterio de JS_HAS_EXPANDER)
+            let hasExpander = false;
+            let collapseIcon = false;
+            let tr = link.closest('tr');
+            if (tr) {
+                for (let a of tr.querySelectorAll('a')) {
+                    let img = a.querySelector('img');
+                    if (img && (img.alt.includes('Expand') || img.alt.includes('Collapse'))) {
+                        hasExpander = true;
+                        collapseIcon = img.alt.includes('Collapse') || img.src.includes('minus');
+                        break;
+                    }
+                }
+            }
+
+            let container = document.getElementById(prefix + 'n' + match[1] + 'Nodes');
+            let expanded = collapseIcon
+                || (container !== null && window.getComputedStyle(container).display !== 'none');
+
+            // Argumento JS escapado dentro do href (ex: 'sSMS\\\\CAP 1')
+            let postback = (link.getAttribute('href') || '').match(/__doPostBack\\(\\s*'[^']*'\\s*,\\s*'[st]([^']*)'\\s*\\)/);
+            let valuePath = postback ? postback[1].replace(/\\\\\\\\/g, '\\\\') : null;
+
+            records.push({
+                id: link.id,
+                text: text,
+                parentId: parentId,
+                depth: depth,
+                hasExpander: hasExpander,
+                expanded: expanded,
+                valuePath: valuePath,
+            });
+        }
+        return records;
+    }
+"""
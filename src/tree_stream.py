@@ -0,0 +1,163 @@
+"""
+Saida hierarquica em streaming (NDJSON), gravada conforme os nos sao visitados.
+
+Cada no extraido vira imediatamente uma linha em TREE_STREAM_FILE:
+    {"caminho": ["SMS", "CAP 1"], "pai": "SMS", "profundidade": 1, "posicao": 0, "info": {...}}
+
+Ao final, data/sms_informacoes.json e data/resumo.json sao reconstruidos a
+partir do arquivo sem carregar as informacoes de todos os nos: a primeira
+passada guarda apenas o esqueleto (caminho -> posicao da linha no arquivo e
+filhos); a segunda escreve o JSON aninhado lendo as informacoes de cada no
+do disco no momento em que ele eh emitido. A ordem das linhas nao importa
+(nos pais gravados depois dos filhos, como SMS, motores concorrentes e ordens de
+coleta bfs/desatualizados): os filhos de cada no saem na ordem de exibicao pela
+"posicao" gravada; linhas sem posicao ficam na ordem de chegada, depois das demais.
+"""
+
+import json
+from pathlib import Path
+
+from .config import TREE_STREAM_FILE
+from .tree_model import path_key
+
+
+class TreeStreamWriter:
+    """
+    Grava uma linha NDJSON por no assim que ele eh extraido.
+    """
+
+    def __init__(self, stream_file: str = TREE_STREAM_FILE, append: bool = False):
+        """
+        Args:
+            stream_file: Arquivo .ndjson de saida
+            append: Se True, continua um arquivo existente (retomada de coleta)
+        """
+        self.stream_file = Path(stream_file)
+        self.stream_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.stream_file, "a" if append else "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, path: list, info: dict, position: int = None):
+        """
+        Grava o registro de um no.
+
+        Args:
+            path: Nomes dos nos desde a raiz ate o no
+            info: Informacoes do no
+            position: Posicao do no entre os irmaos, na ordem de exibicao (se conhecida)
+        """
+        record = {
+            "caminho": list(path),
+            "pai": path_key(path[:-1]) if len(path) > 1 else None,
+            "profundidade": len(path) - 1,
+        }
+        if position is not None:
+            record["posicao"] = position
+        record["info"] = info
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        """Fecha o arquivo."""
+        if not self._file.closed:
+            self._file.close()
+
+
+class _Skeleton:
+    """
+    Esqueleto da arvore lido do NDJSON: posicao da linha de cada no e filhos em ordem.
+    """
+
+    def __init__(self, stream_file: str):
+        self.stream_file = Path(stream_file)
+        self.offsets = {}
+        self.children = {}
+        self.names = {}
+        self.roots = []
+        self.positions = {}
+
+        with open(self.stream_file, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    record = json.loads(line)
+                    path = record["caminho"]
+                except (ValueError, KeyError):
+                    continue
+                self._add(path)
+                # Registro repetido (recoleta do mesmo no): vale o mais recente
+                self.offsets[path_key(path)] = offset
+                if record.get("posicao") is not None:
+                    self.positions[path_key(path)] = record["posicao"]
+
+        # Ordem de exibicao entre irmaos (sort estavel: sem posicao, ordem de chegada)
+        unknown = float("inf")
+        for key, children in self.children.items():
+            children.sort(key=lambda child: self.positions.get(child, unknown))
+
+    def _add(self, path: list):
+        """Registra o caminho e os ancestrais implicitos, preservando a ordem de chegada."""
+        for depth in range(len(path)):
+            key = path_key(path[:depth + 1])
+            if key in self.names:
+                continue
+            self.names[key] = path[depth]
+            self.children[key] = []
+            if depth == 0:
+                self.roots.append(key)
+            else:
+                self.children[path_key(path[:depth])].append(key)
+
+    def info(self, f, key: str) -> dict:
+        """Le do disco as informacoes do no (None se o no so apareceu como ancestral)."""
+        offset = self.offsets.get(key)
+        if offset is None:
+            return None
+        f.seek(offset)
+        return json.loads(f.readline())["info"]
+
+
+def _write_nested(out, skeleton: _Skeleton, keys: list, level: int, with_info: bool, source=None):
+    """
+    Escreve {nome: ...} com a mesma formatacao de json.dump(indent=4), um no por vez.
+    """
+    if not keys:
+        out.write("{}")
+        return
+
+    pad = " " * 4 * (level + 1)
+    out.write("{")
+    for i, key in enumerate(keys):
+        out.write(("," if i else "") + "\n" + pad + json.dumps(skeleton.names[key], ensure_ascii=False) + ": ")
+        if with_info:
+            info = json.dumps(skeleton.info(source, key), ensure_ascii=False, indent=4)
+            inner = pad + " " * 4
+            out.write("{\n" + inner + '"info": ' + info.replace("\n", "\n" + inner) + ",\n" + inner + '"filhos": ')
+            _write_nested(out, skeleton, skeleton.children[key], level + 2, with_info, source)
+            out.write("\n" + pad + "}")
+        else:
+            _write_nested(out, skeleton, skeleton.children[key], level + 1, with_info, source)
+    out.write("\n" + " " * 4 * level + "}")
+
+
+def rebuild_outputs(stream_file: str, data_file: str, resumo_file: str) -> int:
+    """
+    Reconstroi o JSON completo ({nome: {"info", "filhos"}}) e o resumo (so nomes)
+    a partir do NDJSON.
+
+    Returns:
+        int: Numero de nos na arvore
+    """
+    skeleton = _Skeleton(stream_file)
+
+    with open(stream_file, "rb") as source, open(data_file, "w", encoding="utf-8") as out:
+        _write_nested(out, skeleton, skeleton.roots, 0, True, source)
+
+    with open(resumo_file, "w", encoding="utf-8") as out:
+        _write_nested(out, skeleton, skeleton.roots, 0, False)
+
+    return len(skeleton.names)
@@ -0,0 +1,320 @@
+"""
+Indice SQLite das unidades coletadas, para consultas por campo.
+
+Carrega a estrutura geral/endereco/comunicacoes montada por
+SiciSmsScraper._categorize_info em tabelas indexadas:
+- units: uma linha por no (chave: o caminho desde a raiz, ja que nomes se repetem
+  entre ramos), com indices B-tree em nome, bairro, CEP, titular e cargo
+- comunicacoes: telefones/e-mails de cada unidade
+- units_fts: indice de texto (FTS5) sobre nome, titulo e titular
+
+O scraper atualiza o indice a cada no salvo, confirmando a transacao a cada
+NODE_STORE_BATCH unidades (uma queda perde no maximo um lote). Tambem eh possivel reconstrui-lo
+a partir dos dados ja gravados e consultar pela linha de comando:
+
+    python -m src.unit_index carregar
+    python -m src.unit_index bairro "Cidade Nova"
+    python -m src.unit_index cep 22775
+    python -m src.unit_index titular "Maria"
+    python -m src.unit_index busca "clinica familia"
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from .config import COLLECTED_DATA_DIR, NODE_STORE_BATCH, STORAGE_BACKEND, UNIT_INDEX_DB
+from .node_store import open_node_store
+from .tree_model import path_key
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS units (
+        id INTEGER PRIMARY KEY,
+        nome TEXT NOT NULL,
+        caminho TEXT NOT NULL UNIQUE,
+        titulo TEXT,
+        decreto TEXT,
+        titular TEXT,
+        cargo TEXT,
+        logradouro TEXT,
+        numero TEXT,
+        complemento TEXT,
+        bairro TEXT,
+        cep TEXT,
+        cep_digitos TEXT,
+        cidade TEXT,
+        estado TEXT,
+        geral TEXT,
+        atualizado_em TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_units_nome ON units (nome);
+    CREATE INDEX IF NOT EXISTS idx_units_bairro ON units (bairro COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_units_cep ON units (cep_digitos);
+    CREATE INDEX IF NOT EXISTS idx_units_titular ON units (titular COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_units_cargo ON units (cargo COLLATE NOCASE);
+
+    CREATE TABLE IF NOT EXISTS comunicacoes (
+        unit_id INTEGER NOT NULL REFERENCES units (id) ON DELETE CASCADE,
+        tipo TEXT,
+        valor TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_comunicacoes_unit ON comunicacoes (unit_id);
+"""
+
+_FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS units_fts USING fts5 (
+        nome, titulo, titular, content='units', content_rowid='id'
+    );
+"""
+
+_RESULT_COLUMNS = "nome, caminho, titulo, titular, cargo, logradouro, numero, complemento, bairro, cep"
+
+# Versao do esquema (PRAGMA user_version); a 1 troca a chave de nome para caminho
+_SCHEMA_VERSION = 1
+
+
+class UnitIndex:
+    """
+    Banco SQLite com as unidades coletadas, indexado pelos campos mais consultados.
+    """
+
+    def __init__(self, db_file: str = UNIT_INDEX_DB, batch_size: int = NODE_STORE_BATCH):
+        """
+        Args:
+            db_file: Arquivo do banco SQLite (criado se nao existir)
+            batch_size: Unidades atualizadas entre confirmacoes da transacao
+        """
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        self.db_file = db_file
+        self.batch_size = max(1, batch_size)
+        self._uncommitted = 0
+        self.conn = sqlite3.connect(db_file)
+        self.conn.row_factory = sqlite3.Row
+        self._migrate()
+        self.conn.executescript(_SCHEMA)
+        try:
+            self.conn.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite compilado sem FTS5: busca por nome cai para LIKE
+            self.has_fts = False
+        self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def _migrate(self):
+        """
+        Banco de uma versao anterior (unidades unicas por nome): as tabelas sao
+        recriadas; os dados voltam com a coleta ou com o comando carregar.
+        """
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        exists = self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'units'").fetchone()
+        if version >= _SCHEMA_VERSION or not exists:
+            return
+        self.conn.executescript("""
+            DROP TABLE IF EXISTS units_fts;
+            DROP TABLE IF EXISTS comunicacoes;
+            DROP TABLE IF EXISTS units;
+        """)
+        print(f"[!] {self.db_file}: indice no formato antigo (por nome) recriado por caminho; "
+              f"para recarregar os dados ja coletados: python -m src.unit_index carregar")
+
+    def upsert(self, node_name: str, info: dict, tree_path: list = None):
+        """
+        Insere ou atualiza a unidade (identificada pelo caminho; sem ele, pelo nome)
+        a partir do dicionario de _build_node_info. A transacao eh confirmada a cada
+        batch_size unidades e em commit().
+        """
+        info = info or {}
+        geral = dict(info.get("geral") or {})
+        endereco = info.get("endereco") or {}
+        cep = endereco.get("cep")
+
+        row = {
+            "nome": node_name,
+            "caminho": json.dumps(list(tree_path) if tree_path else [node_name], ensure_ascii=False),
+            "titulo": info.get("titulo"),
+            "decreto": info.get("decreto"),
+            "titular": geral.pop("titular", None),
+            "cargo": geral.pop("cargo", None),
+            "logradouro": endereco.get("logradouro"),
+            "numero": endereco.get("numero"),
+            "complemento": endereco.get("complemento"),
+            "bairro": endereco.get("bairro"),
+            "cep": cep,
+            "cep_digitos": re.sub(r"\D", "", cep) if cep else None,
+            "cidade": endereco.get("cidade"),
+            "estado": endereco.get("estado"),
+            "geral": json.dumps(geral, ensure_ascii=False) if geral else None,
+            "atualizado_em": info.get("timestamp") or datetime.now().isoformat(),
+        }
+
+        cur = self.conn.cursor()
+        existing = cur.execute("SELECT * FROM units WHERE caminho = ?", (row["caminho"],)).fetchone()
+        if existing is not None:
+            unit_id = existing["id"]
+            if self.has_fts:
+                # Tabela FTS com conteudo externo: remover os termos antigos antes de atualizar
+                cur.execute(
+                    "INSERT INTO units_fts (units_fts, rowid, nome, titulo, titular) VALUES ('delete', ?, ?, ?, ?)",
+                    (unit_id, existing["nome"], existing["titulo"], existing["titular"]),
+                )
+            assignments = ", ".join(f"{column} = :{column}" for column in row)
+            cur.execute(f"UPDATE units SET {assignments} WHERE id = :id", dict(row, id=unit_id))
+            cur.execute("DELETE FROM comunicacoes WHERE unit_id = ?", (unit_id,))
+        else:
+            columns = ", ".join(row)
+            placeholders = ", ".join(f":{column}" for column in row)
+            cur.execute(f"INSERT INTO units ({columns}) VALUES ({placeholders})", row)
+            unit_id = cur.lastrowid
+
+        if self.has_fts:
+            cur.execute(
+                "INSERT INTO units_fts (rowid, nome, titulo, titular) VALUES (?, ?, ?, ?)",
+                (unit_id, row["nome"], row["titulo"], row["titular"]),
+            )
+        cur.executemany(
+            "INSERT INTO comunicacoes (unit_id, tipo, valor) VALUES (?, ?, ?)",
+            [(unit_id, c.get("tipo"), c.get("valor")) for c in info.get("comunicacoes") or []],
+        )
+
+        self._uncommitted += 1
+        if self._uncommitted >= self.batch_size:
+            self.commit()
+
+    def commit(self):
+        """Confirma as atualizacoes pendentes."""
+        self.conn.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        """Confirma e fecha o banco."""
+        self.conn.commit()
+        self.conn.close()
+
+    def _query(self, where: str, params: tuple) -> list:
+        rows = self.conn.execute(f"SELECT {_RESULT_COLUMNS} FROM units WHERE {where} ORDER BY nome, caminho", params)
+        return [dict(row) for row in rows]
+
+    def by_bairro(self, bairro: str) -> list:
+        """Unidades de um bairro (sem diferenciar maiusculas)."""
+        return self._query("bairro = ? COLLATE NOCASE", (bairro,))
+
+    def by_cep_prefix(self, prefix: str) -> list:
+        """Unidades cujo CEP comeca com o prefixo (ex: "22775" ou "22775-0")."""
+        digits = re.sub(r"\D", "", prefix)
+        if not digits:
+            return []
+        # Intervalo [prefixo, prefixo seguinte) usa o indice B-tree
+        upper = digits[:-1] + chr(ord(digits[-1]) + 1)
+        return self._query("cep_digitos >= ? AND cep_digitos < ?", (digits, upper))
+
+    def by_titular(self, titular: str) -> list:
+        """Unidades cujo titular eh exatamente o nome informado (sem diferenciar maiusculas)."""
+        return self._query("titular = ? COLLATE NOCASE", (titular,))
+
+    def by_cargo(self, cargo: str) -> list:
+        """Unidades cujo cargo do titular eh o informado (sem diferenciar maiusculas)."""
+        return self._query("cargo = ? COLLATE NOCASE", (cargo,))
+
+    def search(self, text: str) -> list:
+        """
+        Busca textual em nome, titulo e titular (FTS5; cada palavra pode ser prefixo).
+        """
+        words = re.findall(r"\w+", text)
+        if not words:
+            return []
+        if not self.has_fts:
+            where = " AND ".join("(nome LIKE ? OR titulo LIKE ? OR titular LIKE ?)" for _ in words)
+            params = tuple(p for w in words for p in (f"%{w}%",) * 3)
+            return self._query(where, params)
+
+        match = " ".join(f'"{w}"*' for w in words)
+        return self._query("id IN (SELECT rowid FROM units_fts WHERE units_fts MATCH ?)", (match,))
+
+    def comunicacoes(self, node_name: str) -> list:
+        """Telefones/e-mails das unidades com o nome informado."""
+        rows = self.conn.execute(
+            "SELECT c.tipo, c.valor FROM comunicacoes c JOIN units u ON u.id = c.unit_id WHERE u.nome = ?",
+            (node_name,),
+        )
+        return [dict(row) for row in rows]
+
+
+def load_collected(index: UnitIndex, store_file: str = None, data_dir: str = COLLECTED_DATA_DIR) -> int:
+    """
+    Reconstroi o indice a partir dos dados ja coletados: o arquivo unico do
+    STORAGE_BACKEND (jsonl ou interned, se existir) ou os arquivos
+    collected_data/<nome>/<nome>.json.
+
+    Returns:
+        int: Numero de unidades carregadas
+    """
+    count = 0
+    store = open_node_store("jsonl" if STORAGE_BACKEND == "dirs" else STORAGE_BACKEND, store_file)
+    if store.store_file.exists():
+        for record in store.latest().values():
+            index.upsert(record["nome"], record["dados"], record.get("caminho"))
+            count += 1
+    else:
+        for json_file in Path(data_dir).glob("*/*.json"):
+            if json_file.stem != json_file.parent.name:
+                continue
+            try:
+                with open(json_file, "r", encoding="utf-8") as f:
+                    index.upsert(json_file.stem, json.load(f))
+                count += 1
+            except Exception as e:
+                print(f"[!] Ignorando {json_file}: {e}")
+    index.commit()
+    return count
+
+
+def main():
+    """
+    Linha de comando para carregar e consultar o indice.
+    """
+    parser = argparse.ArgumentParser(description="Consultas sobre as unidades coletadas do SICI")
+    parser.add_argument("comando", choices=["carregar", "bairro", "cep", "titular", "cargo", "busca"])
+    parser.add_argument("valor", nargs="?", help="Valor procurado")
+    parser.add_argument("--db", default=UNIT_INDEX_DB, help="Arquivo do banco SQLite")
+    parser.add_argument("--json", action="store_true", help="Saida em JSON")
+    args = parser.parse_args()
+
+    index = UnitIndex(args.db)
+    try:
+        if args.comando == "carregar":
+            print(f"[OK] {load_collected(index)} unidade(s) carregada(s) em {args.db}")
+            return
+
+        if not args.valor:
+            parser.error(f"o comando '{args.comando}' precisa de um valor")
+
+        queries = {
+            "bairro": index.by_bairro,
+            "cep": index.by_cep_prefix,
+            "titular": index.by_titular,
+            "cargo": index.by_cargo,
+            "busca": index.search,
+        }
+        results = queries[args.comando](args.valor)
+
+        if args.json:
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+            return
+        for unit in results:
+            endereco = ", ".join(p for p in (unit["logradouro"], unit["numero"], unit["bairro"], unit["cep"]) if p)
+            print(f"{unit['nome']}  ({path_key(json.loads(unit['caminho']))})")
+            if unit["titular"]:
+                print(f"   Titular: {unit['titular']}" + (f" ({unit['cargo']})" if unit["cargo"] else ""))
+            if endereco:
+                print(f"   Endereco: {endereco}")
+        print(f"[*] {len(results)} unidade(s)")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
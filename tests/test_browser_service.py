@@ -0,0 +1,60 @@
+from src.browser_service import StageTimer, claim_warm_page
+from src.sici_scraper import SiciSmsScraper
+
+SYNTHETIC = "http://127.0.0.1:8765/PAG/principal.aspx"
+
+
+class _Page:
+    def __init__(self, url: str, warm: bool = True):
+        self.url = url
+        self.warm = warm
+        self.visited = []
+
+    def evaluate(self, script, *args):
+        # JS_CLAIM_WARM: pre-aquecida e livre; a primeira chamada toma a pagina
+        claimed, self.warm = self.warm, False
+        return claimed
+
+    def goto(self, url, **kwargs):
+        self.visited.append(url)
+        self.url = url
+
+    def wait_for_selector(self, selector, **kwargs):
+        return True
+
+
+class _Context:
+    def __init__(self, *pages):
+        self.pages = list(pages)
+
+
+class _Browser:
+    def __init__(self, *contexts):
+        self.contexts = list(contexts)
+
+
+def test_claim_takes_only_a_free_warm_page_at_the_requested_url():
+    real = _Page("https://sici.rio.rj.gov.br/PAG/principal.aspx")
+    taken = _Page(SYNTHETIC, warm=False)
+    free = _Page(SYNTHETIC)
+    browser = _Browser(_Context(real), _Context(taken), _Context(free))
+
+    assert claim_warm_page(browser, SYNTHETIC) is free
+    assert claim_warm_page(browser, SYNTHETIC) is None
+    assert real.warm
+
+
+def test_open_site_navigates_when_the_warm_page_is_elsewhere(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scraper = SiciSmsScraper(base_url=SYNTHETIC)
+    scraper.startup_timer = StageTimer("teste")
+    scraper.warm_page = True
+
+    scraper.page = _Page("https://sici.rio.rj.gov.br/PAG/principal.aspx")
+    scraper.open_site()
+    assert scraper.page.visited == [SYNTHETIC]
+
+    scraper.page = _Page(SYNTHETIC)
+    scraper.open_site()
+    assert scraper.page.visited == []
+    scraper.close_storage()
@@ -0,0 +1,50 @@
+import asyncio
+
+from src.concurrency_control import AdaptiveLimiter
+
+
+async def _postback(limiter, ok=True, skip=False, seconds=0.0):
+    async with limiter.slot() as outcome:
+        await asyncio.sleep(seconds)
+        outcome["ok"] = ok
+        outcome["skip"] = skip
+
+
+def test_limit_grows_when_saturated_and_halves_on_timeout():
+    async def scenario():
+        limiter = AdaptiveLimiter(max_limit=4, initial=2, window=4, tolerance=100.0, backoff=0.5)
+        await asyncio.gather(*(_postback(limiter, seconds=0.01) for _ in range(4)))
+        assert limiter.permits == 3
+        await _postback(limiter, ok=False)
+        assert limiter.permits == 1
+        assert [row["decisao"] for row in limiter.history] == ["aumenta", "reduz (erro)"]
+
+    asyncio.run(scenario())
+
+
+def test_slots_without_postback_are_not_sampled():
+    async def scenario():
+        limiter = AdaptiveLimiter(max_limit=4, initial=2, window=2)
+        for _ in range(5):
+            await _postback(limiter, skip=True)
+        assert limiter.history == []
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_in_flight_never_exceeds_limit():
+    async def scenario():
+        limiter = AdaptiveLimiter(max_limit=8, initial=2, window=1000)
+        peak = 0
+
+        async def tracked():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.005)
+
+        await asyncio.gather(*(tracked() for _ in range(10)))
+        assert peak == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,67 @@
+import pytest
+
+from src.crawl_frontier import Frontier, SubtreeTracker
+
+# SMS > A > (A1, A2), SMS > B > B1, na ordem de exibicao
+TREE = {
+    ("SMS",): ["A", "B"],
+    ("SMS", "A"): ["A1", "A2"],
+    ("SMS", "B"): ["B1"],
+}
+
+
+def _crawl(frontier: Frontier) -> list:
+    """Visita a arvore pela fronteira como os motores: cada no devolve seus filhos."""
+    for child in TREE[("SMS",)]:
+        frontier.push({"caminho": ["SMS", child]})
+    visited = []
+    while frontier:
+        path = frontier.pop()["caminho"]
+        visited.append(" > ".join(path[1:]))
+        for child in TREE.get(tuple(path), []):
+            frontier.push({"caminho": path + [child]})
+    return visited
+
+
+def test_dfs_follows_display_order_one_subtree_at_a_time():
+    assert _crawl(Frontier("dfs")) == ["A", "A > A1", "A > A2", "B", "B > B1"]
+
+
+def test_bfs_visits_a_whole_level_first():
+    assert _crawl(Frontier("bfs")) == ["A", "B", "A > A1", "A > A2", "B > B1"]
+
+
+def test_stale_nodes_first_and_never_visited_before_all():
+    staleness = {"SMS > B": 10.0, "SMS > A > A2": 5.0, "SMS > B > B1": float("inf")}
+    frontier = Frontier("desatualizados", staleness=lambda path: staleness.get(" > ".join(path), 0.0))
+    assert _crawl(frontier) == ["B", "B > B1", "A", "A > A2", "A > A1"]
+
+
+def test_invalid_order_is_rejected():
+    with pytest.raises(ValueError):
+        Frontier("aleatoria")
+
+
+def test_subtree_completes_after_all_descendants_whatever_the_order():
+    done = []
+    tracker = SubtreeTracker(on_complete=lambda path: done.append(" > ".join(path)))
+    tracker.expanded(["SMS"], 2)
+    tracker.expanded(["SMS", "A"], 2)
+    tracker.expanded(["SMS", "B"], 1)
+
+    tracker.expanded(["SMS", "B", "B1"], 0)
+    tracker.expanded(["SMS", "A", "A2"], 0)
+    assert done == ["SMS > B > B1", "SMS > B", "SMS > A > A2"]
+
+    tracker.expanded(["SMS", "A", "A1"], 0)
+    assert done[-3:] == ["SMS > A > A1", "SMS > A", "SMS"]
+
+
+def test_failed_descendant_keeps_ancestors_incomplete():
+    done = []
+    tracker = SubtreeTracker(on_complete=lambda path: done.append(" > ".join(path)))
+    tracker.expanded(["SMS"], 1)
+    tracker.expanded(["SMS", "A"], 2)
+    tracker.finished(["SMS", "A", "A1"], False)
+    tracker.expanded(["SMS", "A", "A2"], 0)
+    assert done == ["SMS > A > A2"]
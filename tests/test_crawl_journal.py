@@ -0,0 +1,46 @@
+from src.crawl_journal import CrawlJournal
+
+
+def test_resume_reads_nodes_and_subtrees_of_the_interrupted_run(tmp_path):
+    journal_file = tmp_path / "diario.jsonl"
+    journal = CrawlJournal(journal_file)
+    journal.record_node(["SMS"], {"titulo": "SMS"})
+    journal.record_node(["SMS", "CAP 1"], {"titulo": "CAP 1"})
+    journal.record_node(["SMS", "CAP 2", "CAP 1"], None)
+    journal.record_subtree(["SMS", "CAP 1"])
+
+    resumed = CrawlJournal(journal_file)
+    assert len(resumed) == 3
+    assert resumed.is_node_done(["SMS", "CAP 1"])
+    assert resumed.is_node_done(["SMS", "CAP 2", "CAP 1"])
+    assert not resumed.is_node_done(["SMS", "CAP 2"])
+    assert resumed.is_subtree_done(["SMS", "CAP 1"])
+    assert not resumed.is_subtree_done(["SMS"])
+    assert resumed.node_info(["SMS", "CAP 1"]) == {"titulo": "CAP 1"}
+    assert resumed.node_info(["SMS", "CAP 2", "CAP 1"]) is None
+    assert [path for path, _ in resumed.completed_nodes()] == [["SMS"], ["SMS", "CAP 1"], ["SMS", "CAP 2", "CAP 1"]]
+
+
+def test_truncated_last_line_is_ignored_and_next_entry_starts_a_new_line(tmp_path):
+    journal_file = tmp_path / "diario.jsonl"
+    journal = CrawlJournal(journal_file)
+    journal.record_node(["SMS"], {"titulo": "SMS"})
+    with open(journal_file, "a", encoding="utf-8") as f:
+        f.write('{"tipo": "no", "caminho": ["SMS", "CA')
+
+    resumed = CrawlJournal(journal_file)
+    assert len(resumed) == 1
+    resumed.record_node(["SMS", "CAP 1"], {"titulo": "CAP 1"})
+
+    again = CrawlJournal(journal_file)
+    assert len(again) == 2
+    assert again.is_node_done(["SMS", "CAP 1"])
+
+
+def test_clear_removes_the_journal(tmp_path):
+    journal_file = tmp_path / "diario.jsonl"
+    journal = CrawlJournal(journal_file)
+    journal.record_node(["SMS"], {})
+    journal.clear()
+    assert not journal_file.exists()
+    assert len(CrawlJournal(journal_file)) == 0
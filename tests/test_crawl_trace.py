@@ -0,0 +1,33 @@
+import pytest
+
+from src.crawl_trace import CrawlTracer, _percentile
+
+
+def test_percentile_of_known_sample():
+    values = [float(v) for v in range(101)]
+    assert _percentile(values, 50) == 50.0
+    assert _percentile(values, 95) == 95.0
+    assert _percentile(values, 99) == 99.0
+    assert _percentile(values, 100) == 100.0
+
+
+def test_percentile_interpolates_between_samples():
+    values = [10.0, 20.0, 30.0, 40.0]
+    assert _percentile(values, 50) == pytest.approx(25.0)
+    assert _percentile(values, 95) == pytest.approx(38.5)
+    assert _percentile(values, 99) == pytest.approx(39.7)
+    assert _percentile([7.0], 99) == 7.0
+    assert _percentile([], 50) == 0.0
+
+
+def test_summary_reports_percentiles_per_phase():
+    tracer = CrawlTracer()
+    # Spans sinteticos (fase, caminho, inicio, duracao em s, tid, args)
+    tracer.spans = [("clique", ("SMS",), 0.0, v / 1000, 1, {}) for v in reversed(range(101))]
+    tracer.spans.append(("gravacao", ("SMS",), 0.0, 0.002, 1, {}))
+
+    rows = {row["fase"]: row for row in tracer.summary()}
+    assert rows["clique"]["contagem"] == 101
+    assert (rows["clique"]["p50_ms"], rows["clique"]["p95_ms"], rows["clique"]["p99_ms"]) == (50.0, 95.0, 99.0)
+    assert rows["clique"]["max_ms"] == 100.0
+    assert rows["gravacao"]["p99_ms"] == 2.0
@@ -0,0 +1,91 @@
+import pytest
+
+from src.html_extract import parse_html, strip_tree
+from src.http_crawler import HttpPostbackCrawler
+from src.synthetic_sici import SyntheticSiciServer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    # Diario, armazenamento e saidas do crawler ficam na pasta temporaria
+    monkeypatch.chdir(tmp_path)
+    with SyntheticSiciServer(num_nodes=40, depth=3, fanout=4) as server:
+        yield server
+
+
+def _names(tree: dict) -> list:
+    names = []
+    for name, node in tree.items():
+        names.append(name)
+        names.extend(_names(node["filhos"]))
+    return names
+
+
+def test_crawls_every_sms_node_of_the_synthetic_tree(server):
+    with HttpPostbackCrawler(base_url=server.url, record_dir=None) as crawler:
+        # Sem agenda de recoleta: so o motor sincrono a avanca
+        assert crawler.scheduler is None
+        crawler.open_site()
+        assert crawler.expand_all_nodes()
+
+    names = _names(crawler.collected_data)
+    assert len(names) == server.tree.sms_size
+    assert len(server.selected_nodes) == server.tree.sms_size
+    assert crawler.collected_data["SMS"]["info"]["titulo"] == "Secretaria Municipal de Saude"
+    # Selecao + dropdown por no, mais as expansoes: nenhum postback de dropdown a mais
+    assert server.stats["postbacks"] < 2.5 * server.tree.sms_size
+
+
+def test_crawls_the_configured_root(server):
+    with HttpPostbackCrawler(base_url=server.url, record_dir=None, root_text="CVL") as crawler:
+        crawler.open_site()
+        assert crawler.expand_all_nodes()
+
+    assert list(crawler.collected_data) == ["CVL"]
+    assert list(crawler.collected_data["CVL"]["filhos"]) == ["CVL 1", "CVL 2"]
+    assert len(server.selected_nodes) == 3
+
+
+def test_failed_node_makes_the_crawl_incomplete(server):
+    with HttpPostbackCrawler(base_url=server.url, record_dir=None, root_text="CVL") as crawler:
+        extract = crawler._extract_node_info
+
+        def failing_extract(tree_path=None):
+            if tree_path == ["CVL", "CVL 1"]:
+                raise RuntimeError("painel vazio")
+            return extract(tree_path)
+
+        crawler._extract_node_info = failing_extract
+        crawler.open_site()
+        assert not crawler.expand_all_nodes()
+
+    filhos = crawler.collected_data["CVL"]["filhos"]
+    assert filhos["CVL 1"] == {"erro": "painel vazio"}
+    assert filhos["CVL 2"]["info"]["titulo"]
+
+
+@pytest.mark.parametrize("selected", ["", ' selected="selected"'])
+def test_no_dropdown_postback_when_the_option_is_already_current(tmp_path, monkeypatch, selected):
+    monkeypatch.chdir(tmp_path)
+    crawler = HttpPostbackCrawler(record_dir=None)
+    crawler.snapshots = None
+    # Sem selected, a primeira opcao eh a atual (como select.value no navegador)
+    crawler.soup = parse_html(
+        f'<html><body><form><select name="ddl"><option value="geral"{selected}>Informações Gerais</option>'
+        '<option value="estrutura">Estrutura</option></select>'
+        '<div id="ContentPlaceHolder1_cphConteudo_divConteudoUA"><h2>Unidade</h2></div></form></body></html>'
+    )
+    postbacks = []
+    crawler._postback = lambda *args, **kwargs: postbacks.append(args)
+
+    crawler._extract_node_info()
+    assert postbacks == []
+
+
+def test_strip_tree_keeps_only_the_tree_tags():
+    html = (
+        '<form><div id="ContentPlaceHolder1_ua_treeview"><div id="ContentPlaceHolder1_ua_treeviewn0Nodes">'
+        '<div>no</div></div></div><div id="painel">dados</div></form>'
+    )
+    assert strip_tree(html) == '<form><div id="ContentPlaceHolder1_ua_treeview"></div><div id="painel">dados</div></form>'
+    assert strip_tree("<form></form>") is None
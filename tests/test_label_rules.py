@@ -0,0 +1,77 @@
+import itertools
+
+import pytest
+
+from src.label_rules import LabelClassifier, build_node_info
+
+
+def _reference(rules: list, label: str) -> tuple:
+    """Avaliacao direta das regras, como a antiga cadeia de if/elif."""
+    key = label.lower().strip()
+    for rule in rules:
+        if any(x in key for x in rule.get("exceto", [])):
+            continue
+        if key in rule.get("igual", []) or any(x in key for x in rule.get("contem", [])):
+            return rule["categoria"], rule.get("campo")
+    return None, None
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return LabelClassifier()
+
+
+def _labels(rules: list) -> list:
+    words = sorted({word for rule in rules for key in ("igual", "contem", "exceto") for word in rule.get(key, [])})
+    labels = list(words)
+    labels += [f"{a} {b}" for a, b in itertools.permutations(words, 2)]
+    labels += [f"{word}x" for word in words] + [f"x{word}" for word in words]
+    labels += ["Telefone corporativo", "E-mail corporativo", "Fax/Telefone", "  CEP  ", "Nº", "Horario", "Observacoes", "no"]
+    return labels
+
+
+def test_compiled_rules_match_the_rule_by_rule_evaluation(classifier):
+    labels = _labels(classifier.rules)
+    assert len(labels) > 1000
+    for label in labels:
+        assert classifier.classify(label) == _reference(classifier.rules, label), label
+
+
+def test_known_labels(classifier):
+    assert classifier.classify("Titular") == ("geral", "titular")
+    assert classifier.classify("Nome do cargo") == ("geral", "titular")
+    assert classifier.classify("Endereço") == ("endereco", "logradouro")
+    assert classifier.classify("Número") == ("endereco", "numero")
+    assert classifier.classify("Numero do processo") == (None, None)
+    assert classifier.classify("Telefone corporativo") == ("comunicacoes", None)
+    assert classifier.classify("E-mail corporativo") == ("comunicacoes", None)
+    assert classifier.classify("Horario") == (None, None)
+
+
+def test_decisions_are_memoized():
+    classifier = LabelClassifier()
+    classifier.classify("Bairro")
+    classifier.classify(" bairro ")
+    assert classifier.hits == 1
+    assert list(classifier.cache) == ["bairro"]
+
+
+def test_build_node_info_sections_and_duplicates(classifier):
+    pairs = [
+        {"label": "Titular", "value": "Maria"},
+        {"label": "Cargo", "value": "Diretora"},
+        {"label": "Bairro", "value": "Centro"},
+        {"label": "Telefone corporativo", "value": "2222-0000"},
+        {"label": "Telefone", "value": " 2222-0000 "},
+        {"label": "Horario", "value": "8h as 17h"},
+        {"label": "Obs", "value": "-"},
+    ]
+    info = build_node_info("Unidade", None, pairs, classifier, timestamp="2024-01-01T00:00:00")
+    assert info == {
+        "titulo": "Unidade",
+        "decreto": None,
+        "geral": {"titular": "Maria", "cargo": "Diretora", "Horario": "8h as 17h"},
+        "endereco": {"bairro": "Centro"},
+        "comunicacoes": [{"tipo": "Telefone corporativo", "valor": "2222-0000"}],
+        "timestamp": "2024-01-01T00:00:00",
+    }
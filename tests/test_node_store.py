@@ -0,0 +1,69 @@
+import pytest
+
+from src.node_store import InternedNodeStore, JsonlNodeStore, export_directory_layout
+
+
+def _info(bairro):
+    return {"titulo": "Unidade", "endereco": {"bairro": bairro, "cidade": "Rio de Janeiro"}}
+
+
+@pytest.fixture(params=[JsonlNodeStore, InternedNodeStore], ids=["jsonl", "interned"])
+def store_class(request):
+    return request.param
+
+
+def test_same_name_in_different_branches_kept_apart(tmp_path, store_class):
+    store = store_class(tmp_path / "nos", batch_size=2)
+    store.put("DIV 1", _info("Centro"), ["SMS", "CAP 1", "DIV 1"])
+    store.put("DIV 1", _info("Bangu"), ["SMS", "CAP 2", "DIV 1"])
+    store.close()
+
+    reopened = store_class(tmp_path / "nos")
+    assert reopened.get(["SMS", "CAP 1", "DIV 1"])["endereco"]["bairro"] == "Centro"
+    assert reopened.get(["SMS", "CAP 2", "DIV 1"])["endereco"]["bairro"] == "Bangu"
+    assert reopened.get("SMS > CAP 2 > DIV 1")["endereco"]["bairro"] == "Bangu"
+    assert len(reopened.latest()) == 2
+
+
+def test_latest_record_of_a_path_wins_and_compact_keeps_one_per_path(tmp_path, store_class):
+    store = store_class(tmp_path / "nos", batch_size=1)
+    store.put("DIV 1", _info("Centro"), ["SMS", "CAP 1", "DIV 1"])
+    store.put("DIV 1", _info("Bangu"), ["SMS", "CAP 2", "DIV 1"])
+    store.put("DIV 1", _info("Tijuca"), ["SMS", "CAP 1", "DIV 1"])
+    store.close()
+
+    assert store_class(tmp_path / "nos").compact() == 2
+    compacted = store_class(tmp_path / "nos")
+    assert compacted.get(["SMS", "CAP 1", "DIV 1"])["endereco"]["bairro"] == "Tijuca"
+    assert compacted.get(["SMS", "CAP 2", "DIV 1"])["endereco"]["bairro"] == "Bangu"
+
+
+def test_records_without_path_are_keyed_by_name(tmp_path, store_class):
+    store = store_class(tmp_path / "nos")
+    store.put("SMS", _info("Cidade Nova"))
+    store.close()
+    assert store_class(tmp_path / "nos").get(["SMS"])["endereco"]["bairro"] == "Cidade Nova"
+
+
+def test_interned_truncated_tail_is_discarded(tmp_path):
+    store = InternedNodeStore(tmp_path / "nos", batch_size=1)
+    store.put("CAP 1", _info("Centro"), ["SMS", "CAP 1"])
+    store.close()
+    with open(tmp_path / "nos", "ab") as f:
+        f.write(b"\x00\x00\x01\x00incompleto")
+
+    store = InternedNodeStore(tmp_path / "nos", batch_size=1)
+    store.put("CAP 2", _info("Bangu"), ["SMS", "CAP 2"])
+    store.close()
+
+    reopened = InternedNodeStore(tmp_path / "nos")
+    assert reopened.get(["SMS", "CAP 1"])["endereco"]["bairro"] == "Centro"
+    assert reopened.get(["SMS", "CAP 2"])["endereco"]["cidade"] == "Rio de Janeiro"
+
+
+def test_export_directory_layout_uses_node_names(tmp_path):
+    store = JsonlNodeStore(tmp_path / "nos.jsonl")
+    store.put("CAP 1", _info("Centro"), ["SMS", "CAP 1"])
+    store.close()
+    assert export_directory_layout(store, tmp_path / "saida") == 1
+    assert (tmp_path / "saida" / "CAP 1" / "CAP 1.json").exists()
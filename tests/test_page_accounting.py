@@ -0,0 +1,93 @@
+import asyncio
+
+from src.page_accounting import OUTSIDE_NODES, CallAccountant
+
+
+class _Handle:
+    def __init__(self, text: str):
+        self.text = text
+
+    def as_element(self):
+        return self
+
+    def text_content(self):
+        return self.text
+
+
+class _Page:
+    def __init__(self):
+        self.url = "https://sici.rio.rj.gov.br/PAG/principal.aspx"
+
+    def goto(self, url):
+        self.url = url
+
+    def evaluate(self, script, arg=None):
+        return {"ok": True}
+
+    def query_selector_all(self, selector):
+        return [_Handle("CAP 1"), _Handle("CAP 2")]
+
+    def query_selector(self, selector):
+        return _Handle("SMS")
+
+    def on(self, event, handler):
+        return None
+
+
+class _AsyncPage(_Page):
+    async def evaluate(self, script, arg=None):
+        return {"ok": True}
+
+
+def test_calls_are_counted_per_type_and_per_node():
+    accountant = CallAccountant(max_calls_per_node=2)
+    page = accountant.wrap(_Page())
+
+    accountant.set_node(None)
+    page.evaluate("() => 1")
+    accountant.set_node("SMS")
+    page.evaluate("() => 1", "arg")
+    for handle in page.query_selector_all("a"):
+        handle.text_content()
+    accountant.set_node("SMS > CAP 1")
+    page.query_selector("a").text_content()
+    page.on("response", print)
+
+    assert accountant.total_calls() == 7
+    assert {call_type: stats[0] for call_type, stats in accountant.by_type.items()} == {
+        "evaluate": 2, "query_selector_all": 1, "text_content": 3, "query_selector": 1,
+    }
+    assert {node: stats[0] for node, stats in accountant.by_node.items()} == {
+        OUTSIDE_NODES: 1, "SMS": 4, "SMS > CAP 1": 2,
+    }
+    assert accountant.calls_per_node() == 3.5
+    assert accountant.over_budget()
+
+    assert accountant.by_type["evaluate"][1] == len("() => 1") * 2 + len("arg")
+    assert accountant.by_type["evaluate"][2] == 2 * len('{"ok": true}')
+
+
+def test_handles_are_wrapped_once_and_forward_attributes():
+    accountant = CallAccountant()
+    raw = _Page()
+    page = accountant.wrap(raw)
+    assert accountant.wrap(page) is page
+    assert accountant.wrap(None) is None
+
+    handles = page.query_selector_all("a")
+    assert all(accountant.wrap(handle) is handle for handle in handles)
+    assert handles[0].text == "CAP 1"
+
+    page.goto("https://exemplo/")
+    assert page.url == raw.url == "https://exemplo/"
+    # Handles devolvidos nao contam como bytes recebidos
+    assert accountant.by_type["query_selector_all"][2] == 0
+
+
+def test_async_calls_are_counted_when_awaited():
+    accountant = CallAccountant()
+    page = accountant.wrap(_AsyncPage())
+    accountant.set_node("SMS")
+    assert asyncio.run(page.evaluate("() => 1")) == {"ok": True}
+    assert accountant.by_node["SMS"][0] == 1
+    assert accountant.by_type["evaluate"][2] == len('{"ok": true}')
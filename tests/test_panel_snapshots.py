@@ -0,0 +1,51 @@
+from src.panel_snapshots import PanelSnapshotStore
+
+
+def test_merge_copies_latest_snapshot_of_each_branch(tmp_path):
+    merged = PanelSnapshotStore(tmp_path / "snapshots")
+    merged.put(["SMS"], "<p>SMS</p>")
+
+    for name in ("CAP 1", "CAP 2"):
+        branch = PanelSnapshotStore(tmp_path / name / "snapshots")
+        branch.put(["SMS", name], "<p>antigo</p>")
+        branch.put(["SMS", name], f"<p>{name}</p>")
+        assert merged.merge(branch) == 1
+
+    entries = merged.entries()
+    assert [entry["caminho"] for entry in entries] == [["SMS"], ["SMS", "CAP 1"], ["SMS", "CAP 2"]]
+    assert [merged.read(entry) for entry in entries] == ["<p>SMS</p>", "<p>CAP 1</p>", "<p>CAP 2</p>"]
+
+
+def test_merge_of_missing_branch_dir_copies_nothing(tmp_path):
+    merged = PanelSnapshotStore(tmp_path / "snapshots")
+    assert merged.merge(PanelSnapshotStore(tmp_path / "ramo" / "snapshots")) == 0
+    assert merged.entries() == []
+
+
+def _index_lines(store: PanelSnapshotStore) -> list:
+    return (store.snapshot_dir / "indice.jsonl").read_text(encoding="utf-8").splitlines()
+
+
+def test_compact_keeps_latest_entry_of_each_node(tmp_path):
+    store = PanelSnapshotStore(tmp_path / "snapshots")
+    for version in range(3):
+        store.put(["SMS"], f"<p>SMS {version}</p>")
+        store.put(["SMS", "CAP 1"], f"<p>CAP 1 {version}</p>")
+    assert len(_index_lines(store)) == 6
+
+    assert store.compact() == 2
+    assert len(_index_lines(store)) == 2
+    assert [store.read(entry) for entry in store.entries()] == ["<p>SMS 2</p>", "<p>CAP 1 2</p>"]
+
+
+def test_repeated_merges_do_not_grow_the_index(tmp_path):
+    merged = PanelSnapshotStore(tmp_path / "snapshots")
+    branch = PanelSnapshotStore(tmp_path / "CAP 1" / "snapshots")
+    branch.put(["SMS", "CAP 1"], "<p>CAP 1</p>")
+    for _ in range(3):
+        merged.merge(branch)
+    assert len(_index_lines(merged)) == 1
+
+
+def test_compact_of_empty_dir_is_noop(tmp_path):
+    assert PanelSnapshotStore(tmp_path / "snapshots").compact() == 0
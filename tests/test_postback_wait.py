@@ -0,0 +1,105 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from src.postback_wait import AsyncPostbackWaiter, PostbackWaiter
+
+SELECTOR = "#ContentPlaceHolder1_ua_treeviewn31Nodes"
+
+
+class _FakePage:
+    """
+    Pagina minima: a acao (action) altera 'signature', 'token' e 'posted';
+    wait_for_function reavalia JS_TARGET_CHANGED com esses valores.
+    """
+
+    def __init__(self, posts: bool = True, changes: bool = True, reloads: bool = False):
+        self.posts = posts
+        self.changes = changes
+        self.reloads = reloads
+        self.signature = "antes"
+        self.token = None
+        self.waits = []
+
+    def evaluate(self, script, arg=None):
+        selector, token = arg
+        self.token = token
+        return self.signature
+
+    def fire(self):
+        if self.changes:
+            self.signature = "depois"
+        if self.reloads:
+            self.token = None
+        return True
+
+    @contextmanager
+    def expect_response(self, predicate, timeout=None):
+        yield
+        if not self.posts:
+            raise PlaywrightTimeoutError("sem POST")
+
+    def wait_for_function(self, script, arg=None, timeout=None):
+        selector, before, token = arg
+        self.waits.append(timeout)
+        if self.token != token or self.signature != before:
+            return True
+        raise PlaywrightTimeoutError("alvo nao mudou")
+
+
+class _AsyncFakePage(_FakePage):
+    async def evaluate(self, script, arg=None):
+        return _FakePage.evaluate(self, script, arg)
+
+    @asynccontextmanager
+    async def expect_response(self, predicate, timeout=None):
+        yield
+        if not self.posts:
+            raise PlaywrightTimeoutError("sem POST")
+
+    async def wait_for_function(self, script, arg=None, timeout=None):
+        return _FakePage.wait_for_function(self, script, arg, timeout)
+
+
+def test_postback_and_target_change_complete_the_action():
+    page = _FakePage()
+    assert PostbackWaiter(page, timeout=1000).run(page.fire, SELECTOR)
+    assert 0 < page.waits[0] <= 1000
+
+
+def test_full_postback_is_detected_by_the_missing_token():
+    # Documento novo: a assinatura pode ser igual, mas o token gravado sumiu
+    page = _FakePage(changes=False, reloads=True)
+    assert PostbackWaiter(page, timeout=1000).run(page.fire, SELECTOR)
+
+
+def test_without_post_falls_back_to_the_dom_signature():
+    page = _FakePage(posts=False)
+    assert PostbackWaiter(page, timeout=1000).run(page.fire, SELECTOR)
+
+
+def test_target_that_never_changes_times_out():
+    page = _FakePage(posts=False, changes=False)
+    assert not PostbackWaiter(page, timeout=1000).run(page.fire, SELECTOR)
+
+
+def test_action_that_fires_nothing_does_not_wait():
+    page = _FakePage()
+    assert not PostbackWaiter(page, timeout=1000).run(lambda: False, SELECTOR)
+    assert page.waits == []
+
+
+def test_async_waiter_flags_timeouts():
+    page = _AsyncFakePage()
+    waiter = AsyncPostbackWaiter(page, timeout=1000)
+
+    async def fire():
+        return page.fire()
+
+    assert asyncio.run(waiter.run(fire, SELECTOR))
+    assert waiter.fired and not waiter.timed_out
+
+    page.changes = False
+    assert not asyncio.run(waiter.run(fire, SELECTOR))
+    assert waiter.timed_out
@@ -0,0 +1,63 @@
+from src.recrawl_scheduler import RecrawlScheduler
+
+PATH = "SMS > CAP 1"
+INFO = {"titulo": "CAP 1", "geral": {"titular": "Maria"}, "timestamp": "2024-01-01T00:00:00"}
+
+
+def _visit_when_due(scheduler: RecrawlScheduler, runs: int, info: dict = INFO) -> list:
+    """Execucoes (numeradas a partir de 1) em que o no foi devido e visitado."""
+    visited = []
+    for _ in range(runs):
+        scheduler.start_run()
+        scheduler.mark_seen(PATH)
+        if scheduler.is_due(PATH):
+            scheduler.record_visit(PATH, dict(info, timestamp=f"run {scheduler.run}"))
+            visited.append(scheduler.run)
+    return visited
+
+
+def test_interval_doubles_while_unchanged_up_to_the_maximum(tmp_path):
+    scheduler = RecrawlScheduler(tmp_path / "agenda.json", max_interval=4)
+    # Intervalos 1, 2, 4, 4...: o timestamp nao conta como mudanca
+    assert _visit_when_due(scheduler, 16) == [1, 2, 4, 8, 12, 16]
+    assert scheduler.interval(PATH) == 4
+
+
+def test_change_resets_the_interval(tmp_path):
+    scheduler = RecrawlScheduler(tmp_path / "agenda.json", max_interval=8)
+    _visit_when_due(scheduler, 4)
+    assert scheduler.interval(PATH) == 4
+
+    scheduler.start_run()
+    scheduler.record_visit(PATH, dict(INFO, geral={"titular": "Joana"}))
+    assert scheduler.stats["alterados"] == 1
+    assert scheduler.interval(PATH) == 1
+    assert scheduler.staleness(PATH) == 0
+
+
+def test_previous_stored_data_seeds_a_new_entry(tmp_path):
+    scheduler = RecrawlScheduler(tmp_path / "agenda.json")
+    scheduler.start_run()
+    scheduler.record_visit(PATH, INFO, previous_info=dict(INFO, timestamp="antes"))
+    assert scheduler.nodes[PATH]["stable_visits"] == 1
+    assert scheduler.stats["novos"] == 0
+    assert scheduler.staleness("SMS > nunca visitado") == float("inf")
+
+
+def test_subtree_seen_survives_finish_run_and_unseen_nodes_are_removed(tmp_path):
+    scheduler = RecrawlScheduler(tmp_path / "agenda.json")
+    scheduler.start_run()
+    for path in ("SMS > CAP 1", "SMS > CAP 1 > CMS A", "SMS > CAP 10", "SMS > CAP 2"):
+        scheduler.record_visit(path, INFO)
+
+    scheduler.start_run()
+    scheduler.mark_subtree_seen("SMS > CAP 1")
+    scheduler.mark_seen("SMS > CAP 2")
+    stats = scheduler.finish_run()
+    # "SMS > CAP 10" nao esta sob "SMS > CAP 1"
+    assert stats["removidos"] == ["SMS > CAP 10"]
+    assert sorted(scheduler.nodes) == ["SMS > CAP 1", "SMS > CAP 1 > CMS A", "SMS > CAP 2"]
+
+    reloaded = RecrawlScheduler(tmp_path / "agenda.json")
+    assert reloaded.run == 2
+    assert sorted(reloaded.nodes) == sorted(scheduler.nodes)
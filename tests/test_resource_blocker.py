@@ -0,0 +1,60 @@
+from src.resource_blocker import ResourceBlocker
+
+
+class _Request:
+    def __init__(self, url: str, resource_type: str):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class _Response:
+    def __init__(self, url: str, length: int):
+        self.url = url
+        self.headers = {"content-length": str(length)}
+
+
+class _Route:
+    def __init__(self, url: str, resource_type: str, log: list):
+        self.request = _Request(url, resource_type)
+        self.log = log
+
+    def fetch(self, method="GET"):
+        self.log.append((method, self.request.url))
+        return _Response(self.request.url, 2048)
+
+    def abort(self, reason):
+        self.log.append(("abort", self.request.url))
+
+    def fallback(self):
+        self.log.append(("fallback", self.request.url))
+
+
+def _route_all(blocker: ResourceBlocker, requests: list) -> list:
+    log = []
+    for url, resource_type in requests:
+        blocker._handle(_Route(url, resource_type, log))
+    return log
+
+
+REQUESTS = [
+    ("https://sici.rio.rj.gov.br/PAG/img/plus.gif", "image"),
+    ("https://sici.rio.rj.gov.br/PAG/img/plus.gif", "image"),
+    ("https://www.google-analytics.com/ga.js", "script"),
+    ("https://sici.rio.rj.gov.br/PAG/principal.aspx", "document"),
+]
+
+
+def test_blocking_sends_no_extra_request_by_default():
+    blocker = ResourceBlocker()
+    log = _route_all(blocker, REQUESTS)
+    assert [method for method, _ in log] == ["abort", "abort", "abort", "fallback"]
+    assert blocker.stats["bloqueadas"] == 3
+    assert blocker.stats["por_tipo"] == {"image": 2, "analytics": 1}
+    assert blocker.stats["bytes_economizados"] == 0
+
+
+def test_measuring_sends_one_head_per_new_url():
+    blocker = ResourceBlocker(measure=True)
+    log = _route_all(blocker, REQUESTS)
+    assert [method for method, _ in log] == ["HEAD", "abort", "abort", "abort", "fallback"]
+    assert blocker.stats["bytes_economizados"] == 2 * 2048
@@ -0,0 +1,57 @@
+from src.retry_queue import RetryQueue
+
+
+def _open_breaker(queue):
+    # Tres falhas seguidas sob CAP 1 abrem o disjuntor; os demais filhos sao adiados sem clique
+    for name in ("A", "B", "C"):
+        queue.defer(["SMS", "CAP 1", name], RuntimeError("timeout"))
+    for name in ("D", "E"):
+        queue.defer(["SMS", "CAP 1", name], attempted=False)
+
+
+def test_breaker_probes_one_node_before_retrying_siblings():
+    queue = RetryQueue(max_attempts=3, backoff_base=0.01, breaker_threshold=3)
+    _open_breaker(queue)
+    assert queue.breaker_open(["SMS", "CAP 1"])
+
+    calls = []
+    failures = {"A": 1}
+
+    def retry(path):
+        calls.append(path[-1])
+        if failures.get(path[-1]):
+            failures[path[-1]] -= 1
+            raise RuntimeError("timeout")
+
+    assert queue.drain(retry) == []
+    # A eh a sonda: falha, tenta de novo e so depois do sucesso os irmaos sao visitados
+    assert calls[:2] == ["A", "A"]
+    assert sorted(calls[2:]) == ["B", "C", "D", "E"]
+    assert not queue.breaker_open(["SMS", "CAP 1"])
+    assert queue.recovered == 5
+
+
+def test_breaker_deferred_siblings_wait_for_the_probe_backoff():
+    queue = RetryQueue(max_attempts=3, backoff_base=10.0, breaker_threshold=3)
+    _open_breaker(queue)
+    probe_time = max(e["proxima"] for e in queue.entries.values() if e["tentativas"])
+    deferred = [e for e in queue.entries.values() if not e["tentativas"]]
+    assert all(e["proxima"] >= probe_time for e in deferred)
+    key, _ = queue._next_entry()
+    assert key == "SMS > CAP 1 > A"
+
+
+def test_paths_that_keep_failing_are_reported(tmp_path):
+    queue = RetryQueue(max_attempts=2, backoff_base=0.0, breaker_threshold=5)
+    queue.defer(["SMS", "CAP 2"], RuntimeError("timeout"))
+
+    def retry(path):
+        raise RuntimeError("ainda fora")
+
+    failed = queue.drain(retry)
+    assert [entry["caminho"] for entry in failed] == [["SMS", "CAP 2"]]
+    assert failed[0]["tentativas"] == 2
+
+    target = tmp_path / "incompletos.json"
+    queue.report(str(target))
+    assert target.exists()
@@ -0,0 +1,106 @@
+from urllib.parse import urlencode
+
+import pytest
+
+from src.traffic_archive import TrafficArchive
+
+URL = "https://sici.rio.rj.gov.br/PAG/principal.aspx"
+
+
+def _form(target: str = "", argument: str = "", viewstate: str = "vs", **fields) -> str:
+    return urlencode({"__EVENTTARGET": target, "__EVENTARGUMENT": argument,
+                      "__VIEWSTATE": viewstate, **fields})
+
+
+class _Request:
+    def __init__(self, method: str, url: str, post_data: str = None):
+        self.method = method
+        self.url = url
+        self.post_data = post_data
+
+
+class _Response:
+    def __init__(self, body: bytes):
+        self.status = 200
+        self.headers = {"content-type": "text/html", "content-length": str(len(body))}
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class _Route:
+    def __init__(self, request: _Request, server_body: bytes = None):
+        self.request = request
+        self.server_body = server_body
+        self.fulfilled = None
+        self.aborted = None
+
+    def fetch(self):
+        return _Response(self.server_body)
+
+    def fulfill(self, response=None, body=None, status=None, headers=None):
+        self.fulfilled = {"body": body, "status": status or response.status, "headers": headers}
+
+    def abort(self, reason):
+        self.aborted = reason
+
+
+def _record(archive_dir, requests: list):
+    archive = TrafficArchive("gravar", archive_dir)
+    for request, body in requests:
+        route = _Route(request, body)
+        archive._handle(route)
+        assert route.fulfilled["body"] == body
+    return archive
+
+
+def _replay(archive: TrafficArchive, request: _Request) -> _Route:
+    route = _Route(request)
+    archive._handle(route)
+    return route
+
+
+def test_replay_serves_exact_key_in_recorded_order(tmp_path):
+    expand = _Request("POST", URL, _form("ContentPlaceHolder1$ua_treeview", "tSMS\\CAP 1", viewstate="a"))
+    _record(tmp_path, [
+        (_Request("GET", URL), b"<inicio>"),
+        (expand, b"<cap1 v1>"),
+        (expand, b"<cap1 v2>"),
+    ])
+    archive = TrafficArchive("reproduzir", tmp_path)
+
+    assert _replay(archive, _Request("GET", URL)).fulfilled["body"] == b"<inicio>"
+    # __VIEWSTATE fica fora da chave: outro valor ainda casa com a chave exata
+    replay = _Request("POST", URL, _form("ContentPlaceHolder1$ua_treeview", "tSMS\\CAP 1", viewstate="b"))
+    assert _replay(archive, replay).fulfilled["body"] == b"<cap1 v1>"
+    assert _replay(archive, replay).fulfilled["body"] == b"<cap1 v2>"
+    # A ultima gravacao se repete
+    assert _replay(archive, replay).fulfilled["body"] == b"<cap1 v2>"
+    assert archive.stats == {"gravadas": 0, "reproduzidas": 4, "aproximadas": 0, "faltando": 0}
+
+
+def test_replay_falls_back_to_short_key_when_form_state_differs(tmp_path):
+    _record(tmp_path, [
+        (_Request("POST", URL, _form("ContentPlaceHolder1$ua_treeview", "tSMS\\CAP 1",
+                                     ContentPlaceHolder1_ua_treeview_ExpandState="ennn")), b"<cap1>"),
+    ])
+    archive = TrafficArchive("reproduzir", tmp_path)
+
+    # Outra ordem de cliques: o estado do TreeView muda, o alvo do postback nao
+    route = _replay(archive, _Request("POST", URL, _form("ContentPlaceHolder1$ua_treeview", "tSMS\\CAP 1",
+                                                         ContentPlaceHolder1_ua_treeview_ExpandState="eenn")))
+    assert route.fulfilled["body"] == b"<cap1>"
+    assert "content-length" not in route.fulfilled["headers"]
+    assert archive.stats["aproximadas"] == 1
+
+    missing = _replay(archive, _Request("POST", URL, _form("ContentPlaceHolder1$ua_treeview", "tSMS\\CAP 2")))
+    assert missing.fulfilled is None and missing.aborted == "internetdisconnected"
+    assert archive.stats["faltando"] == 1
+
+
+def test_invalid_mode_and_missing_archive_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        TrafficArchive("tocar", tmp_path)
+    with pytest.raises(FileNotFoundError):
+        TrafficArchive("reproduzir", tmp_path / "vazio")
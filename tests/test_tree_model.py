@@ -0,0 +1,51 @@
+from src.tree_model import TreeModel
+
+PREFIX = "ContentPlaceHolder1_ua_treeview"
+
+
+def _record(n: int, text: str, parent: int = None, has_expander: bool = False, value_path: str = None) -> dict:
+    return {
+        "id": f"{PREFIX}t{n}",
+        "text": text,
+        "parentId": f"{PREFIX}t{parent}" if parent is not None else None,
+        "depth": 0,
+        "hasExpander": has_expander,
+        "expanded": False,
+        "valuePath": value_path or text,
+    }
+
+
+def test_incremental_merge_replaces_only_the_expanded_subtree():
+    tree = TreeModel([
+        _record(0, "SMS", has_expander=True, value_path="SMS"),
+        _record(1, "CAP 1", 0, True, "SMS\\CAP 1"),
+        _record(2, "CMS A", 1, value_path="SMS\\CAP 1\\CMS A"),
+        _record(3, "CAP 2", 0, True, "SMS\\CAP 2"),
+    ])
+    assert [r["text"] for r in tree.roots()] == ["SMS"]
+
+    # Nova leitura do container de CAP 1 (IDs redesenhados)
+    tree.merge([
+        _record(7, "CMS A", 1, value_path="SMS\\CAP 1\\CMS A"),
+        _record(8, "CMS B", 1, value_path="SMS\\CAP 1\\CMS B"),
+    ], under=f"{PREFIX}t1i")
+
+    assert [r["text"] for r in tree.children_of(f"{PREFIX}t1")] == ["CMS A", "CMS B"]
+    assert tree.get(f"{PREFIX}t1")["expanded"]
+    assert f"{PREFIX}t2" not in tree
+    assert tree.find_by_value_path("SMS\\CAP 1\\CMS A")["id"] == f"{PREFIX}t7"
+    assert [r["text"] for r in tree.children_of(f"{PREFIX}t0")] == ["CAP 1", "CAP 2"]
+    assert len(tree) == 5
+
+
+def test_find_by_text_restricted_to_a_parent():
+    tree = TreeModel([
+        _record(0, "SMS", has_expander=True),
+        _record(1, "CAP 1", 0, True, "SMS\\CAP 1"),
+        _record(2, "DIV", 1, value_path="SMS\\CAP 1\\DIV"),
+        _record(3, "CAP 2", 0, True, "SMS\\CAP 2"),
+        _record(4, "DIV", 3, value_path="SMS\\CAP 2\\DIV"),
+    ])
+    assert tree.count_by_text("DIV") == 2
+    assert tree.find_by_text("DIV")["id"] == f"{PREFIX}t2"
+    assert tree.find_by_text("DIV", f"{PREFIX}t3")["id"] == f"{PREFIX}t4"
@@ -0,0 +1,45 @@
+import json
+
+from src.tree_stream import TreeStreamWriter, rebuild_outputs
+
+
+def _rebuild(tmp_path):
+    data_file, resumo_file = tmp_path / "dados.json", tmp_path / "resumo.json"
+    total = rebuild_outputs(tmp_path / "arvore.ndjson", data_file, resumo_file)
+    with open(data_file, encoding="utf-8") as f:
+        data = json.load(f)
+    with open(resumo_file, encoding="utf-8") as f:
+        resumo = json.load(f)
+    return total, data, resumo
+
+
+def test_children_rebuilt_in_display_order_whatever_the_visit_order(tmp_path):
+    writer = TreeStreamWriter(tmp_path / "arvore.ndjson")
+    # Visita por prioridade: CAP 2 e um neto antes de CAP 1; SMS gravado por ultimo
+    writer.write(["SMS", "CAP 2"], {"titulo": "2"}, 1)
+    writer.write(["SMS", "CAP 2", "DIV 2.1"], {"titulo": "2.1"}, 0)
+    writer.write(["SMS", "CAP 1"], {"titulo": "1"}, 0)
+    writer.write(["SMS"], {"titulo": "SMS"})
+    writer.close()
+
+    total, data, resumo = _rebuild(tmp_path)
+    assert total == 4
+    assert list(data["SMS"]["filhos"]) == ["CAP 1", "CAP 2"]
+    assert data["SMS"]["info"] == {"titulo": "SMS"}
+    assert data["SMS"]["filhos"]["CAP 2"]["filhos"]["DIV 2.1"]["info"] == {"titulo": "2.1"}
+    assert resumo == {"SMS": {"CAP 1": {}, "CAP 2": {"DIV 2.1": {}}}}
+
+
+def test_lines_without_position_keep_arrival_order_and_latest_record_wins(tmp_path):
+    writer = TreeStreamWriter(tmp_path / "arvore.ndjson")
+    writer.write(["SMS", "CAP 2"], {"v": 1})
+    writer.write(["SMS", "CAP 1"], {"v": 1})
+    writer.close()
+    writer = TreeStreamWriter(tmp_path / "arvore.ndjson", append=True)
+    writer.write(["SMS", "CAP 2"], {"v": 2})
+    writer.close()
+
+    _, data, _ = _rebuild(tmp_path)
+    assert list(data["SMS"]["filhos"]) == ["CAP 2", "CAP 1"]
+    assert data["SMS"]["filhos"]["CAP 2"]["info"] == {"v": 2}
+    assert data["SMS"]["info"] is None
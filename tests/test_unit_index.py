@@ -0,0 +1,52 @@
+import json
+import sqlite3
+
+from src.unit_index import UnitIndex
+
+
+def _info(bairro, titular):
+    return {"titulo": "Unidade", "geral": {"titular": titular}, "endereco": {"bairro": bairro}}
+
+
+def test_same_named_units_in_different_branches_are_separate_rows(tmp_path):
+    index = UnitIndex(str(tmp_path / "unidades.db"))
+    index.upsert("DIV 1", _info("Centro", "Ana"), ["SMS", "CAP 1", "DIV 1"])
+    index.upsert("DIV 1", _info("Bangu", "Bruno"), ["SMS", "CAP 2", "DIV 1"])
+    index.upsert("DIV 1", _info("Tijuca", "Ana"), ["SMS", "CAP 1", "DIV 1"])
+    index.commit()
+
+    assert [json.loads(u["caminho"]) for u in index.by_titular("ana")] == [["SMS", "CAP 1", "DIV 1"]]
+    assert [u["bairro"] for u in index.by_bairro("bangu")] == ["Bangu"]
+    assert index.by_bairro("Centro") == []
+    assert len(index.search("div")) == 2
+    index.close()
+
+
+def test_commits_once_per_batch(tmp_path):
+    db_file = str(tmp_path / "unidades.db")
+    index = UnitIndex(db_file, batch_size=2)
+    index.upsert("CAP 1", _info("Centro", "Ana"), ["SMS", "CAP 1"])
+    index.upsert("CAP 2", _info("Bangu", "Bruno"), ["SMS", "CAP 2"])
+    index.upsert("CAP 3", _info("Penha", "Carla"), ["SMS", "CAP 3"])
+
+    # Outra conexao so ve o lote confirmado (simula uma queda antes de close)
+    other = sqlite3.connect(db_file)
+    assert other.execute("SELECT COUNT(*) FROM units").fetchone()[0] == 2
+    other.close()
+    index.close()
+
+
+def test_old_name_keyed_database_is_recreated(tmp_path):
+    db_file = str(tmp_path / "unidades.db")
+    conn = sqlite3.connect(db_file)
+    conn.execute("CREATE TABLE units (id INTEGER PRIMARY KEY, nome TEXT NOT NULL UNIQUE, caminho TEXT)")
+    conn.execute("INSERT INTO units (nome) VALUES ('CAP 1')")
+    conn.commit()
+    conn.close()
+
+    index = UnitIndex(db_file)
+    index.upsert("DIV 1", _info("Centro", "Ana"), ["SMS", "CAP 1", "DIV 1"])
+    index.upsert("DIV 1", _info("Bangu", "Bruno"), ["SMS", "CAP 2", "DIV 1"])
+    index.commit()
+    assert len(index.search("div")) == 2
+    index.close()